@@ -14,10 +14,12 @@ class RecipeAdminSite(AdminSite):
     def each_context(self, request):
         context = super().each_context(request)
         context['extra_css'] = ['admin/css/custom_admin.css']
-        from recipes.models import Recipe
-        context['total_recipes'] = Recipe.objects.count()
-        context['published_recipes'] = Recipe.objects.filter(status="published").count()
-        context['draft_recipes'] = Recipe.objects.filter(status="draft").count()
+        from recipes.stats import dashboard_stats
+        stats = dashboard_stats()
+        context['stats'] = stats
+        context['total_recipes'] = stats['total_recipes']
+        context['published_recipes'] = stats['recipes']['published']
+        context['draft_recipes'] = stats['recipes']['draft']
         return context
 
 
@@ -3,6 +3,9 @@ ASGI config for recipe project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with ``uvicorn core.asgi:application``; the async read endpoints
+live under /api/async/recipes/ (see recipes.api.async_views).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
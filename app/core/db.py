@@ -0,0 +1,97 @@
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from .middleware import InlineMiddlewareMixin
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+STICKY_COOKIE = "db_primary"
+
+# Routing state of the current request, None outside requests (management
+# commands, job workers), which always use the primary
+_routing = ContextVar("db_routing", default=None)
+
+# Replica alias -> time.monotonic() until which it is skipped
+_unreachable = {}
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+def _pick_replica():
+    """
+    A random reachable replica, or None. Connections are persistent and
+    health checked (CONN_MAX_AGE, CONN_HEALTH_CHECKS), so this is free once
+    the replica's connection is open; one that cannot be reached is skipped
+    for DB_REPLICA_RETRY_SECONDS.
+    """
+    now = time.monotonic()
+    aliases = [alias for alias in replica_aliases() if _unreachable.get(alias, 0) <= now]
+    random.shuffle(aliases)
+    for alias in aliases:
+        try:
+            connections[alias].ensure_connection()
+        except OperationalError:
+            _unreachable[alias] = now + getattr(settings, "DB_REPLICA_RETRY_SECONDS", 30)
+            continue
+        return alias
+    return None
+
+
+class ReadReplicaRouter:
+    """
+    Sends the reads of safe (GET/HEAD/OPTIONS) requests to one replica per
+    request. Everything else uses the primary: writes, reads inside
+    transactions, reads after the request wrote anything, and for
+    DB_REPLICA_STICKY_SECONDS after a client's last write (see
+    ReplicaRoutingMiddleware), so users always see their own changes.
+    """
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state["primary"] or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if "replica" not in state:
+            state["replica"] = _pick_replica()
+        return state["replica"] or DEFAULT_DB_ALIAS
+    
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state["primary"] = state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware(InlineMiddlewareMixin):
+    """
+    Sets up the per-request state ReadReplicaRouter reads, and pins a client
+    to the primary with a short-lived cookie after any request that wrote.
+    """
+    def process_request(self, request):
+        wrote = request.method not in SAFE_METHODS
+        _routing.set({
+            "primary": wrote or STICKY_COOKIE in request.COOKIES or not replica_aliases(),
+            "wrote": wrote,
+        })
+    
+    def process_response(self, request, response):
+        state = _routing.get()
+        if state is not None and state["wrote"]:
+            response.set_cookie(
+                STICKY_COOKIE, "1", max_age=getattr(settings, "DB_REPLICA_STICKY_SECONDS", 5),
+                httponly=True, samesite="Lax",
+            )
+        _routing.set(None)
+        return response
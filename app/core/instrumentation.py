@@ -0,0 +1,156 @@
+import logging
+import random
+import re
+import sys
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .middleware import InlineMiddlewareMixin
+
+
+logger = logging.getLogger(__name__)
+
+# Queries of the current sampled request, None otherwise
+_current = ContextVar("query_stats", default=None)
+
+# "IN (%s, %s, ...)" lists differ in length with the number of values
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+
+SLOWEST_LOGGED = 3
+
+
+def query_shape(sql):
+    """
+    `sql` with IN lists collapsed, so the same query with different values has
+    one shape. Values are passed separately from the SQL, so nothing else varies.
+    """
+    return _IN_LIST.sub("IN (...)", sql) if "IN (" in sql else sql
+
+
+def _caller():
+    # First frame in project code outside this module: where a repeated query is issued
+    root = str(settings.BASE_DIR)
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and filename != __file__ and "site-packages" not in filename:
+            return f"{filename[len(root) + 1:]}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class QueryStats:
+    """
+    Count, time and per-shape totals of the queries of one request.
+    """
+    def __init__(self, repeat_threshold):
+        self.count = 0
+        self.seconds = 0.0
+        # shape -> [count, total seconds, slowest seconds]
+        self.shapes = {}
+        # shape -> code location, for shapes run repeat_threshold times or more
+        self.callers = {}
+        self.repeat_threshold = repeat_threshold
+    
+    def add(self, sql, elapsed):
+        self.count += 1
+        self.seconds += elapsed
+        shape = query_shape(sql)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = [1, elapsed, elapsed]
+            return
+        entry[0] += 1
+        entry[1] += elapsed
+        if elapsed > entry[2]:
+            entry[2] = elapsed
+        if entry[0] == self.repeat_threshold:
+            self.callers[shape] = _caller()
+    
+    def slowest(self, limit=SLOWEST_LOGGED):
+        return sorted(self.shapes.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    
+    def repeated(self):
+        return [(shape, self.shapes[shape], caller) for shape, caller in self.callers.items()]
+
+
+def _record(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(sql, time.perf_counter() - started)
+
+
+def _install():
+    # Kept on every connection for its lifetime, first so that execute_wrapper()
+    # blocks popping their own wrapper never remove it
+    for alias in connections:
+        wrappers = connections[alias].execute_wrappers
+        if _record not in wrappers:
+            wrappers.insert(0, _record)
+
+
+def _view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match._func_path if match else request.path
+
+
+def _truncate(sql, length=300):
+    return sql if len(sql) <= length else sql[:length] + "..."
+
+
+class QueryInstrumentationMiddleware(InlineMiddlewareMixin):
+    """
+    Records the query count, DB time and query shapes of a QUERY_SAMPLE_RATE
+    share of requests. Sampled responses get a Server-Timing header, and a
+    warning is logged for requests over QUERY_BUDGET queries or
+    QUERY_TIME_BUDGET_MS of DB time, with the slowest statements, and for
+    each query run QUERY_REPEAT_THRESHOLD times or more (an N+1) with the view
+    and line issuing it. Unsampled requests only pay a context variable lookup
+    per query.
+    """
+    def process_request(self, request):
+        _install()
+        if random.random() >= settings.QUERY_SAMPLE_RATE:
+            return
+        request._query_started = time.perf_counter()
+        request.query_stats = QueryStats(settings.QUERY_REPEAT_THRESHOLD)
+        _current.set(request.query_stats)
+    
+    def process_response(self, request, response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        _current.set(None)
+        total_ms = (time.perf_counter() - request._query_started) * 1000
+        db_ms = stats.seconds * 1000
+        
+        if settings.QUERY_SERVER_TIMING:
+            timing = f'db;dur={db_ms:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+            existing = response.get("Server-Timing")
+            response["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+        
+        view = None
+        if stats.count > settings.QUERY_BUDGET or db_ms > settings.QUERY_TIME_BUDGET_MS:
+            view = _view_name(request)
+            slowest = "".join(
+                f"\n  {slowest * 1000:.1f}ms x{count}: {_truncate(shape)}"
+                for shape, (count, total, slowest) in stats.slowest()
+            )
+            logger.warning(
+                "%s %s (%s) over query budget: %d queries, %.1fms in DB, %.1fms total; slowest:%s",
+                request.method, request.path, view, stats.count, db_ms, total_ms, slowest,
+            )
+        for shape, (count, total, slowest), caller in stats.repeated():
+            logger.warning(
+                "Repeated query in %s at %s: %d times, %.1fms in total: %s",
+                view or _view_name(request), caller, count, total * 1000, _truncate(shape),
+            )
+        return response
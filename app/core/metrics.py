@@ -0,0 +1,90 @@
+import os
+import time
+
+from django.db import transaction
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+from .middleware import InlineMiddlewareMixin
+
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported), every
+# worker process writes its samples to memory-mapped files in that directory
+# and a scrape of any worker sums them all. The directory must be emptied
+# when the server starts.
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by URL name.",
+    ["view", "method", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries", "Database queries per request by URL name.",
+    ["view"], buckets=(1, 2, 3, 5, 8, 13, 20, 30, 50, 100, 200, float("inf")),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds", "Time spent in database queries per request by URL name.",
+    ["view"],
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by cache and result (hit, miss, stale).",
+    ["cache", "result"],
+)
+WRITES = Counter(
+    "recipes_writes_total", "Committed recipe, comment, like and favorite writes.",
+    ["model", "action"],
+)
+
+
+def count_cache_lookup(name, hit):
+    CACHE_LOOKUPS.labels(name, "hit" if hit else "miss").inc()
+
+
+def count_write(model, action, amount=1):
+    """
+    Count a write once the current transaction commits; rolled back writes are not counted.
+    """
+    transaction.on_commit(lambda: WRITES.labels(model, action).inc(amount))
+
+
+def _view_label(request):
+    match = getattr(request, "resolver_match", None)
+    # URL names, never paths, so unmatched URLs cannot grow the label set
+    return (match.view_name or match._func_path) if match else "unmatched"
+
+
+class MetricsMiddleware(InlineMiddlewareMixin):
+    """
+    Observes request latency per URL name, and the query count and DB time
+    QueryInstrumentationMiddleware recorded for the request, if it was sampled.
+    Goes before that middleware so the whole request is timed.
+    """
+    def process_request(self, request):
+        request._metrics_started = time.perf_counter()
+    
+    def process_response(self, request, response):
+        started = getattr(request, "_metrics_started", None)
+        if started is None:
+            return response
+        view = _view_label(request)
+        REQUEST_LATENCY.labels(view, request.method, f"{response.status_code // 100}xx").observe(
+            time.perf_counter() - started
+        )
+        stats = getattr(request, "query_stats", None)
+        if stats is not None:
+            REQUEST_QUERIES.labels(view).observe(stats.count)
+            REQUEST_DB_TIME.labels(view).observe(stats.seconds)
+        return response
+
+
+def metrics(request):
+    """
+    Prometheus text exposition of this process's metrics, or of all worker
+    processes in multiprocess mode.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,14 @@
+from django.utils.deprecation import MiddlewareMixin
+
+
+class InlineMiddlewareMixin(MiddlewareMixin):
+    """
+    MiddlewareMixin whose hooks also run inline under ASGI. The stock mixin
+    hands each process_request()/process_response() call to a thread; the
+    project middleware only touches context variables and headers, so the
+    async path keeps them on the event loop.
+    """
+    async def __acall__(self, request):
+        response = self.process_request(request)
+        response = response or await self.get_response(request)
+        return self.process_response(request, response)
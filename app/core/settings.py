@@ -29,8 +29,10 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django.contrib.sites",
+    "django.contrib.postgres",
     "users",
     "recipes",
+    "jobs",
     "allauth",
     "allauth.account",
     "allauth.socialaccount",
@@ -46,7 +48,10 @@ if DEBUG:
     INSTALLED_APPS += ["debug_toolbar"]
 
 MIDDLEWARE = [
+    "core.metrics.MetricsMiddleware",
+    "core.instrumentation.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.db.ReplicaRoutingMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -73,6 +78,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "recipes.context_processors.favorites",
             ],
         },
     },
@@ -91,9 +97,41 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("DB_HOST"),
         "PORT": os.getenv("DB_PORT"),
+        # Persistent connections, checked before reuse in each request
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Read replicas, "host[:port]" comma separated, with the primary's other
+# settings. core.db.ReadReplicaRouter sends the reads of GET requests to them.
+for index, address in enumerate(filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(","))):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{index + 1}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["core.db.ReadReplicaRouter"]
+
+# Seconds a client reads from the primary after a write, so it sees its own
+# changes despite replication lag, and seconds an unreachable replica is skipped
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+DB_REPLICA_RETRY_SECONDS = int(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+
+# Query instrumentation (core.instrumentation): share of requests recorded,
+# whether they get a Server-Timing header, the query count and DB time over
+# which a request is logged, and how often one query may repeat in a request
+# before it is logged as an N+1. The /metrics query histograms (core.metrics)
+# only cover sampled requests.
+QUERY_SAMPLE_RATE = float(os.getenv("QUERY_SAMPLE_RATE", "1.0"))
+QUERY_SERVER_TIMING = os.getenv("QUERY_SERVER_TIMING", "True") == "True"
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "30"))
+QUERY_TIME_BUDGET_MS = float(os.getenv("QUERY_TIME_BUDGET_MS", "200"))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -133,6 +171,53 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Caching
+# Use a shared backend (e.g. FileBasedCache or DatabaseCache) when running several
+# worker processes so page cache invalidations reach all of them.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "recipe-cache"),
+    }
+}
+
+# Anonymous page cache: seconds an entry is fresh, then seconds it may be served stale
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", "60"))
+PAGE_CACHE_STALE_TIMEOUT = int(os.getenv("PAGE_CACHE_STALE_TIMEOUT", "300"))
+# Like, favorite and comment counts empty the cached list pages (and change
+# the API list ETag) at most once per this many seconds. A change made in
+# that window shows once the next one does, or once the page is re-rendered
+# after PAGE_CACHE_TIMEOUT (a stale copy is served one last time first).
+PAGE_CACHE_COUNTS_INTERVAL = int(os.getenv("PAGE_CACHE_COUNTS_INTERVAL", "30"))
+
+# Sidebar facet counts; entries are versioned, so this only bounds memory use
+FACETS_CACHE_TIMEOUT = int(os.getenv("FACETS_CACHE_TIMEOUT", "3600"))
+
+# Per-user favorite recipe id sets; entries are versioned like the facets
+FAVORITES_CACHE_TIMEOUT = int(os.getenv("FAVORITES_CACHE_TIMEOUT", "3600"))
+
+# Background jobs (jobs app): retry backoff, stuck-job recovery (seconds
+# without a heartbeat, and how often running jobs send one) and retention
+JOBS_RETRY_BASE_DELAY = int(os.getenv("JOBS_RETRY_BASE_DELAY", "10"))
+JOBS_RETRY_MAX_DELAY = int(os.getenv("JOBS_RETRY_MAX_DELAY", "3600"))
+JOBS_STALE_AFTER = int(os.getenv("JOBS_STALE_AFTER", "900"))
+JOBS_HEARTBEAT_INTERVAL = int(os.getenv("JOBS_HEARTBEAT_INTERVAL", "30"))
+JOBS_KEEP_FINISHED_DAYS = int(os.getenv("JOBS_KEEP_FINISHED_DAYS", "7"))
+
+# Trending recipes: score half-life and how often scores are refreshed (seconds)
+TRENDING_HALF_LIFE = int(os.getenv("TRENDING_HALF_LIFE", str(24 * 3600)))
+TRENDING_REFRESH_INTERVAL = int(os.getenv("TRENDING_REFRESH_INTERVAL", "300"))
+
+# Admin dashboard rollup: seconds the rendered stats are cached, how often
+# they are recomputed from scratch to repair drift, and how often the recent
+# daily activity is recounted
+ADMIN_STATS_CACHE_TIMEOUT = int(os.getenv("ADMIN_STATS_CACHE_TIMEOUT", "60"))
+ADMIN_STATS_REBUILD_INTERVAL = int(os.getenv("ADMIN_STATS_REBUILD_INTERVAL", str(24 * 3600)))
+ADMIN_STATS_DAILY_INTERVAL = int(os.getenv("ADMIN_STATS_DAILY_INTERVAL", "60"))
+
+# Recipe admin bulk actions on more rows than this run as background jobs
+ADMIN_BACKGROUND_THRESHOLD = int(os.getenv("ADMIN_BACKGROUND_THRESHOLD", "500"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -179,7 +264,7 @@ REST_FRAMEWORK = {
 
 if os.getenv("USE_MINIO"):
     DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
-
+    
     AWS_ACCESS_KEY_ID = os.getenv("MINIO_ACCESS_KEY")
     AWS_SECRET_ACCESS_KEY = os.getenv("MINIO_SECRET_KEY")
     AWS_STORAGE_BUCKET_NAME = os.getenv("MINIO_BUCKET_NAME")
@@ -2,13 +2,15 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.generic import TemplateView
+from core.metrics import metrics
+from recipes.views import HomeView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("allauth.urls")),
     path("api/", include("recipes.api.urls")),
-    path("", TemplateView.as_view(template_name="home.html"), name="home"),
+    path("metrics", metrics, name="metrics"),
+    path("", HomeView.as_view(), name="home"),
     path("recipes/", include("recipes.urls")),
     path("users/", include("users.urls")),
 ]
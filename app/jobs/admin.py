@@ -0,0 +1,37 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from core.admin import recipe_admin_site
+from .models import Job
+from .queue import requeue
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["id", "task", "queue", "status", "progress_display", "attempts", "run_at", "started_at",
+                    "finished_at"]
+    list_filter = ["status", "queue", "task"]
+    search_fields = ["task", "unique_key"]
+    date_hierarchy = "created_at"
+    readonly_fields = ["created_at", "started_at", "finished_at", "locked_by", "progress_display", "last_error"]
+    actions = ["retry_jobs"]
+    
+    def progress_display(self, obj):
+        if obj.progress_total is None:
+            return "-"
+        return f"{obj.progress}/{obj.progress_total} ({obj.progress_percent}%)"
+    progress_display.short_description = "Progress"
+    
+    def retry_jobs(self, request, queryset):
+        updated, conflicting = requeue(
+            queryset.filter(status=Job.FAILED), attempts=0, run_at=timezone.now(), last_error="", progress=0
+        )
+        messages.success(request, f"{updated} failed job(s) queued again.")
+        if conflicting:
+            messages.warning(
+                request, f"{len(conflicting)} job(s) skipped: a job with the same unique key is already queued."
+            )
+    retry_jobs.short_description = "Retry selected failed jobs"
+
+
+recipe_admin_site.register(Job, JobAdmin)
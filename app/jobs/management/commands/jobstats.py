@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import queue_metrics
+
+
+class Command(BaseCommand):
+    help = "Show job queue depth, lag, throughput and queue latency."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--window", type=int, default=15,
+                            help="Minutes of finished jobs used for throughput and latency.")
+    
+    def handle(self, *args, **options):
+        metrics = queue_metrics(window=timedelta(minutes=options["window"]))
+        for name, value in metrics.items():
+            if isinstance(value, float):
+                value = f"{value:.2f}"
+            self.stdout.write(f"{name:>16}: {value}")
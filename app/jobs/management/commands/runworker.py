@@ -0,0 +1,44 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Process background jobs from the Postgres job queue."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", action="append", dest="queues",
+                            help="Queue to consume (repeatable, default: default).")
+        parser.add_argument("--concurrency", type=int, default=4,
+                            help="Number of jobs processed in parallel.")
+        parser.add_argument("--poll-interval", type=float, default=1.0,
+                            help="Seconds to sleep when no job is due.")
+        parser.add_argument("--stats-interval", type=float, default=60.0,
+                            help="Seconds between throughput/latency reports.")
+    
+    def handle(self, *args, **options):
+        worker = Worker(
+            queues=options["queues"] or ["default"],
+            concurrency=options["concurrency"],
+            poll_interval=options["poll_interval"],
+            stats_interval=options["stats_interval"],
+            on_stats=self.report,
+        )
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        
+        self.stdout.write(
+            f"Worker {worker.name} consuming {', '.join(worker.queues)} "
+            f"with concurrency {worker.concurrency}"
+        )
+        worker.run()
+        self.stdout.write("Worker stopped.")
+    
+    def report(self, stats):
+        self.stdout.write(
+            f"jobs/s={stats['jobs_per_second']:.2f} ok={stats['succeeded']} failed={stats['failed']} "
+            f"latency p50={stats['latency_p50']:.2f}s p95={stats['latency_p95']:.2f}s "
+            f"duration mean={stats['duration_mean'] * 1000:.0f}ms"
+        )
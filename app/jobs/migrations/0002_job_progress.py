@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='progress',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='progress_total',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.10 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # Jobs running during the deploy count as alive since they started
+        migrations.RunSQL(
+            "UPDATE jobs_job SET heartbeat_at = started_at WHERE status = 'running'",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,74 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+    
+    task = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=50, default="default")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    unique_key = models.CharField(max_length=255, blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    # Touched by the worker while the job runs; running jobs whose heartbeat
+    # stopped belong to a dead worker
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    # Reported by long running tasks through jobs.queue.report_progress
+    progress = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # Workers poll for the oldest due job per queue
+            models.Index(
+                fields=["queue", "run_at", "id"],
+                condition=Q(status="queued"),
+                name="job_ready_idx",
+            ),
+            models.Index(fields=["status", "finished_at"], name="job_status_finished_idx"),
+        ]
+        constraints = [
+            # At most one queued job per unique_key (periodic tasks, per-object work).
+            # A running job does not count, so changes made while it runs are not lost.
+            models.UniqueConstraint(
+                fields=["unique_key"],
+                condition=Q(status="queued"),
+                name="job_unique_queued_key",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+    
+    @property
+    def progress_percent(self):
+        if not self.progress_total:
+            return None
+        return min(100, round(100 * self.progress / self.progress_total))
+    
+    @property
+    def queue_latency(self):
+        if self.started_at is None:
+            return None
+        return (self.started_at - self.run_at).total_seconds()
@@ -0,0 +1,231 @@
+import traceback
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task, periodic_tasks
+
+
+_current_job = ContextVar("current_job", default=None)
+
+# last_error note of a job dropped because another job with its unique_key
+# was queued while it ran; that job does the same work
+SUPERSEDED = "Superseded by a queued job with the same unique_key."
+
+
+def enqueue(task_name, *args, run_at=None, delay=None, unique_key=None, queue=None, **kwargs):
+    """
+    Store a job in the current transaction; it becomes visible to workers on commit.
+    
+    With `unique_key`, an already queued job with the same key is returned
+    instead of creating a duplicate.
+    """
+    registered = get_task(task_name)
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    job = Job(
+        task=task_name,
+        args=list(args),
+        kwargs=kwargs,
+        queue=queue or registered.queue,
+        max_attempts=registered.max_attempts,
+        run_at=run_at,
+        unique_key=unique_key,
+    )
+    if unique_key is None:
+        job.save()
+        return job
+    
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return Job.objects.filter(unique_key=unique_key, status=Job.QUEUED).first()
+    return job
+
+
+def report_progress(done, total=None):
+    """
+    Record how far the running job has got, for the admin to show. Outside
+    a job (a task called directly) this does nothing.
+    """
+    job = _current_job.get()
+    if job is None:
+        return
+    job.progress = done
+    if total is not None:
+        job.progress_total = total
+    Job.objects.filter(pk=job.pk).update(
+        progress=job.progress, progress_total=job.progress_total, heartbeat_at=timezone.now()
+    )
+
+
+def retry_delay(attempts):
+    """
+    Exponential backoff with a cap: base, 2*base, 4*base, ... seconds.
+    """
+    base = getattr(settings, "JOBS_RETRY_BASE_DELAY", 10)
+    cap = getattr(settings, "JOBS_RETRY_MAX_DELAY", 3600)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def claim_job(queues, worker_name):
+    """
+    Lock the oldest due job with FOR UPDATE SKIP LOCKED so concurrent workers
+    never block on, or pick up, the same row.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, queue__in=queues, run_at__lte=now)
+            .order_by("run_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.started_at = job.heartbeat_at = now
+        job.locked_by = worker_name
+        job.save(update_fields=["status", "attempts", "started_at", "heartbeat_at", "locked_by"])
+    return job
+
+
+def heartbeat(job_ids):
+    """
+    Mark running jobs as alive, so requeue_stale_jobs leaves them alone.
+    """
+    if not job_ids:
+        return 0
+    return Job.objects.filter(pk__in=job_ids, status=Job.RUNNING).update(heartbeat_at=timezone.now())
+
+
+def _supersede(job):
+    job.status = Job.FAILED
+    job.finished_at = timezone.now()
+    job.last_error = f"{job.last_error}\n{SUPERSEDED}".lstrip()
+    job.save(update_fields=["status", "finished_at", "last_error"])
+
+
+def run_job(job):
+    """
+    Execute a claimed job and record the outcome. Returns True on success.
+    """
+    registered = None
+    token = _current_job.set(job)
+    try:
+        registered = get_task(job.task)
+        registered(*job.args, **job.kwargs)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+        try:
+            with transaction.atomic():
+                job.save(update_fields=["status", "finished_at", "run_at", "last_error"])
+        except IntegrityError:
+            # job_unique_queued_key: a job with the same key was queued while
+            # this one ran and will do the work, so the retry is dropped
+            _supersede(job)
+        succeeded = False
+    else:
+        job.status = Job.DONE
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at"])
+        succeeded = True
+    finally:
+        _current_job.reset(token)
+    
+    if registered is not None and registered.every and job.status != Job.QUEUED:
+        schedule_periodic(registered, delay=registered.every)
+    return succeeded
+
+
+def schedule_periodic(registered, delay=None):
+    return enqueue(registered.name, delay=delay, unique_key=f"periodic:{registered.name}")
+
+
+def ensure_periodic_jobs():
+    for registered in periodic_tasks():
+        schedule_periodic(registered)
+
+
+def requeue(queryset, **changes):
+    """
+    Set the jobs of `queryset` back to queued with `changes`. A keyed job is
+    left alone when a job with its unique_key is already queued
+    (job_unique_queued_key). Returns the number requeued and the ids of the
+    jobs left alone.
+    """
+    changes["status"] = Job.QUEUED
+    requeued = queryset.filter(unique_key__isnull=True).update(**changes)
+    keyed = queryset.filter(unique_key__isnull=False)
+    twin = Exists(Job.objects.filter(status=Job.QUEUED, unique_key=OuterRef("unique_key")))
+    conflicting = list(keyed.filter(twin).values_list("pk", flat=True))
+    for pk in keyed.filter(~twin).values_list("pk", flat=True):
+        try:
+            with transaction.atomic():
+                requeued += Job.objects.filter(pk=pk).update(**changes)
+        except IntegrityError:
+            # Another job of the batch with the same key went first
+            conflicting.append(pk)
+    return requeued, conflicting
+
+
+def requeue_stale_jobs():
+    """
+    Put back jobs left running by a worker that died mid-job: no heartbeat
+    for JOBS_STALE_AFTER seconds. Jobs whose unique_key has been queued again
+    meanwhile are marked failed as superseded instead.
+    """
+    now = timezone.now()
+    stale_after = timedelta(seconds=getattr(settings, "JOBS_STALE_AFTER", 900))
+    requeued, conflicting = requeue(
+        Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=now - stale_after),
+        run_at=now, locked_by="",
+    )
+    Job.objects.filter(pk__in=conflicting).update(
+        status=Job.FAILED, finished_at=now, locked_by="", last_error=SUPERSEDED
+    )
+    return requeued
+
+
+def queue_metrics(window=timedelta(minutes=15)):
+    """
+    Queue depth, lag, throughput and latency computed from the job table.
+    """
+    now = timezone.now()
+    counts = dict(
+        Job.objects.order_by().values_list("status").annotate(total=Count("pk"))
+    )
+    oldest_due = (
+        Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+        .order_by("run_at")
+        .values_list("run_at", flat=True)
+        .first()
+    )
+    recent = list(
+        Job.objects.filter(status=Job.DONE, finished_at__gte=now - window)
+        .values_list("run_at", "started_at")
+    )
+    latencies = sorted(max((started - run_at).total_seconds(), 0) for run_at, started in recent)
+    return {
+        "queued": counts.get(Job.QUEUED, 0),
+        "running": counts.get(Job.RUNNING, 0),
+        "failed": counts.get(Job.FAILED, 0),
+        "due": Job.objects.filter(status=Job.QUEUED, run_at__lte=now).count(),
+        "lag_seconds": (now - oldest_due).total_seconds() if oldest_due else 0.0,
+        "jobs_per_second": len(recent) / window.total_seconds(),
+        "latency_p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        "latency_p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+    }
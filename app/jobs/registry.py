@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+from datetime import timedelta
+
+
+@dataclass
+class Task:
+    name: str
+    func: object
+    queue: str = "default"
+    max_attempts: int = 5
+    every: timedelta = None
+    
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+    
+    def enqueue(self, *args, **kwargs):
+        from .queue import enqueue
+        return enqueue(self.name, *args, **kwargs)
+
+
+_tasks = {}
+
+
+def task(name=None, queue="default", max_attempts=5, every=None):
+    """
+    Register a function as a background task.
+    
+    Tasks are looked up by name when a job runs, so arguments must be JSON
+    serializable. `every` makes the task periodic: workers keep exactly one
+    queued run scheduled.
+    """
+    def decorator(func):
+        task_name = name or f"{func.__module__}.{func.__qualname__}"
+        registered = Task(task_name, func, queue=queue, max_attempts=max_attempts, every=every)
+        _tasks[task_name] = registered
+        return registered
+    
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f"Unknown task {name!r}; is its tasks module installed?") from None
+
+
+def periodic_tasks():
+    return [registered for registered in _tasks.values() if registered.every]
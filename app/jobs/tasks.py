@@ -0,0 +1,14 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+from .registry import task
+
+
+@task(name="jobs.purge_finished", every=timedelta(hours=1))
+def purge_finished():
+    # Failed jobs are kept for inspection; successful ones only for a while
+    keep = timedelta(days=getattr(settings, "JOBS_KEEP_FINISHED_DAYS", 7))
+    Job.objects.filter(status=Job.DONE, finished_at__lt=timezone.now() - keep).delete()
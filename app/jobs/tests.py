@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import SUPERSEDED, claim_job, heartbeat, requeue, requeue_stale_jobs, run_job
+from .registry import task
+
+
+@task(name="jobs.tests.fail", max_attempts=3)
+def fail():
+    raise RuntimeError("boom")
+
+
+class QueuedKeyConflictTests(TestCase):
+    def running(self, unique_key=None, **fields):
+        job = Job.objects.create(task="jobs.tests.fail", unique_key=unique_key)
+        claimed = claim_job(["default"], "test:0")
+        self.assertEqual(claimed.pk, job.pk)
+        Job.objects.filter(pk=job.pk).update(**fields)
+        claimed.refresh_from_db()
+        return claimed
+    
+    def test_retry_with_queued_twin_is_superseded(self):
+        job = self.running("key")
+        twin = Job.objects.create(task="jobs.tests.fail", unique_key="key")
+        
+        self.assertFalse(run_job(job))
+        
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn(SUPERSEDED, job.last_error)
+        self.assertEqual(Job.objects.get(pk=twin.pk).status, Job.QUEUED)
+    
+    def test_retry_without_twin_is_queued(self):
+        job = self.running("key")
+        self.assertFalse(run_job(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+    
+    @override_settings(JOBS_STALE_AFTER=60)
+    def test_stale_sweep(self):
+        long_ago = timezone.now() - timedelta(hours=1)
+        stale = self.running(heartbeat_at=long_ago)
+        superseded = self.running("key", heartbeat_at=long_ago)
+        alive = self.running(started_at=long_ago, heartbeat_at=long_ago)
+        Job.objects.create(task="jobs.tests.fail", unique_key="key")
+        heartbeat([alive.pk])
+        
+        self.assertEqual(requeue_stale_jobs(), 1)
+        
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, Job.QUEUED)
+        self.assertEqual(Job.objects.get(pk=superseded.pk).status, Job.FAILED)
+        self.assertEqual(Job.objects.get(pk=alive.pk).status, Job.RUNNING)
+    
+    def test_requeue_skips_keys_already_queued(self):
+        first = Job.objects.create(task="jobs.tests.fail", unique_key="key", status=Job.FAILED)
+        second = Job.objects.create(task="jobs.tests.fail", unique_key="key", status=Job.FAILED)
+        plain = Job.objects.create(task="jobs.tests.fail", status=Job.FAILED)
+        
+        requeued, conflicting = requeue(Job.objects.filter(status=Job.FAILED), run_at=timezone.now())
+        
+        self.assertEqual(requeued, 2)
+        self.assertEqual(len(conflicting), 1)
+        self.assertEqual(Job.objects.get(pk=plain.pk).status, Job.QUEUED)
+        self.assertEqual(Job.objects.filter(pk__in=[first.pk, second.pk], status=Job.QUEUED).count(), 1)
@@ -0,0 +1,164 @@
+import logging
+import os
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .queue import claim_job, ensure_periodic_jobs, heartbeat, requeue_stale_jobs, run_job
+
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerStats:
+    """
+    Throughput and queue-latency counters for one worker process.
+    """
+    def __init__(self, window=1000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.durations = deque(maxlen=window)
+        self.succeeded = 0
+        self.failed = 0
+        self.started = time.monotonic()
+    
+    def record(self, job, duration, succeeded):
+        with self.lock:
+            if succeeded:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+            self.durations.append(duration)
+            if job.queue_latency is not None:
+                self.latencies.append(max(job.queue_latency, 0))
+    
+    def snapshot(self):
+        """
+        Stats since the previous snapshot; counters are reset.
+        """
+        with self.lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            latencies = sorted(self.latencies)
+            durations = list(self.durations)
+            snapshot = {
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "jobs_per_second": (self.succeeded + self.failed) / elapsed,
+                "latency_p50": _percentile(latencies, 50),
+                "latency_p95": _percentile(latencies, 95),
+                "duration_mean": statistics.fmean(durations) if durations else 0.0,
+            }
+            self.latencies.clear()
+            self.durations.clear()
+            self.succeeded = self.failed = 0
+            self.started = time.monotonic()
+        return snapshot
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+class Worker:
+    """
+    Runs `concurrency` threads, each claiming and executing one job at a time,
+    and a thread touching the heartbeat of the running jobs every
+    JOBS_HEARTBEAT_INTERVAL seconds. Every thread uses its own database
+    connection.
+    """
+    def __init__(self, queues, concurrency=1, poll_interval=1.0, stats_interval=60.0, on_stats=None):
+        self.queues = list(queues)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.on_stats = on_stats
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = WorkerStats()
+        self.stopping = threading.Event()
+        self.running_lock = threading.Lock()
+        self.running = set()
+    
+    def stop(self, *args):
+        self.stopping.set()
+    
+    def run(self):
+        self._requeue_stale()
+        ensure_periodic_jobs()
+        connections.close_all()
+        
+        threads = [
+            threading.Thread(target=self._loop, args=(index,), name=f"worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        threads.append(threading.Thread(target=self._heartbeat, name="worker-heartbeat"))
+        for thread in threads:
+            thread.start()
+        
+        while not self.stopping.wait(self.stats_interval):
+            self._requeue_stale()
+            if self.on_stats:
+                self.on_stats(self.stats.snapshot())
+        for thread in threads:
+            thread.join()
+        connections.close_all()
+    
+    def _requeue_stale(self):
+        try:
+            requeue_stale_jobs()
+        except Exception:
+            logger.exception("Requeueing stale jobs failed")
+    
+    def _heartbeat(self):
+        interval = getattr(settings, "JOBS_HEARTBEAT_INTERVAL", 30)
+        try:
+            while not self.stopping.wait(interval):
+                close_old_connections()
+                with self.running_lock:
+                    job_ids = list(self.running)
+                try:
+                    heartbeat(job_ids)
+                except Exception:
+                    logger.exception("Job heartbeat failed")
+        finally:
+            connections.close_all()
+    
+    def _loop(self, index):
+        worker_name = f"{self.name}:{index}"
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    job = claim_job(self.queues, worker_name)
+                except Exception:
+                    logger.exception("Claiming a job failed")
+                    job = None
+                if job is None:
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                
+                started = time.monotonic()
+                with self.running_lock:
+                    self.running.add(job.pk)
+                try:
+                    succeeded = run_job(job)
+                except Exception:
+                    # Recording the outcome failed; without heartbeats the job
+                    # is requeued by the stale sweep
+                    logger.exception("Running job %s failed", job)
+                    continue
+                finally:
+                    with self.running_lock:
+                        self.running.discard(job.pk)
+                self.stats.record(job, time.monotonic() - started, succeeded)
+                if not succeeded:
+                    logger.warning("Job %s failed (attempt %s/%s)", job, job.attempts, job.max_attempts)
+        finally:
+            connections.close_all()
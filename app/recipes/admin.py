@@ -3,11 +3,15 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.http import HttpResponseRedirect
 from django.contrib import messages
-from django.db.models import Count
-from django.utils import timezone
+from django.conf import settings
 
 from core.admin import recipe_admin_site
+from . import services
+from .export import export_response
 from .models import Recipe, Comment, Like
+from .services import refresh_counters
+from .slugs import reserve_slug
+from .tasks import duplicate_recipes_task, reset_likes_task
 
 
 class CommentInline(admin.TabularInline):
@@ -27,7 +31,8 @@ class RecipeAdmin(admin.ModelAdmin):
     date_hierarchy = "created_at"
     raw_id_fields = ["author"]
     inlines = [CommentInline]
-    actions = ["make_published", "make_draft", "duplicate_recipe", "reset_likes"]
+    actions = ["make_published", "make_draft", "duplicate_recipe", "reset_likes",
+               "export_ndjson", "export_csv"]
     readonly_fields = ["created_at", "updated_at", "get_likes", "get_comments"]
     fieldsets = (
         (None, {
@@ -49,22 +54,25 @@ class RecipeAdmin(admin.ModelAdmin):
     )
     list_per_page = 20
     
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        queryset = queryset.annotate(
-            _likes_count=Count('likes', distinct=True),
-            _comments_count=Count('comments', distinct=True)
-        )
-        return queryset
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if "slug" in form.changed_data:
+            # Keep the slug allocator from handing out a slug typed here
+            reserve_slug(obj.slug)
+    
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Comments may have been added or removed through the inline
+        refresh_counters(Recipe.objects.filter(pk=form.instance.pk))
     
     def likes_count(self, obj):
-        return obj._likes_count
-    likes_count.admin_order_field = '_likes_count'
+        return obj.likes_count
+    likes_count.admin_order_field = 'likes_count'
     likes_count.short_description = 'Likes'
     
     def comments_count(self, obj):
-        return obj._comments_count
-    comments_count.admin_order_field = '_comments_count'
+        return obj.comments_count
+    comments_count.admin_order_field = 'comments_count'
     comments_count.short_description = 'Comments'
     
     def display_status(self, obj):
@@ -88,41 +96,73 @@ class RecipeAdmin(admin.ModelAdmin):
     view_on_site.short_description = 'View'
     
     def make_published(self, request, queryset):
-        updated = queryset.update(status="published")
+        updated = services.set_status(queryset, "published")
         messages.success(request, f"{updated} recipe(s) marked as published.")
     make_published.short_description = "Mark selected recipes as published"
     
     def make_draft(self, request, queryset):
-        updated = queryset.update(status="draft")
+        updated = services.set_status(queryset, "draft")
         messages.success(request, f"{updated} recipe(s) marked as drafts.")
     make_draft.short_description = "Mark selected recipes as drafts"
     
+    def run_bulk_action(self, request, queryset, task, description):
+        """
+        Run a recipes.bulk task on the selected recipes, in a background job
+        when the selection is large. Returns the number of recipes handled,
+        or None when the work was queued.
+        """
+        recipe_ids = list(queryset.order_by("pk").values_list("pk", flat=True))
+        if len(recipe_ids) <= settings.ADMIN_BACKGROUND_THRESHOLD:
+            return task(recipe_ids)
+        job = task.enqueue(recipe_ids)
+        url = reverse('admin:jobs_job_change', args=[job.pk], current_app=self.admin_site.name)
+        messages.info(request, format_html(
+            '{} {} recipe(s) in the background; follow its progress on <a href="{}">job #{}</a>.',
+            description, len(recipe_ids), url, job.pk,
+        ))
+        return None
+    
     def duplicate_recipe(self, request, queryset):
-        for recipe in queryset:
-            recipe.pk = None
-            recipe.title = f"Copy of {recipe.title}"
-            recipe.slug = f"copy-of-{recipe.slug}-{timezone.now().strftime('%Y%m%d%H%M%S')}"
-            recipe.status = "draft"
-            recipe.created_at = timezone.now()
-            recipe.updated_at = timezone.now()
-            recipe.save()
-            
-            # Copy tags
-            for tag in recipe.tags.all():
-                recipe.tags.add(tag)
-                
-        messages.success(request, f"{queryset.count()} recipe(s) duplicated successfully.")
+        copied = self.run_bulk_action(request, queryset, duplicate_recipes_task, "Duplicating")
+        if copied is not None:
+            messages.success(request, f"{copied} recipe(s) duplicated successfully.")
     duplicate_recipe.short_description = "Duplicate selected recipes"
     
     def reset_likes(self, request, queryset):
-        for recipe in queryset:
-            recipe.likes.all().delete()
-        messages.success(request, f"Likes reset for {queryset.count()} recipe(s).")
+        updated = self.run_bulk_action(request, queryset, reset_likes_task, "Resetting likes of")
+        if updated is not None:
+            messages.success(request, f"Likes reset for {updated} recipe(s).")
     reset_likes.short_description = "Reset likes for selected recipes"
+    
+    def export_ndjson(self, request, queryset):
+        return export_response(queryset, format="ndjson", compress=True)
+    export_ndjson.short_description = "Export selected recipes (NDJSON, gzip)"
+    
+    def export_csv(self, request, queryset):
+        return export_response(queryset, format="csv")
+    export_csv.short_description = "Export selected recipes (CSV)"
+
+
+class RecipeCounterAdminMixin:
+    """
+    Recount the parent recipe's like/comment counters after admin edits.
+    """
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        refresh_counters(Recipe.objects.filter(pk__in={obj.recipe_id, form.initial.get('recipe')} - {None}))
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_counters(Recipe.objects.filter(pk=obj.recipe_id))
+    
+    def delete_queryset(self, request, queryset):
+        recipe_ids = set(queryset.values_list('recipe_id', flat=True))
+        super().delete_queryset(request, queryset)
+        refresh_counters(Recipe.objects.filter(pk__in=recipe_ids))
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(RecipeCounterAdminMixin, admin.ModelAdmin):
     list_display = ["author", "recipe_link", "text_preview", "created_at"]
     list_filter = ["created_at"]
     search_fields = ["text", "author__username", "recipe__title"]
@@ -140,7 +180,7 @@ class CommentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Like)
-class LikeAdmin(admin.ModelAdmin):
+class LikeAdmin(RecipeCounterAdminMixin, admin.ModelAdmin):
     list_display = ["user", "recipe_link", "created_at"]
     list_filter = ["created_at"]
     date_hierarchy = "created_at"
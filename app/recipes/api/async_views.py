@@ -0,0 +1,183 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django_filters.filterset import filterset_factory
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from recipes.facets import cached_facets
+from recipes.models import Comment, Like, Recipe
+from recipes.pagination import InvalidCursor, akeyset_page, uses_keyset_ordering
+from recipes.search import search_recipes
+from recipes.services import favorited_recipe_ids
+from recipes.trending import trending_recipes
+from .fields import only_rendered, sparse_representation
+from .pagination import RecipeCursorPagination
+from .serializers import CommentSerializer, RecipeListSerializer, RecipeSerializer
+from .views import FACET_IGNORED_PARAMS, RecipeViewSet, visible_recipes
+
+
+RecipeFilterSet = filterset_factory(Recipe, fields=RecipeViewSet.filterset_fields)
+
+
+def async_api_view(view):
+    """
+    GET-only async counterpart of a RecipeViewSet read action, for the ASGI
+    deployment. DRF views are synchronous, so these are plain Django views
+    returning the same payloads through the same serializers: rows are read
+    with the async ORM first, and serialization then runs on the event loop
+    without touching the database (anything that did would raise
+    SynchronousOnlyOperation rather than block the loop).
+    """
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != "GET":
+            return HttpResponseNotAllowed(["GET"])
+        # The session lookup is synchronous in Django 4.2
+        request.user = await sync_to_async(get_user)(request)
+        try:
+            return await view(request, *args, **kwargs)
+        except ValidationError as exc:
+            return JsonResponse(exc.detail, status=400)
+    return wrapper
+
+
+def not_found(detail="Not found."):
+    return JsonResponse({"detail": detail}, status=404)
+
+
+async def user_flags(user, recipe_ids, fields):
+    """
+    The serializer's per-user flags for a page, under RecipeSerializer.user_flags
+    keys, for the flag fields among `fields`.
+    """
+    flags = {}
+    if not user.is_authenticated:
+        return flags
+    if "is_liked" in fields:
+        liked = Like.objects.filter(user=user, recipe_id__in=recipe_ids).values_list("recipe_id", flat=True)
+        flags["liked_recipe_ids"] = {recipe_id async for recipe_id in liked}
+    if "is_favorited" in fields:
+        flags["favorited_recipe_ids"] = await sync_to_async(favorited_recipe_ids)(user, recipe_ids)
+    return flags
+
+
+async def serialize_recipes(request, recipes, representation):
+    serializer_class, fields = representation
+    # `async for` and aget() evaluate querysets with _fetch_all() in a thread,
+    # so the tags prefetch of only_rendered() has already run
+    context = {
+        "request": request,
+        "fields": fields,
+        **await user_flags(request.user, [recipe.pk for recipe in recipes], fields),
+    }
+    return serializer_class(recipes, many=True, context=context).data
+
+
+def ordered(queryset, params):
+    # Same rules as filters.OrderingFilter: unknown fields are ignored
+    terms = [
+        term.strip() for term in params.get("ordering", "").split(",")
+        if term.strip().lstrip("-") in RecipeViewSet.ordering_fields
+    ]
+    return queryset.order_by(*terms) if terms else queryset
+
+
+def page_size(request):
+    try:
+        size = int(request.GET[RecipeCursorPagination.page_size_query_param])
+    except (KeyError, ValueError):
+        return RecipeCursorPagination.page_size
+    return min(size, RecipeCursorPagination.max_page_size) if size > 0 else RecipeCursorPagination.page_size
+
+
+async def paginate(request, queryset):
+    """
+    RecipeCursorPagination: cursors for newest-first lists, page numbers otherwise.
+    Returns the response body without "results" and the page.
+    """
+    url = request.build_absolute_uri()
+    if uses_keyset_ordering(queryset):
+        try:
+            recipes, next_cursor = await akeyset_page(queryset, request.GET.get("cursor"), page_size(request))
+        except InvalidCursor:
+            raise NotFound(RecipeCursorPagination.invalid_cursor_message)
+        return {"next": next_cursor and replace_query_param(url, "cursor", next_cursor)}, recipes
+    
+    size = api_settings.PAGE_SIZE
+    try:
+        number = int(request.GET.get("page", 1))
+    except ValueError:
+        raise NotFound("Invalid page.")
+    count = await queryset.acount()
+    if number < 1 or (number > 1 and (number - 1) * size >= count):
+        raise NotFound("Invalid page.")
+    recipes = [recipe async for recipe in queryset[(number - 1) * size:number * size]]
+    body = {
+        "count": count,
+        "next": replace_query_param(url, "page", number + 1) if number * size < count else None,
+        "previous": None,
+    }
+    if number == 2:
+        body["previous"] = remove_query_param(url, "page")
+    elif number > 2:
+        body["previous"] = replace_query_param(url, "page", number - 1)
+    return body, recipes
+
+
+@async_api_view
+async def recipe_list(request):
+    representation = sparse_representation(request.GET, RecipeListSerializer)
+    queryset = visible_recipes(request.user)
+    filterset = RecipeFilterSet(request.GET, queryset=queryset)
+    # Validating ?author= looks the user up
+    if not await sync_to_async(filterset.is_valid)():
+        return JsonResponse(filterset.errors, status=400)
+    queryset = ordered(search_recipes(filterset.qs, request.GET.get("search", "")), request.GET)
+    
+    try:
+        body, recipes = await paginate(request, only_rendered(queryset, *representation))
+    except NotFound as exc:
+        return not_found(exc.detail)
+    body["results"] = await serialize_recipes(request, recipes, representation)
+    if request.GET.get("facets") in ("1", "true"):
+        filters = {key: ",".join(values) for key, values in request.GET.lists() if key not in FACET_IGNORED_PARAMS}
+        filters["user"] = request.user.pk
+        body["facets"] = await sync_to_async(cached_facets)(queryset, filters)
+    return JsonResponse(body)
+
+
+@async_api_view
+async def recipe_detail(request, slug):
+    representation = sparse_representation(request.GET, RecipeSerializer)
+    try:
+        recipe = await only_rendered(visible_recipes(request.user), *representation).aget(slug=slug)
+    except Recipe.DoesNotExist:
+        return not_found()
+    data = await serialize_recipes(request, [recipe], representation)
+    return JsonResponse(data[0])
+
+
+@async_api_view
+async def recipe_comments(request, slug):
+    if not await visible_recipes(request.user).filter(slug=slug).aexists():
+        return not_found()
+    comments = Comment.objects.filter(recipe__slug=slug).select_related("author")
+    data = CommentSerializer([comment async for comment in comments], many=True).data
+    return JsonResponse(data, safe=False)
+
+
+@async_api_view
+async def recipe_trending(request):
+    try:
+        limit = min(max(int(request.GET.get("limit", 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    representation = sparse_representation(request.GET, RecipeListSerializer)
+    recipes = trending_recipes(only_rendered(Recipe.objects.filter(status="published"), *representation), limit=limit)
+    return JsonResponse({
+        "results": await serialize_recipes(request, [recipe async for recipe in recipes], representation)
+    })
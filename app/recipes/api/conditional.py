@@ -0,0 +1,32 @@
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class ConditionalGetMixin:
+    """
+    Answer If-None-Match / If-Modified-Since with 304 before the handler (and so
+    any serializer) runs. Callers pass validators computed from cheap queries.
+    """
+    def conditional_response(self, request, validators, handler, *args, **kwargs):
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        
+        etag, last_modified = validators
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if not 200 <= response.status_code < 300:
+                return response
+        
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        return response
@@ -0,0 +1,42 @@
+from rest_framework.exceptions import ValidationError
+
+from .serializers import RecipeSerializer
+
+
+def _names(params, key):
+    return {name.strip() for name in params.get(key, "").split(",") if name.strip()}
+
+
+def sparse_representation(params, default):
+    """
+    Serializer class and field names to render recipes with, from the comma
+    separated ?fields= (picked from the full RecipeSerializer) and ?omit=
+    (dropped from `default`, or from the ?fields= selection).
+    """
+    requested, omitted = _names(params, "fields"), _names(params, "omit")
+    unknown = (requested | omitted) - set(RecipeSerializer.Meta.fields)
+    if unknown:
+        raise ValidationError({"fields": [f"Unknown fields: {', '.join(sorted(unknown))}."]})
+    serializer_class = RecipeSerializer if requested else default
+    fields = [
+        name for name in serializer_class.Meta.fields
+        if (not requested or name in requested) and name not in omitted
+    ]
+    return serializer_class, fields
+
+
+def only_rendered(queryset, serializer_class, fields):
+    """
+    `queryset` loading only what `fields` read: the author join and the tags
+    prefetch when those are rendered, and just the columns used.
+    """
+    # Keyset cursors are built from created_at
+    columns = {"created_at"}
+    for name in fields:
+        columns.update(serializer_class.source_columns.get(name, [name]))
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if "author" in fields:
+        queryset = queryset.select_related("author")
+    if "tags" in fields:
+        queryset = queryset.prefetch_related("tags")
+    return queryset.only(*columns)
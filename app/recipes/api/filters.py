@@ -0,0 +1,11 @@
+from rest_framework import filters
+
+from recipes.search import search_recipes
+
+
+class RecipeSearchFilter(filters.SearchFilter):
+    """
+    `?search=` backed by the recipe full-text index instead of icontains lookups.
+    """
+    def filter_queryset(self, request, queryset, view):
+        return search_recipes(queryset, request.query_params.get(self.search_param, ""))
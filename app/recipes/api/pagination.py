@@ -0,0 +1,66 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from recipes.pagination import InvalidCursor, keyset_page, uses_keyset_ordering
+
+
+class RecipeCursorPagination(BasePagination):
+    """
+    Opaque cursor pagination over (created_at, id). Querysets ordered some other
+    way (search rank, ?ordering=) fall back to page numbers.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+    fallback_class = PageNumberPagination
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.fallback = None
+        
+        if not uses_keyset_ordering(queryset):
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+        
+        try:
+            page, self.next_cursor = keyset_page(
+                queryset, request.query_params.get(self.cursor_query_param), self.get_page_size(request)
+            )
+        except InvalidCursor:
+            raise NotFound(self.invalid_cursor_message)
+        return page
+    
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+    
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+    
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
+    
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
@@ -1,13 +1,20 @@
 from rest_framework import serializers
 from taggit.serializers import TagListSerializerField, TaggitSerializer
 from django.contrib.auth import get_user_model
-from recipes.models import Recipe, Comment, Like
+from django.db import models
+from recipes.models import Recipe, Comment
+from recipes.services import favorited_recipe_ids, liked_recipe_ids
 
 
 class UserSerializer(serializers.ModelSerializer):
+    avatar = serializers.SerializerMethodField()
+    
     class Meta:
         model = get_user_model()
-        fields = ["id", "username", "first_name", "last_name"]
+        fields = ["id", "username", "first_name", "last_name", "avatar"]
+    
+    def get_avatar(self, obj):
+        return obj.get_profile_picture_sources()
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -18,28 +25,134 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ["id", "author", "text", "created_at"]
 
 
-class RecipeSerializer(TaggitSerializer, serializers.ModelSerializer):
+class UserFlagsListSerializer(serializers.ListSerializer):
+    """
+    Resolves the child's per-user `user_flags` for the whole page up front, one
+    query per flag, and stores the id sets in the serializer context.
+    """
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        request = self.context.get("request")
+        
+        if request and request.user.is_authenticated:
+            object_ids = [item.pk for item in items]
+            for key, resolver in self.child.user_flags.items():
+                # Flags already present in the context (e.g. precomputed by the
+                # caller) win, and flags of fields left out are not resolved
+                if key not in self.context and self.child.user_flag_fields[key] in self.child.fields:
+                    self.context[key] = resolver(request.user, object_ids)
+        
+        return super().to_representation(items)
+
+
+class SparseFieldsMixin:
+    """
+    Renders only the fields named in the context's "fields", when given
+    (see recipes.api.fields).
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get("fields")
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
+
+
+class RecipeSerializer(SparseFieldsMixin, TaggitSerializer, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     tags = TagListSerializerField()
-    likes_count = serializers.IntegerField(source="total_likes", read_only=True)
-    comments_count = serializers.IntegerField(source="total_comments", read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    favorites_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
+    is_favorited = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
+    
+    user_flags = {
+        "liked_recipe_ids": liked_recipe_ids,
+        "favorited_recipe_ids": favorited_recipe_ids,
+    }
+    user_flag_fields = {
+        "liked_recipe_ids": "is_liked",
+        "favorited_recipe_ids": "is_favorited",
+    }
+    
+    # Model fields each output field reads, where not the field of the same
+    # name; used to load only the columns a response renders
+    source_columns = {
+        # UserSerializer's fields, so the author join skips password, email, bio...
+        "author": [
+            "author__id", "author__username", "author__first_name", "author__last_name",
+            "author__profile_picture", "author__profile_picture_variants",
+        ],
+        "images": ["image", "image_variants"],
+        "is_liked": [],
+        "is_favorited": [],
+        "tags": [],
+    }
     
     class Meta:
         model = Recipe
         fields = [
             "id", "title", "slug", "author", "description", "ingredients", 
             "instructions", "cooking_time", "servings", "difficulty", 
-            "image", "created_at", "updated_at", "tags", "likes_count", 
-            "comments_count", "is_liked"
+            "image", "images", "created_at", "updated_at", "tags", "likes_count", 
+            "comments_count", "favorites_count", "is_liked", "is_favorited"
         ]
         read_only_fields = ["id", "slug", "created_at", "updated_at"]
+        list_serializer_class = UserFlagsListSerializer
     
-    def get_is_liked(self, obj):
+    def get_user_flag(self, obj, key):
         request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return Like.objects.filter(recipe=obj, user=request.user).exists()
-        return False
+        if not (request and request.user.is_authenticated):
+            return False
+        
+        object_ids = self.context.get(key)
+        if object_ids is None:
+            object_ids = self.user_flags[key](request.user, [obj.pk])
+        return obj.pk in object_ids
+    
+    def get_is_liked(self, obj):
+        return self.get_user_flag(obj, "liked_recipe_ids")
+    
+    def get_is_favorited(self, obj):
+        return self.get_user_flag(obj, "favorited_recipe_ids")
+    
+    def get_images(self, obj):
+        return obj.get_image_sources()
+
+
+class RecipeListSerializer(RecipeSerializer):
+    """
+    Compact card representation for recipe lists: no ingredients,
+    instructions or raw image path. The full text stays in the detail
+    representation and can be asked for with ?fields=.
+    """
+    class Meta(RecipeSerializer.Meta):
+        fields = [
+            "id", "title", "slug", "author", "description", "cooking_time", "difficulty",
+            "images", "created_at", "tags", "likes_count", "comments_count", "favorites_count",
+            "is_liked", "is_favorited"
+        ]
+
+
+class PantryRecipeSerializer(RecipeSerializer):
+    """
+    Recipe annotated by recipes.ingredients.pantry_search; the missing
+    ingredient names for the page are passed in the context.
+    """
+    matched_count = serializers.IntegerField(read_only=True)
+    missing_count = serializers.IntegerField(read_only=True)
+    coverage = serializers.FloatField(read_only=True)
+    missing_ingredients = serializers.SerializerMethodField()
+    
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + [
+            "matched_count", "missing_count", "coverage", "missing_ingredients"
+        ]
+    
+    def get_missing_ingredients(self, obj):
+        return self.context.get("missing_ingredients", {}).get(obj.pk, [])
 
 
 class RecipeCreateUpdateSerializer(TaggitSerializer, serializers.ModelSerializer):
@@ -49,8 +162,10 @@ class RecipeCreateUpdateSerializer(TaggitSerializer, serializers.ModelSerializer
         model = Recipe
         fields = [
             "title", "description", "ingredients", "instructions", 
-            "cooking_time", "servings", "difficulty", "image", "tags", "status"
+            "cooking_time", "servings", "difficulty", "image", "tags", "status", "slug"
         ]
+        # Allocated by Recipe.save
+        read_only_fields = ["slug"]
     
     def create(self, validated_data):
         validated_data["author"] = self.context["request"].user
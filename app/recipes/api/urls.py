@@ -1,10 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r"recipes", views.RecipeViewSet)
 
 urlpatterns = [
+    # Async read endpoints for the ASGI deployment (uvicorn core.asgi:application)
+    path("async/recipes/", async_views.recipe_list, name="async-recipe-list"),
+    path("async/recipes/trending/", async_views.recipe_trending, name="async-recipe-trending"),
+    path("async/recipes/<str:slug>/", async_views.recipe_detail, name="async-recipe-detail"),
+    path("async/recipes/<str:slug>/comments/", async_views.recipe_comments, name="async-recipe-comments"),
     path("", include(router.urls)),
-] 
\ No newline at end of file
+]
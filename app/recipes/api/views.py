@@ -1,10 +1,43 @@
+from datetime import timezone as dt_timezone
+
 from rest_framework import viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from recipes.models import Recipe, Comment, Like
-from .serializers import RecipeSerializer, CommentSerializer, RecipeCreateUpdateSerializer
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from recipes import services
+from recipes.cache import LIST_GROUP, group_versions
+from recipes.export import RENDERERS, export_response
+from recipes.facets import cached_facets
+from recipes.ingredients import missing_ingredients, pantry_search
+from recipes.similarity import similar_recipes
+from recipes.trending import trending_recipes
+from recipes.models import Recipe, Comment
+from .conditional import ConditionalGetMixin, make_etag
+from .fields import only_rendered, sparse_representation
+from .filters import RecipeSearchFilter
+from .pagination import RecipeCursorPagination
+from .serializers import (
+    RecipeSerializer, RecipeListSerializer, CommentSerializer, RecipeCreateUpdateSerializer,
+    PantryRecipeSerializer
+)
+
+
+FACET_IGNORED_PARAMS = {"cursor", "page", "page_size", "ordering", "facets", "format", "fields", "omit"}
+
+# Read actions taking ?fields= / ?omit=; the list ones default to RecipeListSerializer
+LIST_ACTIONS = {"list", "trending", "similar", "my_recipes", "my_drafts", "my_favorites"}
+SPARSE_ACTIONS = LIST_ACTIONS | {"retrieve"}
+
+
+def visible_recipes(user):
+    # Show drafts only to their authors
+    if user.is_authenticated:
+        return Recipe.objects.filter(status="published") | Recipe.objects.filter(author=user)
+    return Recipe.objects.filter(status="published")
 
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
@@ -20,44 +53,205 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
         return obj.author == request.user
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for recipes.
     """
     queryset = Recipe.objects.filter(status="published")
     serializer_class = RecipeSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, RecipeSearchFilter, filters.OrderingFilter]
     filterset_fields = ["difficulty", "cooking_time", "author"]
-    search_fields = ["title", "description", "ingredients", "tags__name"]
     ordering_fields = ["created_at", "cooking_time", "title"]
+    pagination_class = RecipeCursorPagination
     lookup_field = "slug"
     
     def get_serializer_class(self):
         if self.action in ["create", "update", "partial_update"]:
             return RecipeCreateUpdateSerializer
+        if self.action in SPARSE_ACTIONS:
+            return self.representation()[0]
         return RecipeSerializer
     
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context.update({"request": self.request})
+        if self.action in SPARSE_ACTIONS:
+            context["fields"] = self.representation()[1]
         return context
     
+    def representation(self):
+        """
+        Serializer class and fields a read action renders, see recipes.api.fields.
+        """
+        if not hasattr(self, "_representation"):
+            default = RecipeListSerializer if self.action in LIST_ACTIONS else RecipeSerializer
+            self._representation = sparse_representation(self.request.query_params, default)
+        return self._representation
+    
+    def rendered_only(self, queryset):
+        return only_rendered(queryset, *self.representation())
+    
     def get_queryset(self):
-        queryset = Recipe.objects.all()
+        queryset = visible_recipes(self.request.user)
+        if self.action in SPARSE_ACTIONS:
+            # Only reads: saving an instance with deferred fields would save just the loaded ones
+            return self.rendered_only(queryset)
+        return queryset.select_related("author").prefetch_related("tags")
+    
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.list_validators(), self.list_with_facets, *args, **kwargs)
+    
+    def list_with_facets(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get("facets") in ("1", "true"):
+            response.data["facets"] = cached_facets(self.filter_queryset(self.get_queryset()), self.facet_filters())
+        return response
+    
+    def facet_filters(self):
+        # Paging and ordering do not change the counts; drafts are visible to
+        # their author, so signed-in users get their own entries
+        filters = {
+            key: ",".join(values) for key, values in self.request.query_params.lists()
+            if key not in FACET_IGNORED_PARAMS
+        }
+        filters["user"] = self.request.user.pk
+        return filters
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.detail_validators(), super().retrieve, *args, **kwargs)
+    
+    def representation_key(self):
+        # Everything besides the data that changes the body: path, query
+        # (?fields=, filters, paging) and renderer
+        return self.request.path, self.request.GET.urlencode(), self.request.accepted_renderer.format
+    
+    def list_validators(self):
+        # The newest updated_at of any recipe, one lookup on recipe_updated_idx
+        # whatever the filters, plus the recipe-list cache version, which
+        # deletes, tag changes and (throttled) count changes bump. Coarser
+        # than the filtered rows, but constant in cost.
+        last_modified = Recipe.objects.aggregate(last_modified=Max("updated_at"))["last_modified"]
+        version = group_versions([LIST_GROUP])[LIST_GROUP]
+        etag = make_etag(*self.representation_key(), self.request.user.pk, last_modified, version)
+        return etag, last_modified
+    
+    def detail_validators(self, **annotations):
+        # Counter writes leave updated_at alone, so the counters go into the
+        # ETag; Last-Modified only follows edits (and the annotated dates)
+        row = (
+            self.get_queryset()
+            .filter(**{self.lookup_field: self.kwargs[self.lookup_field]})
+            .annotate(**annotations)
+            .values_list("pk", "likes_count", "comments_count", "favorites_count", "updated_at", *annotations)
+            .first()
+        )
+        if row is None:
+            return None
+        last_modified = max(value for value in row[4:] if value is not None)
+        return make_etag(*self.representation_key(), self.request.user.pk, *row), last_modified
+    
+    def paginated_response(self, queryset):
+        page = self.paginate_queryset(self.rendered_only(queryset))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    @action(detail=False, methods=["get"])
+    def trending(self, request):
+        """
+        Most popular published recipes right now, read from the precomputed scores.
+        """
+        try:
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            limit = 20
+        recipes = trending_recipes(self.rendered_only(Recipe.objects.filter(status="published")), limit=limit)
+        serializer = self.get_serializer(recipes, many=True)
+        return Response({"results": serializer.data})
+    
+    @action(detail=False, methods=["get"])
+    def pantry(self, request):
+        """
+        "Cook with what I have": ?ingredients=egg,spinach,feta[&max_missing=2&limit=20].
+        Recipes needing the fewest extra ingredients come first.
+        """
+        pantry = [item for item in request.query_params.get("ingredients", "").split(",") if item.strip()]
+        if not pantry:
+            return Response(
+                {"detail": "Pass a comma separated list of ingredients."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            max_missing = request.query_params.get("max_missing")
+            max_missing = int(max_missing) if max_missing else None
+            limit = min(max(int(request.query_params.get("limit", 20)), 1), 100)
+        except ValueError:
+            return Response(
+                {"detail": "max_missing and limit must be integers."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Show drafts only to their authors
-        if self.request.user.is_authenticated:
-            queryset = Recipe.objects.filter(status="published") | Recipe.objects.filter(author=self.request.user)
-        else:
-            queryset = Recipe.objects.filter(status="published")
+        recipes = pantry_search(
+            Recipe.objects.filter(status="published").select_related("author").prefetch_related("tags"),
+            pantry, max_missing=max_missing, limit=limit,
+        )
+        context = self.get_serializer_context()
+        context["missing_ingredients"] = missing_ingredients([recipe.pk for recipe in recipes], pantry)
+        serializer = PantryRecipeSerializer(recipes, many=True, context=context)
+        return Response({"results": serializer.data})
+    
+    @action(detail=True, methods=["get"])
+    def similar(self, request, slug=None):
+        """
+        Precomputed similar recipes, best match first.
+        """
+        recipes = similar_recipes(self.get_object(), limit=12)
+        serializer = self.get_serializer(self.rendered_only(recipes), many=True)
+        return Response({"results": serializer.data})
+    
+    @action(detail=False, methods=["get"], permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        """
+        Stream all published recipes as NDJSON (default) or CSV.
         
-        return queryset
+        Query parameters: output=ndjson|csv, gzip=1, since=<ISO datetime of
+        the last updated_at already pulled; UTC without an offset>.
+        """
+        output = request.query_params.get("output", "ndjson")
+        if output not in RENDERERS:
+            return Response(
+                {"detail": f"Unsupported output {output!r}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        since = request.query_params.get("since")
+        if since:
+            try:
+                since = parse_datetime(since.replace(" ", "+"))
+            except ValueError:
+                # Well formed but impossible, like February 30th
+                since = None
+            if since is None:
+                return Response(
+                    {"detail": "since must be an ISO 8601 datetime."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, dt_timezone.utc)
+        return export_response(
+            Recipe.objects.filter(status="published"),
+            format=output,
+            since=since,
+            compress=request.query_params.get("gzip") in ("1", "true"),
+        )
     
     @action(detail=True, methods=["get"])
     def comments(self, request, slug=None):
+        validators = self.detail_validators(last_comment=Max("comments__updated_at"))
+        return self.conditional_response(request, validators, self.list_comments, slug=slug)
+    
+    def list_comments(self, request, slug=None):
         recipe = self.get_object()
-        comments = Comment.objects.filter(recipe=recipe)
+        comments = Comment.objects.filter(recipe=recipe).select_related("author")
         serializer = CommentSerializer(comments, many=True)
         return Response(serializer.data)
     
@@ -67,23 +261,67 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = CommentSerializer(data=request.data)
         
         if serializer.is_valid():
-            serializer.save(author=request.user, recipe=recipe)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            comment = services.add_comment(recipe, request.user, serializer.validated_data["text"])
+            return Response(CommentSerializer(comment).data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    @action(detail=True, methods=["post"])
+    def like_target(self):
+        # Only what the like services need; liking is open to every signed-in
+        # user who can see the recipe, not just its author
+        return get_object_or_404(
+            self.get_queryset().select_related(None).prefetch_related(None)
+            .only("pk", "slug", "author_id", "likes_count"),
+            slug=self.kwargs["slug"],
+        )
+    
+    @action(detail=True, methods=["put", "delete"], permission_classes=[permissions.IsAuthenticated])
+    def like(self, request, slug=None):
+        """
+        PUT likes the recipe, DELETE removes the like; both are idempotent and
+        answer with the resulting state.
+        """
+        recipe = self.like_target()
+        if request.method == "PUT":
+            changed = services.like_recipe(recipe, request.user)
+            liked = True
+        else:
+            changed = services.unlike_recipe(recipe, request.user)
+            liked = False
+        return Response(
+            {"liked": liked, "likes_count": recipe.likes_count},
+            status=status.HTTP_201_CREATED if liked and changed else status.HTTP_200_OK,
+        )
+    
+    @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
     def toggle_like(self, request, slug=None):
-        recipe = self.get_object()
-        user = request.user
+        recipe = self.like_target()
         
-        try:
-            like = Like.objects.get(recipe=recipe, user=user)
-            like.delete()
-            return Response({"status": "unliked"}, status=status.HTTP_200_OK)
-        except Like.DoesNotExist:
-            Like.objects.create(recipe=recipe, user=user)
-            return Response({"status": "liked"}, status=status.HTTP_201_CREATED)
+        if services.toggle_like(recipe, request.user):
+            return Response({"status": "liked", "likes_count": recipe.likes_count}, status=status.HTTP_201_CREATED)
+        return Response({"status": "unliked", "likes_count": recipe.likes_count}, status=status.HTTP_200_OK)
+    
+    @action(detail=True, methods=["put", "delete"], permission_classes=[permissions.IsAuthenticated])
+    def favorite(self, request, slug=None):
+        """
+        PUT adds the recipe to the user's favorites, DELETE takes it out; both
+        are idempotent, like `like`.
+        """
+        recipe = get_object_or_404(
+            self.get_queryset().select_related(None).prefetch_related(None)
+            .only("pk", "slug", "favorites_count"),
+            slug=slug,
+        )
+        if request.method == "PUT":
+            changed = services.favorite_recipe(recipe, request.user)
+            favorited = True
+        else:
+            changed = services.unfavorite_recipe(recipe, request.user)
+            favorited = False
+        return Response(
+            {"favorited": favorited, "favorites_count": recipe.favorites_count},
+            status=status.HTTP_201_CREATED if favorited and changed else status.HTTP_200_OK,
+        )
     
     @action(detail=False, methods=["get"])
     def my_recipes(self, request):
@@ -93,11 +331,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        recipes = Recipe.objects.filter(author=request.user)
-        serializer = RecipeSerializer(
-            recipes, many=True, context={"request": request}
-        )
-        return Response(serializer.data)
+        return self.paginated_response(Recipe.objects.filter(author=request.user))
     
     @action(detail=False, methods=["get"])
     def my_drafts(self, request):
@@ -107,11 +341,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        recipes = Recipe.objects.filter(author=request.user, status="draft")
-        serializer = RecipeSerializer(
-            recipes, many=True, context={"request": request}
-        )
-        return Response(serializer.data)
+        return self.paginated_response(Recipe.objects.filter(author=request.user, status="draft"))
     
     @action(detail=False, methods=["get"])
     def my_favorites(self, request):
@@ -121,8 +351,4 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        recipes = request.user.favorite_recipes.all()
-        serializer = RecipeSerializer(
-            recipes, many=True, context={"request": request}
-        )
-        return Response(serializer.data) 
\ No newline at end of file
+        return self.paginated_response(request.user.favorite_recipes.all()) 
\ No newline at end of file
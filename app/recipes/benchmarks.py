@@ -0,0 +1,152 @@
+import random
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.db import connections
+
+from .models import Recipe
+
+
+WORDS = [
+    "chicken", "beef", "pork", "tofu", "salmon", "shrimp", "lentil", "chickpea",
+    "rice", "noodle", "pasta", "potato", "tomato", "onion", "garlic", "ginger",
+    "basil", "cilantro", "lemon", "lime", "butter", "cream", "cheese", "spinach",
+    "mushroom", "pepper", "chili", "curry", "coconut", "honey", "soy", "sesame",
+    "roasted", "grilled", "braised", "spicy", "smoky", "crispy", "creamy", "quick",
+]
+
+
+def synthetic_fields(rng):
+    """
+    Title, text and numbers of a random recipe drawn from `rng` (a random.Random).
+    """
+    title_words = rng.sample(WORDS, 3)
+    return {
+        "title": " ".join(title_words).title(),
+        "description": " ".join(rng.choices(WORDS, k=12)),
+        "ingredients": "\n".join(rng.sample(WORDS, 6)),
+        "instructions": "\n".join(" ".join(rng.choices(WORDS, k=8)) for _ in range(4)),
+        "cooking_time": rng.randint(5, 180),
+        "servings": rng.randint(1, 8),
+        "difficulty": rng.choice(["easy", "medium", "hard"]),
+    }
+
+
+def synthetic_recipes(count, author, start=0, seed=0):
+    """
+    Yield unsaved published recipes with a small food vocabulary, deterministic per seed.
+    """
+    rng = random.Random(seed + start)
+    for i in range(start, start + count):
+        yield Recipe(slug=f"bench-{author.pk}-{i}", author=author, status="published", **synthetic_fields(rng))
+
+
+def seed_recipes(count, author, start=0, batch_size=5000):
+    """
+    Bulk insert `count` synthetic recipes in batches and return how many were created.
+    """
+    created = 0
+    batch = []
+    for recipe in synthetic_recipes(count, author, start=start):
+        batch.append(recipe)
+        if len(batch) >= batch_size:
+            created += len(Recipe.objects.bulk_create(batch))
+            batch = []
+    if batch:
+        created += len(Recipe.objects.bulk_create(batch))
+    return created
+
+
+def time_call(func, repeat=5):
+    """
+    Run `func` once to warm up, then `repeat` times; return timings in milliseconds.
+    """
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "min": samples[0],
+        "p50": statistics.median(samples),
+        "max": samples[-1],
+    }
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class QueryRecorder:
+    """
+    Counts the queries run on any database alias inside the block, and the time spent in them.
+    """
+    def __enter__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._wrappers = ExitStack()
+        for alias in connections:
+            self._wrappers.enter_context(connections[alias].execute_wrapper(self))
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._wrappers.close()
+    
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def measure_request(client, path, repeat=30, cold_cache=True):
+    """
+    GET `path` with a test client once to warm up, then `repeat` times.
+    Returns the queries per request, median DB time, p50/p99 latency (ms)
+    and the peak memory allocated while serving one request (KiB). With
+    `cold_cache` the cache is cleared before each request, so cached pages
+    and facets do not hide the work being measured.
+    """
+    def get():
+        if cold_cache:
+            cache.clear()
+        response = client.get(path)
+        if response.status_code != 200:
+            raise BenchmarkError(f"GET {path} returned {response.status_code}")
+    
+    get()
+    samples, queries, db_times = [], [], []
+    for _ in range(repeat):
+        with QueryRecorder() as recorder:
+            started = time.perf_counter()
+            get()
+            samples.append((time.perf_counter() - started) * 1000)
+        queries.append(recorder.count)
+        db_times.append(recorder.seconds * 1000)
+    
+    # Measured separately: tracing allocations slows the request down
+    tracemalloc.start()
+    try:
+        get()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "queries": max(queries),
+        "db_ms": statistics.median(db_times),
+        "p50_ms": percentile(samples, 0.50),
+        "p99_ms": percentile(samples, 0.99),
+        "peak_kb": peak / 1024,
+    }
@@ -0,0 +1,85 @@
+from collections import Counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from taggit.models import TaggedItem
+
+from . import services
+from .cache import LIST_GROUP, invalidate_groups
+from .importer import chunked, copy_insert
+from .models import Recipe, RecipeIngredient
+from .search import update_search_vectors
+from .slugs import allocate_slugs
+from .stats import record_recipes
+
+
+BATCH_SIZE = 1000
+
+# Copied as is; counters, search vector and timestamps start fresh
+COPIED_FIELDS = (
+    "description", "ingredients", "instructions", "cooking_time", "servings", "difficulty",
+    "image", "image_variants", "ingredient_count",
+)
+
+_TITLE_MAX_LENGTH = Recipe._meta.get_field("title").max_length
+
+
+def duplicate_recipes(recipe_ids, batch_size=BATCH_SIZE, progress=None):
+    """
+    Copy recipes as drafts titled "Copy of ...", with their tags and
+    ingredient index, using a fixed number of statements per batch.
+    Returns the number of copies made.
+    """
+    content_type = ContentType.objects.get_for_model(Recipe)
+    done = copied = 0
+    for batch in chunked(recipe_ids, batch_size):
+        with transaction.atomic():
+            sources = list(Recipe.objects.filter(pk__in=batch).order_by("pk"))
+            titles = [f"Copy of {source.title}"[:_TITLE_MAX_LENGTH] for source in sources]
+            copies = copy_insert(Recipe, [
+                Recipe(
+                    title=title,
+                    slug=slug,
+                    author_id=source.author_id,
+                    status="draft",
+                    **{field: getattr(source, field) for field in COPIED_FIELDS},
+                )
+                for source, title, slug in zip(sources, titles, allocate_slugs(titles))
+            ])
+            copy_of = {source.pk: copy.pk for source, copy in zip(sources, copies)}
+            
+            copy_insert(TaggedItem, [
+                TaggedItem(content_type=content_type, object_id=copy_of[object_id], tag_id=tag_id)
+                for object_id, tag_id in TaggedItem.objects.filter(
+                    content_type=content_type, object_id__in=copy_of
+                ).values_list("object_id", "tag_id")
+            ])
+            copy_insert(RecipeIngredient, [
+                RecipeIngredient(recipe_id=copy_of[recipe_id], ingredient_id=ingredient_id, recipe_size=size)
+                for recipe_id, ingredient_id, size in RecipeIngredient.objects.filter(
+                    recipe_id__in=copy_of
+                ).values_list("recipe_id", "ingredient_id", "recipe_size")
+            ])
+            update_search_vectors(list(copy_of.values()))
+            record_recipes(Counter((copy.author_id, None, copy.status) for copy in copies))
+            invalidate_groups(LIST_GROUP)
+        
+        done += len(batch)
+        copied += len(copies)
+        if progress:
+            progress(done, len(recipe_ids))
+    return copied
+
+
+def reset_likes(recipe_ids, batch_size=BATCH_SIZE, progress=None):
+    """
+    services.reset_likes over many recipes, one DELETE and one counter
+    UPDATE per batch.
+    """
+    done = 0
+    for batch in chunked(recipe_ids, batch_size):
+        services.reset_likes(Recipe.objects.filter(pk__in=batch))
+        done += len(batch)
+        if progress:
+            progress(done, len(recipe_ids))
+    return done
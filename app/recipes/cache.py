@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+
+from core.metrics import CACHE_LOOKUPS
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "pagecache"
+LIST_GROUP = "recipe-lists"
+STAT_NAMES = ("hit", "miss", "stale")
+
+
+def recipe_group(slug):
+    return f"recipe:{slug}"
+
+
+def _group_key(group):
+    return f"{KEY_PREFIX}:group:{group}"
+
+
+def _stat_key(name):
+    return f"{KEY_PREFIX}:stats:{name}"
+
+
+def group_versions(groups):
+    """
+    Current version of each invalidation group. Missing versions are seeded with
+    a timestamp so an evicted counter can never match entries stored before it.
+    """
+    keys = {_group_key(group): group for group in groups}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def _bump(groups):
+    for group in groups:
+        try:
+            cache.incr(_group_key(group))
+        except ValueError:
+            cache.set(_group_key(group), time.time_ns(), timeout=None)
+
+
+def invalidate_groups(*groups):
+    """
+    Bump the version of each group once the current transaction commits, so every
+    page cached under the old version becomes a miss.
+    """
+    transaction.on_commit(lambda: _bump(groups))
+
+
+def invalidate_recipe_pages(*slugs):
+    invalidate_groups(*(recipe_group(slug) for slug in slugs if slug), LIST_GROUP)
+
+
+def invalidate_recipe_counts(*slugs):
+    """
+    Invalidate pages after a like, favorite or comment count changed. The
+    recipes' own pages are bumped every time; the lists, which every count
+    change would otherwise empty, at most once per PAGE_CACHE_COUNTS_INTERVAL.
+    """
+    def bump():
+        _bump([recipe_group(slug) for slug in slugs if slug])
+        if cache.add(f"{KEY_PREFIX}:counts-throttle", 1, timeout=settings.PAGE_CACHE_COUNTS_INTERVAL):
+            _bump([LIST_GROUP])
+    
+    transaction.on_commit(bump)
+
+
+def _count(name):
+    CACHE_LOOKUPS.labels("page", name).inc()
+    try:
+        cache.incr(_stat_key(name))
+    except ValueError:
+        cache.add(_stat_key(name), 1, timeout=None)
+
+
+def page_cache_stats():
+    values = cache.get_many([_stat_key(name) for name in STAT_NAMES])
+    return {name: values.get(_stat_key(name), 0) for name in STAT_NAMES}
+
+
+def reset_page_cache_stats():
+    cache.delete_many([_stat_key(name) for name in STAT_NAMES])
+
+
+def page_cache_key(request):
+    """
+    Cache key for a request: path plus its non-empty query params in sorted order.
+    """
+    params = sorted(
+        (name, value) for name, values in request.GET.lists() for value in values if value != ""
+    )
+    raw = request.path + "?" + "&".join(f"{name}={value}" for name, value in params)
+    return f"{KEY_PREFIX}:page:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def _is_cacheable_request(request):
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        # Anonymous visitors with a session may have pending flash messages
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+def _is_cacheable_response(response):
+    return response.status_code == 200 and not response.cookies and not response.streaming
+
+
+def anonymous_page_cache(get_groups, timeout=None, stale_timeout=None):
+    """
+    Cache a view's full response for anonymous visitors.
+    
+    Entries are fresh for `timeout` seconds and then served stale for up to
+    `stale_timeout` more while a background thread re-renders them. `get_groups`
+    receives the view arguments and names the invalidation groups the page
+    belongs to; bumping any of them turns the entry into a miss.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not _is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+            
+            fresh_for = settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout
+            stale_for = settings.PAGE_CACHE_STALE_TIMEOUT if stale_timeout is None else stale_timeout
+            key = page_cache_key(request)
+            versions = group_versions(get_groups(request, *args, **kwargs))
+            
+            def render_and_store():
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, "render") and callable(response.render):
+                    response.render()
+                if _is_cacheable_response(response):
+                    entry = (response, versions, time.time() + fresh_for)
+                    cache.set(key, entry, fresh_for + stale_for)
+                return response
+            
+            entry = cache.get(key)
+            if entry is None or entry[1] != versions:
+                _count("miss")
+                response = render_and_store()
+                response["X-Page-Cache"] = "MISS"
+                return response
+            
+            response, _, fresh_until = entry
+            if time.time() <= fresh_until:
+                _count("hit")
+                response["X-Page-Cache"] = "HIT"
+                return response
+            
+            _count("stale")
+            if cache.add(f"{key}:revalidating", 1, timeout=fresh_for or 30):
+                threading.Thread(
+                    target=_revalidate, args=(render_and_store, key), daemon=True
+                ).start()
+            response["X-Page-Cache"] = "STALE"
+            return response
+        
+        return wrapper
+    
+    return decorator
+
+
+def _revalidate(render_and_store, key):
+    try:
+        render_and_store()
+    except Exception:
+        logger.exception("Background revalidation of %s failed", key)
+    finally:
+        cache.delete(f"{key}:revalidating")
+        connections.close_all()
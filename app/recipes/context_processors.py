@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from .services import favorite_recipe_ids
+
+
+def favorites(request):
+    """
+    `favorite_recipe_ids` for rendering heart states on recipe cards
+    ({% if recipe.pk in favorite_recipe_ids %}). Read from the cache only
+    when a template uses it.
+    """
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated):
+        return {"favorite_recipe_ids": frozenset()}
+    return {"favorite_recipe_ids": SimpleLazyObject(lambda: favorite_recipe_ids(user))}
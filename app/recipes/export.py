@@ -0,0 +1,136 @@
+import csv
+import zlib
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from taggit.models import TaggedItem
+
+from .models import Recipe
+
+
+EXPORT_FIELDS = {
+    "id": "id",
+    "slug": "slug",
+    "title": "title",
+    "author": "author__username",
+    "description": "description",
+    "ingredients": "ingredients",
+    "instructions": "instructions",
+    "cooking_time": "cooking_time",
+    "servings": "servings",
+    "difficulty": "difficulty",
+    "status": "status",
+    "likes_count": "likes_count",
+    "comments_count": "comments_count",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_rows(queryset, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield one dict per recipe, oldest change first so a pull can resume from
+    the last updated_at it saw (rows at exactly `since` are sent again).
+    
+    Rows are read through a server-side cursor and tags are fetched with one
+    query per chunk, so memory stays flat however large the catalog is.
+    """
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    rows = (
+        queryset.order_by("updated_at", "id")
+        .values_list(*EXPORT_FIELDS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+    content_type = ContentType.objects.get_for_model(Recipe)
+    names = list(EXPORT_FIELDS)
+    
+    while chunk := list(islice(rows, chunk_size)):
+        tags = {}
+        for object_id, name in TaggedItem.objects.filter(
+            content_type=content_type, object_id__in=[row[0] for row in chunk]
+        ).values_list("object_id", "tag__name"):
+            tags.setdefault(object_id, []).append(name)
+        for row in chunk:
+            record = dict(zip(names, row))
+            record["tags"] = sorted(tags.get(row[0], []))
+            yield record
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def render_ndjson(records):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record in records:
+        yield encoder.encode(record) + "\n"
+
+
+def render_csv(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([*EXPORT_FIELDS, "tags"])
+    for record in records:
+        record["tags"] = ",".join(record["tags"])
+        record["created_at"] = record["created_at"].isoformat()
+        record["updated_at"] = record["updated_at"].isoformat()
+        yield writer.writerow(record.values())
+
+
+RENDERERS = {
+    "ndjson": render_ndjson,
+    "csv": render_csv,
+}
+
+
+def buffered(lines, size=64 * 1024):
+    """
+    Join rendered lines into blocks of roughly `size` bytes to avoid one
+    write (and one gzip flush) per row.
+    """
+    block, length = [], 0
+    for line in lines:
+        data = line.encode()
+        block.append(data)
+        length += len(data)
+        if length >= size:
+            yield b"".join(block)
+            block, length = [], 0
+    if block:
+        yield b"".join(block)
+
+
+def gzipped(blocks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(queryset, format="ndjson", since=None, compress=False):
+    """
+    Stream `queryset` as NDJSON or CSV, optionally gzip-compressed.
+    """
+    content = buffered(RENDERERS[format](export_rows(queryset, since=since)))
+    filename = f"recipes-{timezone.now():%Y%m%d-%H%M%S}.{format}"
+    if compress:
+        content = gzipped(content)
+        filename += ".gz"
+    response = StreamingHttpResponse(
+        content, content_type="application/gzip" if compress else CONTENT_TYPES[format]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,117 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Count, Q
+from taggit.models import TaggedItem
+
+from core.metrics import count_cache_lookup
+
+from .cache import KEY_PREFIX, LIST_GROUP, group_versions
+from .models import Recipe
+
+
+TAG_FACET_SIZE = 20
+
+# (key, label, lower bound inclusive, upper bound exclusive) in minutes
+COOKING_TIME_BUCKETS = [
+    ("under-15", "Under 15 min", None, 15),
+    ("15-30", "15-30 min", 15, 30),
+    ("30-60", "30-60 min", 30, 60),
+    ("over-60", "Over 1 hour", 60, None),
+]
+
+
+def _bucket_filter(lower, upper):
+    condition = Q()
+    if lower is not None:
+        condition &= Q(cooking_time__gte=lower)
+    if upper is not None:
+        condition &= Q(cooking_time__lt=upper)
+    return condition
+
+
+def compute_facets(queryset):
+    """
+    Tag, difficulty and cooking-time counts over `queryset`, one grouped
+    query per facet. The queryset is reduced to its primary keys first, so
+    joins, distinct() or search ranking on it do not inflate the counts.
+    """
+    matching = queryset.order_by().values("pk")
+    recipes = Recipe.objects.filter(pk__in=matching)
+    
+    tags = (
+        TaggedItem.objects.filter(content_type=ContentType.objects.get_for_model(Recipe), object_id__in=matching)
+        .values("tag__name", "tag__slug")
+        .annotate(count=Count("pk"))
+        .order_by("-count", "tag__name")[:TAG_FACET_SIZE]
+    )
+    difficulties = dict(
+        recipes.order_by().values_list("difficulty").annotate(count=Count("pk"))
+    )
+    buckets = recipes.aggregate(**{
+        key: Count("pk", filter=_bucket_filter(lower, upper))
+        for key, label, lower, upper in COOKING_TIME_BUCKETS
+    })
+    return {
+        "tags": [
+            {"name": row["tag__name"], "slug": row["tag__slug"], "count": row["count"]} for row in tags
+        ],
+        "difficulty": [
+            {"value": value, "label": label, "count": difficulties.get(value, 0)}
+            for value, label in Recipe.DIFFICULTY_CHOICES
+        ],
+        "cooking_time": [
+            {"value": key, "label": label, "count": buckets[key]}
+            for key, label, lower, upper in COOKING_TIME_BUCKETS
+        ],
+    }
+
+
+# Filters matched case-insensitively (full-text search, choice values);
+# tag names are matched exactly, so "Vegan" and "vegan" differ
+CASE_INSENSITIVE_FILTERS = {"query", "search", "difficulty"}
+
+
+def normalize_filters(filters):
+    """
+    Canonical form of a filter combination: empty values dropped,
+    case-insensitive filters lower-cased, comma separated lists sorted, so
+    equivalent requests share one cache entry.
+    """
+    normalized = {}
+    for key, value in filters.items():
+        if value in (None, "", []):
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if key in CASE_INSENSITIVE_FILTERS:
+                value = value.lower()
+            if "," in value:
+                value = ",".join(sorted({part.strip() for part in value.split(",") if part.strip()}))
+        normalized[key] = value
+    return normalized
+
+
+def facets_cache_key(filters):
+    version = group_versions([LIST_GROUP])[LIST_GROUP]
+    digest = hashlib.md5(
+        json.dumps(normalize_filters(filters), sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{KEY_PREFIX}:facets:{version}:{digest}"
+
+
+def cached_facets(queryset, filters):
+    """
+    compute_facets() cached per normalized filter combination. Entries are
+    keyed on the recipe-list version, so any recipe change retires them.
+    """
+    key = facets_cache_key(filters)
+    facets = cache.get(key)
+    count_cache_lookup("facets", facets is not None)
+    if facets is None:
+        facets = compute_facets(queryset)
+        cache.set(key, facets, getattr(settings, "FACETS_CACHE_TIMEOUT", 3600))
+    return facets
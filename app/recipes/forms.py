@@ -1,6 +1,5 @@
 from django import forms
 from .models import Recipe, Comment
-from django.utils.text import slugify
 
 
 class RecipeForm(forms.ModelForm):
@@ -19,13 +18,9 @@ class RecipeForm(forms.ModelForm):
     
     def save(self, commit=True):
         instance = super().save(commit=False)
-        instance.slug = slugify(instance.title)
-        
-        # Check for duplicate slugs and modify if necessary
-        from .models import Recipe
-        existing_slugs = Recipe.objects.filter(slug__startswith=instance.slug).exclude(id=instance.id)
-        if existing_slugs.exists():
-            instance.slug = f"{instance.slug}-{existing_slugs.count() + 1}"
+        if "title" in self.changed_data:
+            # Recipe.save allocates a fresh slug for the new title
+            instance.slug = ""
         
         if commit:
             instance.save()
@@ -0,0 +1,145 @@
+import base64
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from jobs.queue import enqueue
+
+
+DERIVATIVES_DIR = "derivatives"
+FORMATS = (("webp", "WEBP"), ("jpeg", "JPEG"))
+PLACEHOLDER_WIDTH = 16
+
+# (model label, image field) -> where variants are stored and which sizes to build.
+# Widths are upper bounds; images are never upscaled. Square specs are center-cropped.
+IMAGE_SPECS = {
+    ("recipes.Recipe", "image"): {
+        "variants_field": "image_variants",
+        "sizes": {"card": 480, "detail": 1200},
+        "square": False,
+    },
+    ("users.CustomUser", "profile_picture"): {
+        "variants_field": "profile_picture_variants",
+        "sizes": {"avatar": 96, "avatar_2x": 192},
+        "square": True,
+    },
+}
+
+
+def _encode(image, image_format, **options):
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _resize(image, width, square):
+    width = min(width, image.width, image.height if square else image.width)
+    if square:
+        return ImageOps.fit(image, (width, width), Image.LANCZOS)
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def build_variants(field_file, sizes, square=False):
+    """
+    Render every size in WebP and JPEG next to the original in the same storage
+    (local MEDIA_ROOT or S3) and return the variants map stored on the model.
+    """
+    storage = field_file.storage
+    with field_file.open("rb") as source:
+        image = Image.open(source)
+        image.load()
+    image = ImageOps.exif_transpose(image).convert("RGB")
+    
+    stem = posixpath.splitext(field_file.name)[0]
+    variants = {"source": field_file.name, "sizes": {}}
+    for name, width in sizes.items():
+        resized = _resize(image, width, square)
+        entry = {"width": resized.width, "height": resized.height}
+        for extension, image_format in FORMATS:
+            path = f"{DERIVATIVES_DIR}/{stem}/{name}.{extension}"
+            if storage.exists(path):
+                storage.delete(path)
+            content = _encode(resized, image_format, quality=80)
+            entry[extension] = storage.save(path, ContentFile(content))
+        variants["sizes"][name] = entry
+    
+    placeholder = _resize(image, PLACEHOLDER_WIDTH, square)
+    variants["placeholder"] = "data:image/jpeg;base64," + base64.b64encode(
+        _encode(placeholder, "JPEG", quality=40)
+    ).decode()
+    return variants
+
+
+def image_sources(field_file, variants):
+    """
+    srcset-style map for templates and serializers:
+    {"src", "webp", "jpeg", "sizes": {name: {...urls}}, "placeholder"}.
+    Falls back to the original file until variants have been generated.
+    """
+    if not field_file:
+        return None
+    sources = {"src": field_file.url, "webp": "", "jpeg": "", "sizes": {}, "placeholder": ""}
+    if not variants or variants.get("source") != field_file.name:
+        return sources
+    
+    storage = field_file.storage
+    for extension, _ in FORMATS:
+        sources[extension] = ", ".join(
+            f"{storage.url(entry[extension])} {entry['width']}w"
+            for entry in variants["sizes"].values()
+        )
+    sources["sizes"] = {
+        name: {
+            "width": entry["width"],
+            "height": entry["height"],
+            **{extension: storage.url(entry[extension]) for extension, _ in FORMATS},
+        }
+        for name, entry in variants["sizes"].items()
+    }
+    sources["placeholder"] = variants["placeholder"]
+    return sources
+
+
+def process_image(model_label, pk, field_name, force=False):
+    """
+    Generate variants for one instance's image field and store the map on it.
+    """
+    spec = IMAGE_SPECS[(model_label, field_name)]
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+    
+    field_file = getattr(instance, field_name)
+    current = getattr(instance, spec["variants_field"]) or {}
+    if field_file and current.get("source") == field_file.name and not force:
+        return False
+    
+    variants = build_variants(field_file, spec["sizes"], spec["square"]) if field_file else {}
+    # Only store the result if the image was not replaced while we were working
+    guard = {field_name: field_file.name} if field_file else {}
+    model.objects.filter(pk=pk, **guard).update(
+        **{spec["variants_field"]: variants}
+    )
+    return True
+
+
+def schedule_image_processing(instance, field_name):
+    """
+    Queue variant generation on the job queue when the image changed since the last run.
+    """
+    spec = IMAGE_SPECS[(instance._meta.label, field_name)]
+    field_file = getattr(instance, field_name)
+    current = getattr(instance, spec["variants_field"]) or {}
+    if (field_file.name or None) == (current.get("source") or None):
+        return
+    
+    label = instance._meta.label
+    enqueue(
+        "recipes.process_image", label, instance.pk, field_name,
+        unique_key=f"image:{label}:{instance.pk}:{field_name}",
+    )
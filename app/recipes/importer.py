@@ -0,0 +1,264 @@
+import csv
+import json
+import sys
+from collections import Counter
+from io import StringIO
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import JSONField
+from taggit.models import Tag, TaggedItem
+
+from .images import schedule_image_processing
+from .ingredients import index_ingredients
+from .models import Recipe
+from .search import update_search_vectors
+from .slugs import allocate_slugs, resync_counters, slug_base
+from .stats import record_recipes
+
+
+REQUIRED_FIELDS = ("title", "ingredients", "instructions", "cooking_time", "servings")
+
+DIFFICULTIES = {value for value, label in Recipe.DIFFICULTY_CHOICES}
+STATUSES = {value for value, label in Recipe.STATUS_CHOICES}
+
+
+class InvalidRow(ValueError):
+    pass
+
+
+def read_rows(stream, format):
+    """
+    Yield one dict per input record without loading the whole file.
+    CSV tags are a comma separated column; JSONL tags may also be a list.
+    """
+    if format == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    elif format == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        raise ValueError(f"Unsupported format {format!r}")
+
+
+def open_input(path, format=None):
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    if format is None:
+        format = "csv" if path.endswith(".csv") else "jsonl"
+    return stream, format
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_tags(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    names = []
+    for name in value:
+        name = str(name).strip()[:100]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def clean_row(row, default_author=None, default_status="draft"):
+    """
+    Validate a raw record and normalise it to Recipe field values.
+    """
+    missing = [field for field in REQUIRED_FIELDS if not str(row.get(field) or "").strip()]
+    if missing:
+        raise InvalidRow(f"missing {', '.join(missing)}")
+    author = str(row.get("author") or default_author or "").strip()
+    if not author:
+        raise InvalidRow("missing author")
+    
+    try:
+        cooking_time = int(row["cooking_time"])
+        servings = int(row["servings"])
+    except (TypeError, ValueError):
+        raise InvalidRow("cooking_time and servings must be integers") from None
+    if cooking_time < 0 or servings < 0:
+        raise InvalidRow("cooking_time and servings must be positive")
+    
+    difficulty = row.get("difficulty") or "medium"
+    if difficulty not in DIFFICULTIES:
+        raise InvalidRow(f"unknown difficulty {difficulty!r}")
+    status = row.get("status") or default_status
+    if status not in STATUSES:
+        raise InvalidRow(f"unknown status {status!r}")
+    
+    return {
+        "title": str(row["title"]).strip()[:255],
+        "author": author,
+        "description": row.get("description") or "",
+        "ingredients": row["ingredients"],
+        "instructions": row["instructions"],
+        "cooking_time": cooking_time,
+        "servings": servings,
+        "difficulty": difficulty,
+        "status": status,
+        "image": row.get("image") or None,
+        "tags": parse_tags(row.get("tags")),
+    }
+
+
+def resolve_authors(usernames, cache):
+    """
+    Map usernames to user ids with one query for the names not cached yet.
+    """
+    pending = set(usernames) - cache.keys()
+    if pending:
+        User = get_user_model()
+        cache.update(User.objects.filter(username__in=pending).values_list("username", "pk"))
+    return cache
+
+
+def resolve_tags(names, cache):
+    """
+    Map tag names to ids, creating the missing tags in bulk.
+    """
+    pending = set(names) - cache.keys()
+    if not pending:
+        return cache
+    cache.update(Tag.objects.filter(name__in=pending).values_list("name", "pk"))
+    missing = pending - cache.keys()
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name, slug=Tag().slugify(name)) for name in missing],
+            ignore_conflicts=True,
+        )
+        cache.update(Tag.objects.filter(name__in=missing).values_list("name", "pk"))
+        # Slug collisions with an existing tag: let taggit pick a free slug
+        for name in missing - cache.keys():
+            cache[name] = Tag.objects.get_or_create(name=name)[0].pk
+    return cache
+
+
+def _copy_value(field, obj, db):
+    value = field.pre_save(obj, add=True)
+    if isinstance(field, JSONField):
+        value = json.dumps(value, cls=field.encoder)
+    else:
+        value = field.get_db_prep_save(value, db)
+    if value is None:
+        # COPY's CSV format reads an unquoted empty field as NULL
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, int):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_insert(model, objs):
+    """
+    Insert model instances with a single COPY, which skips the per-row SQL
+    compilation of bulk_create. Primary keys are reserved from the table's
+    sequence first and set on the instances.
+    """
+    if not objs:
+        return objs
+    opts = model._meta
+    # Resolve the thread-local proxy once; it is hit for every value below
+    db = connections[DEFAULT_DB_ALIAS]
+    table = db.ops.quote_name(opts.db_table)
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+            [opts.db_table, opts.pk.column, len(objs)],
+        )
+        for obj, (pk,) in zip(objs, cursor.fetchall()):
+            obj.pk = pk
+        
+        fields = opts.concrete_fields
+        buffer = StringIO()
+        for obj in objs:
+            buffer.write(",".join(_copy_value(field, obj, db) for field in fields))
+            buffer.write("\n")
+        buffer.seek(0)
+        columns = ", ".join(db.ops.quote_name(field.column) for field in fields)
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    for obj in objs:
+        obj._state.adding = False
+        obj._state.db = db.alias
+    return objs
+
+
+class RecipeImporter:
+    """
+    Inserts cleaned rows in chunks: one transaction per chunk, so a failed
+    run can be resumed by skipping the rows already committed.
+    """
+    def __init__(self, default_author=None, default_status="draft"):
+        self.default_author = default_author
+        self.default_status = default_status
+        self.author_ids = {}
+        self.tag_ids = {}
+        self.content_type = ContentType.objects.get_for_model(Recipe)
+    
+    def import_chunk(self, rows, retries=1):
+        """
+        Insert a chunk of raw rows; returns (created recipes, [(row index, error)]).
+        """
+        cleaned, errors = [], []
+        for index, row in enumerate(rows):
+            try:
+                cleaned.append((index, clean_row(row, self.default_author, self.default_status)))
+            except InvalidRow as exc:
+                errors.append((index, str(exc)))
+        
+        resolve_authors({row["author"] for index, row in cleaned}, self.author_ids)
+        errors.extend(
+            (index, f"unknown author {row['author']!r}")
+            for index, row in cleaned if row["author"] not in self.author_ids
+        )
+        rows = [row for index, row in cleaned if row["author"] in self.author_ids]
+        if not rows:
+            return [], errors
+        
+        for attempt in range(retries + 1):
+            try:
+                return self._insert(rows), errors
+            except IntegrityError:
+                # A concurrent writer created one of the tags, or a slug set by
+                # hand was allocated; the chunk was rolled back, so start again
+                # from fresh state
+                self.tag_ids.clear()
+                if attempt == retries:
+                    raise
+                resync_counters({slug_base(row["title"]) for row in rows})
+    
+    def _insert(self, rows):
+        with transaction.atomic():
+            resolve_tags({name for row in rows for name in row["tags"]}, self.tag_ids)
+            slugs = allocate_slugs([row["title"] for row in rows])
+            recipes = copy_insert(Recipe, [
+                Recipe(
+                    slug=slug,
+                    author_id=self.author_ids[row["author"]],
+                    **{key: value for key, value in row.items() if key not in ("author", "tags")},
+                )
+                for row, slug in zip(rows, slugs)
+            ])
+            copy_insert(TaggedItem, [
+                TaggedItem(content_type=self.content_type, object_id=recipe.pk, tag_id=self.tag_ids[name])
+                for recipe, row in zip(recipes, rows)
+                for name in row["tags"]
+            ])
+            update_search_vectors([recipe.pk for recipe in recipes])
+            index_ingredients(recipes)
+            record_recipes(Counter((recipe.author_id, None, recipe.status) for recipe in recipes))
+            for recipe in recipes:
+                if recipe.image:
+                    schedule_image_processing(recipe, "image")
+        return recipes
@@ -0,0 +1,155 @@
+import re
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q
+from django.db.models.functions import Cast
+
+from .models import Ingredient, Recipe, RecipeIngredient
+
+
+_NAME_MAX_LENGTH = Ingredient._meta.get_field("name").max_length
+
+# Quantities, units and preparation words dropped from an ingredient line
+NOISE_WORDS = {
+    "a", "an", "and", "or", "of", "the", "to", "for", "with", "into", "about", "plus", "some",
+    "cup", "cups", "tbsp", "tbs", "tsp", "tablespoon", "tablespoons", "teaspoon", "teaspoons",
+    "g", "gr", "kg", "gram", "grams", "ml", "l", "litre", "liter", "oz", "ounce", "ounces",
+    "lb", "lbs", "pound", "pounds", "pinch", "dash", "handful", "bunch", "piece", "pieces",
+    "slice", "slices", "clove", "cloves", "can", "cans", "tin", "jar", "package", "pack",
+    "large", "small", "medium", "big", "fresh", "freshly", "dried", "ground", "whole",
+    "chopped", "diced", "minced", "sliced", "grated", "shredded", "crushed", "peeled",
+    "finely", "roughly", "thinly", "optional", "taste", "needed", "softened", "melted",
+    "one", "two", "three", "four", "five", "six", "half", "quarter",
+}
+
+# Words whose trailing "s" is not a plural
+_SINGULAR_ENDINGS = ("ss", "us", "is", "ous")
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def singularize(word):
+    if len(word) <= 3 or word.endswith(_SINGULAR_ENDINGS):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(line):
+    """
+    "2 cups chopped tomatoes, seeded (optional)" -> "tomato"; "" when nothing is left.
+    """
+    line = re.sub(r"\([^)]*\)", " ", line.lower()).split(",")[0]
+    words = [singularize(word) for word in _WORD_RE.findall(line) if word not in NOISE_WORDS]
+    return " ".join(words)[:_NAME_MAX_LENGTH]
+
+
+def parse_ingredients(text):
+    """
+    Distinct normalized ingredient names of a Recipe.ingredients blob, in order.
+    """
+    names = []
+    for line in (text or "").splitlines():
+        name = normalize_ingredient(line)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def resolve_ingredients(names):
+    """
+    {name: Ingredient id}, creating the missing ingredients in bulk.
+    """
+    names = set(names)
+    ids = dict(Ingredient.objects.filter(name__in=names).values_list("name", "pk"))
+    missing = names - ids.keys()
+    if missing:
+        Ingredient.objects.bulk_create([Ingredient(name=name) for name in missing], ignore_conflicts=True)
+        ids.update(Ingredient.objects.filter(name__in=missing).values_list("name", "pk"))
+    return ids
+
+
+@transaction.atomic
+def index_ingredients(recipes):
+    """
+    Rebuild the ingredient entries and ingredient_count of the given recipes
+    with a fixed number of queries, however many recipes are passed.
+    """
+    recipes = list(recipes)
+    if not recipes:
+        return 0
+    parsed = {recipe.pk: parse_ingredients(recipe.ingredients) for recipe in recipes}
+    ids = resolve_ingredients(name for names in parsed.values() for name in names)
+    
+    RecipeIngredient.objects.filter(recipe_id__in=parsed).delete()
+    RecipeIngredient.objects.bulk_create([
+        RecipeIngredient(recipe_id=recipe_id, ingredient_id=ids[name], recipe_size=len(names))
+        for recipe_id, names in parsed.items()
+        for name in names
+    ])
+    for recipe in recipes:
+        recipe.ingredient_count = len(parsed[recipe.pk])
+    Recipe.objects.bulk_update(recipes, ["ingredient_count"])
+    return len(recipes)
+
+
+def pantry_search(queryset, pantry, max_missing=None, limit=20):
+    """
+    The `limit` recipes of `queryset` best covered by the pantry.
+    
+    Matches are counted from the (ingredient, recipe) posting lists of the
+    pantry's ingredients, so no ingredient text is scanned. Ranking works on
+    narrow (recipe, count) rows and only the winners are loaded from
+    `queryset`. Recipes get `matched_count`, `missing_count` and `coverage`
+    (0..1) and are ordered by fewest missing ingredients, then best coverage.
+    """
+    names = {name for name in (normalize_ingredient(item) for item in pantry) if name}
+    ingredient_ids = list(Ingredient.objects.filter(name__in=names).values_list("pk", flat=True))
+    if not ingredient_ids:
+        return []
+    
+    ranked = (
+        RecipeIngredient.objects.filter(ingredient__in=ingredient_ids, recipe__in=queryset.values("pk"))
+        .values("recipe_id", "recipe_size")
+        .annotate(matched_count=Count("*"))
+        .annotate(
+            missing_count=F("recipe_size") - F("matched_count"),
+            coverage=Cast("matched_count", FloatField()) / Cast("recipe_size", FloatField()),
+        )
+    )
+    if max_missing is not None:
+        ranked = ranked.filter(missing_count__lte=max_missing)
+    ranked = list(ranked.order_by("missing_count", "-coverage", "-recipe_id")[:limit])
+    
+    recipes = queryset.in_bulk([row["recipe_id"] for row in ranked])
+    results = []
+    for row in ranked:
+        recipe = recipes.get(row["recipe_id"])
+        if recipe is not None:
+            recipe.matched_count = row["matched_count"]
+            recipe.missing_count = row["missing_count"]
+            recipe.coverage = row["coverage"]
+            results.append(recipe)
+    return results
+
+
+def missing_ingredients(recipe_ids, pantry):
+    """
+    {recipe id: [ingredient names not in the pantry]} for a page of results.
+    """
+    names = {name for name in (normalize_ingredient(item) for item in pantry) if name}
+    missing = {}
+    rows = (
+        RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+        .filter(~Q(ingredient__name__in=names))
+        .values_list("recipe_id", "ingredient__name")
+        .order_by("recipe_id", "pk")
+    )
+    for recipe_id, name in rows:
+        missing.setdefault(recipe_id, []).append(name)
+    return missing
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from recipes.ingredients import index_ingredients
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = "Parse Recipe.ingredients into the structured ingredient index for existing recipes."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000,
+                            help="Number of recipes indexed per transaction.")
+    
+    def handle(self, *args, **options):
+        last_pk = 0
+        indexed = 0
+        
+        while True:
+            batch = list(
+                Recipe.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .only("pk", "ingredients", "ingredient_count")[:options["batch_size"]]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            indexed += index_ingredients(batch)
+            
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Indexed {indexed} recipe(s)...")
+        
+        self.stdout.write(self.style.SUCCESS(f"Indexed ingredients of {indexed} recipe(s)."))
@@ -0,0 +1,184 @@
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.models import Recipe
+
+
+ENDPOINTS = {
+    "list": "",
+    "detail": "{slug}/",
+    "comments": "{slug}/comments/",
+    "trending": "trending/",
+    "search": "?search={search}",
+}
+
+DEFAULT_TARGETS = [
+    "wsgi=http://127.0.0.1:8000/api/recipes/",
+    "asgi=http://127.0.0.1:8001/api/async/recipes/",
+]
+
+
+async def fetch(reader, writer, host, path):
+    """
+    One keep-alive HTTP/1.1 GET; returns (status, whether the connection can be reused).
+    """
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: application/json\r\n\r\n".encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+    
+    if "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    elif headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if not size:
+                break
+    else:
+        await reader.read()
+        return int(status_line.split()[1]), False
+    return int(status_line.split()[1]), headers.get("connection") != "close"
+
+
+async def client(url, deadline, latencies, errors):
+    parts = urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    loop = asyncio.get_running_loop()
+    connection = None
+    while loop.time() < deadline:
+        started = time.perf_counter()
+        try:
+            if connection is None:
+                connection = await asyncio.open_connection(parts.hostname, parts.port or 80)
+            status, reusable = await fetch(*connection, parts.netloc, path)
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            errors.append(1)
+            reusable = False
+        else:
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status >= 400:
+                errors.append(status)
+        if not reusable and connection is not None:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def load(url, concurrency, duration):
+    """
+    `concurrency` clients requesting `url` back to back for `duration` seconds.
+    """
+    latencies, errors = [], []
+    deadline = asyncio.get_running_loop().time() + duration
+    await asyncio.gather(*(client(url, deadline, latencies, errors) for _ in range(concurrency)))
+    latencies.sort()
+    
+    def percentile(fraction):
+        return latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] if latencies else 0.0
+    
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50": percentile(0.50),
+        "p99": percentile(0.99),
+        "errors": len(errors),
+    }
+
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Nothing listening on {host}:{port} after {timeout}s")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the recipe read endpoints between the WSGI "
+        "deployment (DRF views under runserver) and the ASGI one (async views under "
+        "uvicorn core.asgi:application) at increasing concurrency."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--target", action="append", dest="targets", metavar="NAME=URL",
+                            help="API root to load, repeatable (default: the wsgi and asgi roots on "
+                                 "ports 8000 and 8001).")
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                            help=f"Comma separated, from {', '.join(ENDPOINTS)}.")
+        parser.add_argument("--concurrency", default="10,100,500",
+                            help="Comma separated numbers of simultaneous clients.")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds per measurement.")
+        parser.add_argument("--search", default="chicken", help="Search text for the search endpoint.")
+        parser.add_argument("--serve", action="store_true",
+                            help="Start runserver and uvicorn on the default target ports for the run.")
+        parser.add_argument("--asgi-workers", type=int, default=1,
+                            help="uvicorn worker processes when --serve is given.")
+    
+    def handle(self, *args, **options):
+        targets = dict(target.split("=", 1) for target in options["targets"] or DEFAULT_TARGETS)
+        endpoints = options["endpoints"].split(",")
+        unknown = set(endpoints) - ENDPOINTS.keys()
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        levels = [int(level) for level in options["concurrency"].split(",")]
+        
+        recipe = Recipe.objects.filter(status="published").order_by("-comments_count").first()
+        if recipe is None:
+            raise CommandError("No published recipes to request.")
+        
+        servers = []
+        try:
+            if options["serve"]:
+                self.start_servers(servers, options["asgi_workers"])
+            self.stdout.write(f"{'endpoint':<10} {'target':<6} {'clients':>7} {'req/s':>9} "
+                              f"{'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            for endpoint in endpoints:
+                path = ENDPOINTS[endpoint].format(slug=recipe.slug, search=options["search"])
+                for concurrency in levels:
+                    for name, root in targets.items():
+                        result = asyncio.run(load(root + path, concurrency, options["duration"]))
+                        self.stdout.write(
+                            f"{endpoint:<10} {name:<6} {concurrency:>7} {result['rps']:>9.1f} "
+                            f"{result['p50']:>9.1f} {result['p99']:>9.1f} {result['errors']:>7}"
+                        )
+        finally:
+            for server in servers:
+                server.terminate()
+                server.wait()
+    
+    def start_servers(self, servers, asgi_workers):
+        # Appended as they start, so the caller stops whatever did start
+        manage = Path(settings.BASE_DIR) / "manage.py"
+        servers.append(subprocess.Popen(
+            [sys.executable, str(manage), "runserver", "127.0.0.1:8000", "--noreload"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+        servers.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "core.asgi:application", "--host", "127.0.0.1",
+             "--port", "8001", "--workers", str(asgi_workers), "--no-access-log"],
+            cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+        for port in (8000, 8001):
+            wait_for_port("127.0.0.1", port)
@@ -0,0 +1,165 @@
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from taggit.models import TaggedItem
+
+from recipes.benchmarks import measure_request
+from recipes.models import Recipe
+
+
+# name -> (path builder, who makes the request)
+ENDPOINTS = {
+    "recipe_list": (lambda data: reverse("recipe_list"), "user"),
+    "recipe_detail": (lambda data: reverse("recipe_detail", args=[data["slug"]]), "user"),
+    "search": (lambda data: reverse("recipe_list") + f"?query={data['search']}", "user"),
+    "tag": (lambda data: reverse("tag_recipes", args=[data["tag"]]), "user"),
+    "profile": (lambda data: reverse("user_detail", args=[data["author"]]), "user"),
+    "admin_changelist": (lambda data: reverse("admin:recipes_recipe_changelist"), "admin"),
+    "api_list": (lambda data: reverse("recipe-list"), "user"),
+    "api_detail": (lambda data: reverse("recipe-detail", args=[data["slug"]]), "user"),
+    "api_search": (lambda data: reverse("recipe-list") + f"?search={data['search']}", "user"),
+}
+
+# Latency and memory may grow by this fraction over the baseline before the
+# run fails, and always by a small absolute amount (ms / KiB) that is noise
+DEFAULT_TOLERANCE = 0.25
+RELATIVE_METRICS = {"p50_ms": 10, "p99_ms": 10, "peak_kb": 64}
+
+
+def check(results, budgets, baseline, tolerance):
+    """
+    Regressions of `results` against absolute `budgets` ({endpoint: {metric:
+    max}}) and a `baseline` run: more queries than before, or latency and
+    memory beyond the tolerance.
+    """
+    failures = []
+    for name, result in results.items():
+        if "error" in result:
+            failures.append(f"{name}: {result['error']}")
+            continue
+        for metric, limit in budgets.get(name, {}).items():
+            if result[metric] > limit:
+                failures.append(f"{name}: {metric} {result[metric]:.1f} over budget {limit}")
+        previous = baseline.get(name)
+        if not previous or "error" in previous:
+            continue
+        if result["queries"] > previous["queries"]:
+            failures.append(f"{name}: {result['queries']} queries, baseline {previous['queries']}")
+        for metric, slack in RELATIVE_METRICS.items():
+            if result[metric] > max(previous[metric] * (1 + tolerance), previous[metric] + slack):
+                failures.append(
+                    f"{name}: {metric} {result[metric]:.1f}, baseline {previous[metric]:.1f} (+{tolerance:.0%} allowed)"
+                )
+    return failures
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries, DB time, p50/p99 latency and peak memory of the main pages and API "
+        "endpoints against the current data (see seed_bench), write them to JSON and fail on "
+        "regressions against the query budgets or a baseline run."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                            help=f"Comma separated, from {', '.join(ENDPOINTS)}.")
+        parser.add_argument("--repeat", type=int, default=30, help="Measured requests per endpoint.")
+        parser.add_argument("--search", default="chicken", help="Search text for the search endpoints.")
+        parser.add_argument("--warm-cache", action="store_true",
+                            help="Keep the cache between requests instead of measuring cold renders.")
+        parser.add_argument("--output", default="bench-results.json", help="Where to write the results.")
+        parser.add_argument("--budgets", default=str(Path(settings.BASE_DIR) / "bench_budgets.json"),
+                            help="JSON file of per-endpoint limits, e.g. {\"api_list\": {\"queries\": 5}}.")
+        parser.add_argument("--baseline", help="Results of an earlier run to compare with.")
+        parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    
+    def handle(self, *args, **options):
+        names = options["endpoints"].split(",")
+        unknown = set(names) - ENDPOINTS.keys()
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        data = self.pick_data(options["search"])
+        budgets = self.load(options["budgets"], required=False)
+        baseline = self.load(options["baseline"]).get("endpoints", {}) if options["baseline"] else {}
+        
+        results = {}
+        # The request users are rolled back at the end, with anything the requests wrote
+        with transaction.atomic():
+            clients = self.clients()
+            for name in names:
+                path_for, who = ENDPOINTS[name]
+                path = path_for(data)
+                try:
+                    results[name] = {"path": path, **measure_request(
+                        clients[who], path, repeat=options["repeat"], cold_cache=not options["warm_cache"]
+                    )}
+                except Exception as exc:
+                    results[name] = {"path": path, "error": f"{type(exc).__name__}: {exc}"}
+                self.report(name, results[name])
+            transaction.set_rollback(True)
+        
+        Path(options["output"]).write_text(json.dumps({
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "recipes": Recipe.objects.count(),
+            "repeat": options["repeat"],
+            "cold_cache": not options["warm_cache"],
+            "endpoints": results,
+        }, indent=2))
+        self.stdout.write(f"Results written to {options['output']}")
+        
+        failures = check(results, budgets, baseline, options["tolerance"])
+        if failures:
+            raise CommandError("Benchmark regressions:\n  " + "\n  ".join(failures))
+    
+    def pick_data(self, search):
+        # The heaviest objects of each kind: most liked recipe, most prolific author, most used tag
+        recipe = Recipe.objects.filter(status="published").order_by("-likes_count", "-pk").first()
+        if recipe is None:
+            raise CommandError("No published recipes; run seed_bench first.")
+        author = (
+            Recipe.objects.filter(status="published").values_list("author__username")
+            .annotate(count=Count("pk")).order_by("-count").first()
+        )
+        tag = (
+            TaggedItem.objects.values_list("tag__slug")
+            .annotate(count=Count("pk")).order_by("-count").first()
+        )
+        return {"slug": recipe.slug, "author": author[0], "tag": tag[0] if tag else "none", "search": search}
+    
+    def clients(self):
+        User = get_user_model()
+        user = User.objects.create(username="bench-endpoints-user")
+        admin = User.objects.create(username="bench-endpoints-admin", is_staff=True, is_superuser=True)
+        host = next((host for host in settings.ALLOWED_HOSTS if "*" not in host), "localhost").lstrip(".")
+        clients = {}
+        for who, account in (("user", user), ("admin", admin)):
+            clients[who] = Client(HTTP_HOST=host)
+            clients[who].force_login(account)
+        return clients
+    
+    def load(self, path, required=True):
+        try:
+            return json.loads(Path(path).read_text())
+        except FileNotFoundError:
+            if required:
+                raise CommandError(f"{path} does not exist.")
+            return {}
+    
+    def report(self, name, result):
+        if "error" in result:
+            self.stdout.write(f"{name:<18} ERROR {result['error']}")
+            return
+        self.stdout.write(
+            f"{name:<18} {result['queries']:>4} queries  db {result['db_ms']:7.1f}ms  "
+            f"p50 {result['p50_ms']:7.1f}ms  p99 {result['p99_ms']:7.1f}ms  peak {result['peak_kb']:8.0f}KiB"
+        )
@@ -0,0 +1,75 @@
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from recipes.benchmarks import seed_recipes, time_call
+from recipes.ingredients import index_ingredients, pantry_search, parse_ingredients
+from recipes.models import Recipe
+
+
+LIMIT = 20
+
+
+class Command(BaseCommand):
+    help = "Compare pantry search over the ingredient index with a scan of the ingredients text."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000",
+                            help="Comma separated catalog sizes to measure at.")
+        parser.add_argument("--pantries", default="chicken,rice,garlic;tofu,ginger,soy,sesame,lime;salmon,lemon",
+                            help="Semicolon separated pantries of comma separated ingredients.")
+        parser.add_argument("--repeat", type=int, default=5)
+    
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        pantries = [pantry.split(",") for pantry in options["pantries"].split(";") if pantry]
+        
+        # Everything is rolled back at the end so the benchmark leaves no data behind
+        with transaction.atomic():
+            author = get_user_model().objects.create(username="bench-pantry")
+            seeded = 0
+            
+            for size in sizes:
+                self.stdout.write(f"Seeding up to {size} recipes...")
+                seed_recipes(size - seeded, author, start=seeded)
+                seeded = size
+                pending = Recipe.objects.filter(author=author, ingredient_count=0).only("pk", "ingredients")
+                while batch := list(pending[:5000]):
+                    index_ingredients(batch)
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE recipes_recipe")
+                    cursor.execute("ANALYZE recipes_recipeingredient")
+                
+                for pantry in pantries:
+                    indexed = time_call(lambda: list(self.indexed(pantry)), repeat=options["repeat"])
+                    scan = time_call(lambda: self.scan(pantry), repeat=options["repeat"])
+                    self.stdout.write(
+                        f"{size:>9} {','.join(pantry):<32} index p50={indexed['p50']:8.2f}ms "
+                        f"text scan p50={scan['p50']:9.2f}ms "
+                        f"speedup={scan['p50'] / max(indexed['p50'], 0.001):6.1f}x"
+                    )
+            
+            transaction.set_rollback(True)
+    
+    def indexed(self, pantry):
+        return pantry_search(Recipe.objects.filter(status="published"), pantry, limit=LIMIT)
+    
+    def scan(self, pantry):
+        # What the same ranking costs from the free-text column: an icontains
+        # scan for candidates, then parsing every candidate's ingredient list
+        candidates = Recipe.objects.filter(status="published").filter(
+            reduce(or_, (Q(ingredients__icontains=item) for item in pantry))
+        ).values_list("pk", "ingredients")
+        wanted = set(parse_ingredients("\n".join(pantry)))
+        ranked = []
+        for pk, text in candidates:
+            names = parse_ingredients(text)
+            matched = len(wanted.intersection(names))
+            if matched:
+                ranked.append((len(names) - matched, -matched / len(names), -pk))
+        ranked.sort()
+        return ranked[:LIMIT]
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from recipes.benchmarks import seed_recipes, time_call
+from recipes.models import Recipe
+from recipes.search import search_recipes, update_search_vectors
+
+
+PAGE_SIZE = 9
+
+
+class Command(BaseCommand):
+    help = "Compare full-text search latency with the legacy icontains scan at growing catalog sizes."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000",
+                            help="Comma separated catalog sizes to measure at.")
+        parser.add_argument("--queries", default="chicken,garl,spicy curry,lemon basil pasta",
+                            help="Comma separated search phrases.")
+        parser.add_argument("--repeat", type=int, default=5)
+    
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        queries = [query.strip() for query in options["queries"].split(",") if query.strip()]
+        
+        # Everything is rolled back at the end so the benchmark leaves no data behind
+        with transaction.atomic():
+            author = get_user_model().objects.create(username="bench-search")
+            seeded = 0
+            
+            for size in sizes:
+                self.stdout.write(f"Seeding up to {size} recipes...")
+                seed_recipes(size - seeded, author, start=seeded)
+                seeded = size
+                update_search_vectors(
+                    Recipe.objects.filter(author=author, search_vector__isnull=True).values("pk")
+                )
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE recipes_recipe")
+                
+                for query in queries:
+                    legacy = time_call(lambda: self.render_page(self.legacy_queryset(query)),
+                                       repeat=options["repeat"])
+                    fulltext = time_call(lambda: self.render_page(self.fulltext_queryset(query)),
+                                         repeat=options["repeat"])
+                    self.stdout.write(
+                        f"{size:>9} {query!r:<24} icontains p50={legacy['p50']:8.2f}ms "
+                        f"fulltext p50={fulltext['p50']:8.2f}ms "
+                        f"speedup={legacy['p50'] / max(fulltext['p50'], 0.001):6.1f}x"
+                    )
+            
+            transaction.set_rollback(True)
+    
+    def legacy_queryset(self, query):
+        return Recipe.objects.filter(status="published").filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(ingredients__icontains=query)
+        )
+    
+    def fulltext_queryset(self, query):
+        return search_recipes(Recipe.objects.filter(status="published"), query)
+    
+    def render_page(self, queryset):
+        # Mirrors what RecipeListView pays for a page: the paginator count plus the first page
+        queryset.count()
+        return list(queryset[:PAGE_SIZE])
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import RequestFactory
+
+from recipes.api.views import RecipeViewSet
+from recipes.benchmarks import seed_recipes, time_call
+from recipes.models import Like, Recipe, TrendingScore, TrendingState
+from recipes.trending import refresh_trending
+
+
+TOP = 20
+
+
+class Command(BaseCommand):
+    help = "Show that /api/recipes/trending/ costs the same whatever the number of likes."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10000,100000,1000000",
+                            help="Comma separated like counts to measure at.")
+        parser.add_argument("--recipes", type=int, default=2000,
+                            help="Number of recipes the likes are spread over.")
+        parser.add_argument("--repeat", type=int, default=5)
+    
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+        view = RecipeViewSet.as_view({"get": "trending"})
+        factory = RequestFactory()
+        
+        # Everything is rolled back at the end so the benchmark leaves no data behind
+        with transaction.atomic():
+            User = get_user_model()
+            author = User.objects.create(username="bench-trending")
+            seed_recipes(options["recipes"], author)
+            recipe_ids = list(Recipe.objects.filter(author=author).values_list("pk", flat=True))
+            seeded = users = 0
+            
+            for size in sizes:
+                self.stdout.write(f"Seeding up to {size} likes...")
+                users = self.seed_likes(size - seeded, recipe_ids, author, users)
+                seeded = size
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE recipes_like")
+                
+                rebuild = time_call(self.rebuild, repeat=1)
+                
+                queries = []
+                with connection.execute_wrapper(lambda execute, *args: queries.append(1) or execute(*args)):
+                    view(factory.get("/api/recipes/trending/"))
+                api = time_call(lambda: view(factory.get("/api/recipes/trending/")).render(),
+                                repeat=options["repeat"])
+                aggregate = time_call(lambda: list(self.aggregate_queryset()), repeat=options["repeat"])
+                self.stdout.write(
+                    f"{size:>9} likes  trending api p50={api['p50']:7.2f}ms ({len(queries)} queries)  "
+                    f"Count(likes) top-{TOP} p50={aggregate['p50']:8.2f}ms  "
+                    f"full rebuild={rebuild['p50']:8.1f}ms"
+                )
+            
+            transaction.set_rollback(True)
+    
+    def seed_likes(self, count, recipe_ids, author, users):
+        """
+        Every new user likes every recipe (until `count` is reached), with
+        timestamps spread over the last week.
+        """
+        User = get_user_model()
+        needed = -(-count // len(recipe_ids))
+        new_users = User.objects.bulk_create(
+            User(username=f"bench-trending-{author.pk}-{index}")
+            for index in range(users, users + needed)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Like._meta.db_table} (recipe_id, user_id, created_at)
+                SELECT r.id, u.id, now() - random() * interval '7 days'
+                FROM unnest(%s::bigint[]) AS r(id) CROSS JOIN unnest(%s::bigint[]) AS u(id)
+                LIMIT %s
+                """,
+                [recipe_ids, [user.pk for user in new_users], count],
+            )
+        return users + needed
+    
+    def rebuild(self):
+        TrendingScore.objects.all().delete()
+        TrendingState.objects.all().delete()
+        refresh_trending()
+    
+    def aggregate_queryset(self):
+        # What ordering by popularity would cost without the materialized scores
+        return (
+            Recipe.objects.filter(status="published")
+            .annotate(recent_likes=Count("likes"))
+            .order_by("-recent_likes")[:TOP]
+        )
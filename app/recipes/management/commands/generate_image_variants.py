@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from recipes.images import IMAGE_SPECS, process_image
+
+
+def _init_worker():
+    django.setup()
+
+
+def _process(model_label, pk, field_name, force):
+    try:
+        return process_image(model_label, pk, field_name, force=force), None
+    except Exception as exc:
+        return False, f"{model_label} #{pk}: {exc}"
+
+
+class Command(BaseCommand):
+    help = "Generate resized image variants for existing recipe images and profile pictures."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Number of worker processes.")
+        parser.add_argument("--model", action="append", dest="models",
+                            help="Limit to a model label, e.g. recipes.Recipe (repeatable).")
+        parser.add_argument("--force", action="store_true",
+                            help="Regenerate variants that already match the current image.")
+    
+    def handle(self, *args, **options):
+        jobs = []
+        for (model_label, field_name), spec in IMAGE_SPECS.items():
+            if options["models"] and model_label not in options["models"]:
+                continue
+            model = apps.get_model(model_label)
+            queryset = model.objects.exclude(**{field_name: ""}).exclude(**{f"{field_name}__isnull": True})
+            for pk, name, variants in queryset.values_list("pk", field_name, spec["variants_field"]).iterator():
+                if options["force"] or (variants or {}).get("source") != name:
+                    jobs.append((model_label, pk, field_name))
+        
+        self.stdout.write(f"Processing {len(jobs)} image(s) with {options['workers']} worker(s)...")
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        
+        started = time.perf_counter()
+        processed = failed = 0
+        with ProcessPoolExecutor(max_workers=options["workers"], initializer=_init_worker) as pool:
+            futures = [pool.submit(_process, *job, options["force"]) for job in jobs]
+            for future in as_completed(futures):
+                done, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(error)
+                elif done:
+                    processed += 1
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated variants for {processed} image(s), {failed} failed, in {elapsed:.1f}s."
+        ))
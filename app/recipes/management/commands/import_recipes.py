@@ -0,0 +1,68 @@
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.cache import LIST_GROUP, invalidate_groups
+from recipes.importer import RecipeImporter, chunked, open_input, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import recipes from a JSONL or CSV file (use - for stdin)."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file; .csv is read as CSV, anything else as JSON lines.")
+        parser.add_argument("--format", choices=["jsonl", "csv"], help="Override the format detected from the extension.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Rows inserted per transaction.")
+        parser.add_argument("--skip", type=int, default=0,
+                            help="Skip the first N rows, e.g. to resume an interrupted import.")
+        parser.add_argument("--author", help="Username used for rows without an author.")
+        parser.add_argument("--status", choices=["draft", "published"], default="draft",
+                            help="Status for rows without one.")
+    
+    def handle(self, *args, **options):
+        try:
+            stream, format = open_input(options["path"], options["format"])
+        except OSError as exc:
+            raise CommandError(exc)
+        
+        importer = RecipeImporter(default_author=options["author"], default_status=options["status"])
+        offset = options["skip"]
+        created = skipped = 0
+        started = time.perf_counter()
+        try:
+            rows = islice(read_rows(stream, format), offset, None)
+            for chunk in chunked(rows, options["batch_size"]):
+                try:
+                    recipes, errors = importer.import_chunk(chunk)
+                except Exception as exc:
+                    raise CommandError(
+                        f"Import failed in rows {offset + 1}-{offset + len(chunk)}: {exc}. "
+                        f"Rows before {offset + 1} are committed; resume with --skip {offset}."
+                    )
+                for index, error in errors:
+                    self.stderr.write(f"Row {offset + index + 1}: {error}")
+                offset += len(chunk)
+                created += len(recipes)
+                skipped += len(errors)
+                
+                if options["verbosity"] > 1:
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"{offset} rows read, {created / elapsed:.0f} rows/s")
+        except ValueError as exc:
+            raise CommandError(
+                f"Unreadable input in the rows after {offset}: {exc}. "
+                f"Rows up to {offset} are committed; resume with --skip {offset} after fixing the file."
+            )
+        finally:
+            if options["path"] != "-":
+                stream.close()
+            if created:
+                invalidate_groups(LIST_GROUP)
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} recipe(s), skipped {skipped}, in {elapsed:.1f}s "
+            f"({created / max(elapsed, 1e-9):.0f} rows/s)."
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from recipes.cache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show hit, miss and stale counters for the anonymous page cache."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="Zero the counters after printing them.")
+    
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        total = sum(stats.values())
+        served = stats["hit"] + stats["stale"]
+        
+        for name, value in stats.items():
+            self.stdout.write(f"{name:>6}: {value}")
+        ratio = served / total if total else 0
+        self.stdout.write(f"{'ratio':>6}: {ratio:.1%} served from cache")
+        
+        if options["reset"]:
+            reset_page_cache_stats()
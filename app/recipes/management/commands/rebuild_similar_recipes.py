@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import NEIGHBORS_PER_RECIPE, rebuild_neighbors
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed similar-recipes table for every published recipe."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Recipes scored per similarity batch.")
+        parser.add_argument("--neighbors", type=int, default=NEIGHBORS_PER_RECIPE,
+                            help="Neighbours kept per recipe.")
+    
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        
+        def progress(done, total):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{done}/{total} recipes ({time.perf_counter() - started:.1f}s)")
+        
+        total = rebuild_neighbors(
+            batch_size=options["batch_size"], k=options["neighbors"], progress=progress
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt neighbours for {total} recipe(s) in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the admin dashboard statistics rollup from the recipe, like and comment tables."
+    
+    def handle(self, *args, **options):
+        authors = rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt dashboard statistics for {authors} author(s)."))
@@ -0,0 +1,226 @@
+import random
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from taggit.models import Tag, TaggedItem
+
+from recipes.benchmarks import WORDS, synthetic_fields
+from recipes.importer import chunked, copy_insert
+from recipes.models import Comment, Like, Recipe
+from recipes.search import update_search_vectors
+from recipes.services import refresh_counters
+from recipes.slugs import allocate_slugs
+from recipes.stats import rebuild_stats
+from recipes.trending import refresh_trending
+
+
+USER_PREFIX = "bench-user-"
+
+# Share of seeded recipes left as drafts
+DRAFT_RATIO = 0.1
+
+# Rows per INSERT for likes, comments, favorites and tags
+INSERT_BATCH = 50000
+
+
+def zipf_sample(rng, ids, size, exponent):
+    """
+    `size` draws from `ids` where rank k is picked in proportion to 1 / k**exponent,
+    so a few ids get most of the activity. Ranks are shuffled, so popularity
+    does not follow id order.
+    """
+    ids = rng.permutation(np.asarray(ids, dtype=np.int64))
+    weights = 1.0 / np.arange(1, len(ids) + 1) ** exponent
+    return ids[rng.choice(len(ids), size=size, p=weights / weights.sum())]
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic users, recipes, tags, likes, comments and favorites "
+        "with realistic skew (a few prolific authors and popular recipes), for benchmarks."
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--recipes", type=int, default=20000)
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--likes", type=int, default=200000,
+                            help="Likes to draw; repeated (user, recipe) pairs are dropped.")
+        parser.add_argument("--comments", type=int, default=50000)
+        parser.add_argument("--favorites", type=int, default=50000,
+                            help="Favorites to draw; repeated (user, recipe) pairs are dropped.")
+        parser.add_argument("--skew", type=float, default=1.1,
+                            help="Zipf exponent of author, recipe and tag popularity.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--clear", action="store_true",
+                            help="Delete previously seeded bench users and everything they own first.")
+    
+    def handle(self, *args, **options):
+        User = get_user_model()
+        existing = User.objects.filter(username__startswith=USER_PREFIX)
+        if options["clear"]:
+            self.stdout.write("Deleting previous bench data...")
+            existing.delete()
+        elif existing.exists():
+            raise CommandError("Bench data is already present; pass --clear to replace it.")
+        
+        rng = np.random.default_rng(options["seed"])
+        self.skew = options["skew"]
+        
+        with transaction.atomic():
+            user_ids = [
+                user.pk for user in User.objects.bulk_create(
+                    (User(username=f"{USER_PREFIX}{index}", password="!") for index in range(options["users"])),
+                    batch_size=5000,
+                )
+            ]
+        self.stdout.write(f"{len(user_ids)} users")
+        
+        recipe_ids = self.seed_recipes(options["recipes"], user_ids, rng, random.Random(options["seed"]))
+        self.stdout.write(f"{len(recipe_ids)} recipes")
+        
+        tagged = self.seed_tags(options["tags"], recipe_ids, rng)
+        self.stdout.write(f"{options['tags']} tags on {tagged} recipe/tag pairs")
+        
+        pairs = f"""
+            SELECT pair.recipe_id, pair.user_id, recipe.created_at + random() * (now() - recipe.created_at)
+            FROM unnest(%s::bigint[], %s::bigint[]) AS pair(recipe_id, user_id)
+            JOIN {_table(Recipe)} recipe ON recipe.id = pair.recipe_id
+        """
+        likes = self.insert_drawn(
+            f"INSERT INTO {_table(Like)} (recipe_id, user_id, created_at) {pairs} ON CONFLICT DO NOTHING",
+            options["likes"], recipe_ids, user_ids, rng,
+        )
+        self.stdout.write(f"{likes} likes")
+        
+        favorite = Recipe.favorited_by.through
+        favorites = self.insert_drawn(
+            f"""
+            INSERT INTO {_table(favorite)} ({favorite._meta.get_field("recipe").column},
+                                            {favorite._meta.get_field("customuser").column})
+            SELECT recipe_id, user_id FROM ({pairs}) AS drawn ON CONFLICT DO NOTHING
+            """,
+            options["favorites"], recipe_ids, user_ids, rng,
+        )
+        self.stdout.write(f"{favorites} favorites")
+        
+        comments = self.seed_comments(options["comments"], recipe_ids, user_ids, rng)
+        self.stdout.write(f"{comments} comments")
+        
+        self.stdout.write("Refreshing counters, search vectors, stats and trending scores...")
+        seeded = Recipe.objects.filter(author__username__startswith=USER_PREFIX)
+        with transaction.atomic():
+            refresh_counters(seeded)
+            update_search_vectors(seeded.values("pk"))
+        rebuild_stats()
+        refresh_trending()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    
+    def seed_recipes(self, count, user_ids, rng, text_rng):
+        authors = zipf_sample(rng, user_ids, count, self.skew).tolist()
+        drafts = (rng.random(count) < DRAFT_RATIO).tolist()
+        recipe_ids = []
+        for start in range(0, count, INSERT_BATCH // 10):
+            end = min(start + INSERT_BATCH // 10, count)
+            with transaction.atomic():
+                fields = [synthetic_fields(text_rng) for _ in range(start, end)]
+                slugs = allocate_slugs([recipe["title"] for recipe in fields])
+                recipes = copy_insert(Recipe, [
+                    Recipe(author_id=author, slug=slug, status="draft" if draft else "published", **recipe)
+                    for author, draft, slug, recipe in zip(authors[start:end], drafts[start:end], slugs, fields)
+                ])
+                recipe_ids.extend(recipe.pk for recipe in recipes)
+        
+        # copy_insert stamps everything "now"; spread creation over the last
+        # year, denser towards the present
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {_table(Recipe)}
+                SET created_at = now() - power(random(), 2) * interval '365 days'
+                WHERE id = ANY(%s)
+                """,
+                [recipe_ids],
+            )
+            cursor.execute(f"UPDATE {_table(Recipe)} SET updated_at = created_at WHERE id = ANY(%s)", [recipe_ids])
+        return recipe_ids
+    
+    def seed_tags(self, count, recipe_ids, rng):
+        names = [
+            WORDS[index % len(WORDS)] + (f"-{index // len(WORDS)}" if index >= len(WORDS) else "")
+            for index in range(count)
+        ]
+        Tag.objects.bulk_create([Tag(name=name, slug=name) for name in names], ignore_conflicts=True)
+        tag_ids = list(Tag.objects.filter(name__in=names).values_list("pk", flat=True))
+        
+        # One to five tags per recipe, popular tags drawn more often
+        per_recipe = rng.integers(1, 6, size=len(recipe_ids))
+        object_ids = np.repeat(np.asarray(recipe_ids, dtype=np.int64), per_recipe)
+        drawn = zipf_sample(rng, tag_ids, len(object_ids), self.skew)
+        content_type = ContentType.objects.get_for_model(Recipe)
+        inserted = 0
+        with connection.cursor() as cursor:
+            for start in range(0, len(object_ids), INSERT_BATCH):
+                cursor.execute(
+                    f"""
+                    INSERT INTO {_table(TaggedItem)} (content_type_id, object_id, tag_id)
+                    SELECT %s, object_id, tag_id FROM unnest(%s::integer[], %s::integer[]) AS drawn(object_id, tag_id)
+                    ON CONFLICT DO NOTHING
+                    """,
+                    [
+                        content_type.pk,
+                        object_ids[start:start + INSERT_BATCH].tolist(),
+                        drawn[start:start + INSERT_BATCH].tolist(),
+                    ],
+                )
+                inserted += cursor.rowcount
+        return inserted
+    
+    def insert_drawn(self, sql, count, recipe_ids, user_ids, rng):
+        """
+        Run `sql` over `count` (recipe, user) pairs, popular recipes and active
+        users drawn more often, and return the rows inserted.
+        """
+        recipes = zipf_sample(rng, recipe_ids, count, self.skew)
+        users = zipf_sample(rng, user_ids, count, self.skew * 0.8)
+        inserted = 0
+        with connection.cursor() as cursor:
+            for start in range(0, count, INSERT_BATCH):
+                cursor.execute(sql, [
+                    recipes[start:start + INSERT_BATCH].tolist(),
+                    users[start:start + INSERT_BATCH].tolist(),
+                ])
+                inserted += cursor.rowcount
+        return inserted
+    
+    def seed_comments(self, count, recipe_ids, user_ids, rng):
+        recipes = zipf_sample(rng, recipe_ids, count, self.skew)
+        authors = zipf_sample(rng, user_ids, count, self.skew * 0.8)
+        words = np.asarray(WORDS)
+        lengths = rng.integers(3, 30, size=count)
+        inserted = 0
+        with connection.cursor() as cursor:
+            for batch in chunked(range(count), INSERT_BATCH):
+                texts = [" ".join(rng.choice(words, size=lengths[index])) for index in batch]
+                cursor.execute(
+                    f"""
+                    INSERT INTO {_table(Comment)} (recipe_id, author_id, text, created_at, updated_at)
+                    SELECT drawn.recipe_id, drawn.author_id, drawn.text, stamp.at, stamp.at
+                    FROM unnest(%s::bigint[], %s::bigint[], %s::text[]) AS drawn(recipe_id, author_id, text)
+                    JOIN {_table(Recipe)} recipe ON recipe.id = drawn.recipe_id
+                    CROSS JOIN LATERAL (
+                        SELECT recipe.created_at + random() * (now() - recipe.created_at) AS at
+                    ) stamp
+                    """,
+                    [recipes[batch[0]:batch[-1] + 1].tolist(), authors[batch[0]:batch[-1] + 1].tolist(), texts],
+                )
+                inserted += cursor.rowcount
+        return inserted
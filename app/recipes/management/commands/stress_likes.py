@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from recipes import services
+from recipes.models import Like, Recipe
+from recipes.stats import stat_totals
+
+
+class Command(BaseCommand):
+    help = "Hammer one recipe with concurrent like/unlike/toggle calls and check the counters stay exact."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--users", type=int, default=20,
+                            help="Users shared by the workers, so calls for one user collide.")
+        parser.add_argument("--operations", type=int, default=200,
+                            help="Calls made by each worker.")
+        parser.add_argument("--seed", type=int, default=0)
+    
+    def handle(self, *args, **options):
+        User = get_user_model()
+        prefix = f"stress-likes-{int(time.time() * 1000)}"
+        author = User.objects.create(username=prefix)
+        users = User.objects.bulk_create(
+            User(username=f"{prefix}-{index}") for index in range(options["users"])
+        )
+        recipe = Recipe.objects.create(
+            title=prefix, author=author, ingredients="-", instructions="-", cooking_time=1, servings=1,
+        )
+        likes_before = stat_totals()["likes"]
+        errors = []
+        barrier = threading.Barrier(options["workers"])
+        operations = [services.like_recipe, services.unlike_recipe, services.toggle_like]
+        
+        def worker(seed, calls):
+            rng = random.Random(seed)
+            target = Recipe.objects.only("pk", "slug", "author_id", "likes_count").get(pk=recipe.pk)
+            try:
+                barrier.wait()
+                for call in calls(rng):
+                    call(target)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+        
+        def run(calls):
+            threads = [
+                threading.Thread(target=worker, args=(options["seed"] + index, calls))
+                for index in range(options["workers"])
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            return time.perf_counter() - started
+        
+        def random_calls(rng):
+            for _ in range(options["operations"]):
+                operation, user = rng.choice(operations), rng.choice(users)
+                yield lambda target: operation(target, user)
+        
+        def unlike_all(rng):
+            for user in users:
+                yield lambda target, user=user: services.unlike_recipe(target, user)
+        
+        try:
+            elapsed = run(random_calls)
+            calls = options["workers"] * options["operations"]
+            stored = Recipe.objects.get(pk=recipe.pk).likes_count
+            actual = Like.objects.filter(recipe=recipe).count()
+            self.stdout.write(
+                f"{calls} calls in {elapsed:.2f}s ({calls / elapsed:.0f}/s): "
+                f"likes_count={stored}, like rows={actual}"
+            )
+            run(unlike_all)
+            stored_after = Recipe.objects.get(pk=recipe.pk).likes_count
+            likes_after = stat_totals()["likes"]
+            self.stdout.write(f"After unliking everything: likes_count={stored_after}, "
+                              f"site like total moved by {likes_after - likes_before}")
+            
+            if errors:
+                raise CommandError(f"{len(errors)} worker(s) failed: {errors[0]!r}")
+            if stored != actual or stored_after != 0 or likes_after != likes_before:
+                raise CommandError("Like counters drifted.")
+            self.stdout.write(self.style.SUCCESS("Counters exact."))
+        finally:
+            User.objects.filter(username__startswith=prefix).delete()
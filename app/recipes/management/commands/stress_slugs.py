@@ -0,0 +1,68 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from recipes.models import Recipe, SlugCounter
+from recipes.slugs import slug_base
+
+
+class Command(BaseCommand):
+    help = "Create recipes with one title from parallel threads and check every slug comes out unique."
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--per-worker", type=int, default=50,
+                            help="Recipes created by each worker.")
+        parser.add_argument("--keep", action="store_true",
+                            help="Leave the created recipes in place.")
+    
+    def handle(self, *args, **options):
+        title = f"Slug stress {int(time.time())}"
+        author = get_user_model().objects.create(username=f"stress-slugs-{int(time.time() * 1000)}")
+        barrier = threading.Barrier(options["workers"])
+        errors = []
+        queries = []
+        
+        def worker():
+            counted = []
+            try:
+                barrier.wait()
+                with connection.execute_wrapper(lambda execute, *args: counted.append(1) or execute(*args)):
+                    for _ in range(options["per_worker"]):
+                        Recipe.objects.create(
+                            title=title, author=author, ingredients="-", instructions="-",
+                            cooking_time=1, servings=1,
+                        )
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                queries.append(len(counted))
+                connection.close()
+        
+        threads = [threading.Thread(target=worker) for _ in range(options["workers"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        
+        try:
+            slugs = list(Recipe.objects.filter(author=author).values_list("slug", flat=True))
+            expected = options["workers"] * options["per_worker"]
+            self.stdout.write(
+                f"{len(slugs)} recipe(s), {len(set(slugs))} distinct slug(s) in {elapsed:.2f}s, "
+                f"{sum(queries) / max(len(slugs), 1):.1f} queries per create"
+            )
+            if errors:
+                raise CommandError(f"{len(errors)} worker(s) failed: {errors[0]!r}")
+            if len(slugs) != expected or len(set(slugs)) != len(slugs):
+                raise CommandError(f"Expected {expected} recipes with unique slugs.")
+            self.stdout.write(self.style.SUCCESS("All slugs unique."))
+        finally:
+            if not options["keep"]:
+                author.delete()
+                SlugCounter.objects.filter(base=slug_base(title)).delete()
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.models import Recipe
+from recipes.services import drifted_counters, refresh_counters
+
+
+class Command(BaseCommand):
+    help = ("Verify Recipe.likes_count/comments_count/favorites_count against the like, comment and "
+            "favorite tables and repair drift.")
+    
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Number of recipes checked per query.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report drifted recipes without fixing them.")
+    
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_pk = 0
+        checked = drifted = 0
+        
+        while True:
+            batch_ids = list(
+                Recipe.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch_ids:
+                break
+            last_pk = batch_ids[-1]
+            checked += len(batch_ids)
+            
+            with transaction.atomic():
+                batch = Recipe.objects.filter(pk__in=batch_ids)
+                drifted_ids = list(drifted_counters(batch).values_list("pk", flat=True))
+                if drifted_ids and not options["dry_run"]:
+                    refresh_counters(Recipe.objects.filter(pk__in=drifted_ids))
+            drifted += len(drifted_ids)
+            
+            if options["verbosity"] > 1 and drifted_ids:
+                self.stdout.write(f"Drifted recipe ids: {drifted_ids}")
+        
+        action = "found" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} recipe(s), {action} {drifted} with drifted counters."
+        ))
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.10 on 2026-10-18 02:53
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+BACKFILL_SEARCH_VECTOR = """
+UPDATE recipes_recipe AS r SET search_vector =
+    setweight(to_tsvector('english', r.title), 'A')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(t.name, ' ')
+        FROM taggit_taggeditem ti
+        JOIN taggit_tag t ON t.id = ti.tag_id
+        JOIN django_content_type ct ON ct.id = ti.content_type_id
+        WHERE ct.app_label = 'recipes' AND ct.model = 'recipe' AND ti.object_id = r.id
+    ), '')), 'B')
+    || setweight(to_tsvector('english', r.ingredients), 'C')
+    || setweight(to_tsvector('english', r.description), 'D');
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+        migrations.RunSQL(BACKFILL_SEARCH_VECTOR, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.10 on 2026-10-18 02:54
+
+from django.db import migrations, models
+
+
+BACKFILL_COUNTERS = """
+UPDATE recipes_recipe AS r SET
+    likes_count = (SELECT count(*) FROM recipes_like l WHERE l.recipe_id = r.id),
+    comments_count = (SELECT count(*) FROM recipes_comment c WHERE c.recipe_id = r.id);
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0003_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL_COUNTERS, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_customuser_profile_picture_variants'),
+        ('recipes', '0010_ingredient_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('recipes', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('comments', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'daily activity',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='recipe_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('recipes', models.IntegerField(default=0)),
+                ('published', models.IntegerField(default=0)),
+                ('likes_received', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'author stats',
+                'indexes': [models.Index(fields=['-published', '-likes_received'], name='author_stats_top_idx')],
+            },
+        ),
+    ]
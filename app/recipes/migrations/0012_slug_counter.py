@@ -0,0 +1,35 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:40
+
+from django.db import migrations, models
+
+
+# Existing slugs claim their own base and, when they end in "-<n>", suffix n
+# of the shorter base
+BACKFILL_SLUG_COUNTERS = r"""
+INSERT INTO recipes_slugcounter (base, last)
+SELECT base, max(n) FROM (
+    SELECT slug AS base, 1 AS n FROM recipes_recipe
+    UNION ALL
+    SELECT substring(slug from '^(.+)-\d+$'),
+           LEAST(substring(slug from '-(\d+)$')::numeric, 2147483647)::integer
+    FROM recipes_recipe WHERE slug ~ '^.+-\d+$'
+) AS claims
+GROUP BY base;
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_stats_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugCounter',
+            fields=[
+                ('base', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('last', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunSQL(BACKFILL_SLUG_COUNTERS, migrations.RunSQL.noop),
+    ]
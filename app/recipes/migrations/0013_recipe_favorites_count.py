@@ -0,0 +1,25 @@
+# Generated by Django 4.2.10 on 2026-10-18 03:44
+
+from django.db import migrations, models
+
+
+BACKFILL_FAVORITES = """
+UPDATE recipes_recipe AS r SET
+    favorites_count = (SELECT count(*) FROM users_customuser_favorite_recipes f WHERE f.recipe_id = r.id);
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_slug_counter'),
+        ('users', '0002_customuser_favorite_recipes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(BACKFILL_FAVORITES, migrations.RunSQL.noop),
+    ]
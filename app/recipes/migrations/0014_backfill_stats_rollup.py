@@ -0,0 +1,67 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import migrations
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+# A frozen copy of recipes.stats.rebuild_rollups() as of this migration
+HISTORY_DAYS = 90
+
+
+def backfill(apps, schema_editor):
+    # 0011 created the rollup tables empty; fill them from the existing rows
+    Recipe = apps.get_model("recipes", "Recipe")
+    Like = apps.get_model("recipes", "Like")
+    Comment = apps.get_model("recipes", "Comment")
+    StatCounter = apps.get_model("recipes", "StatCounter")
+    DailyActivity = apps.get_model("recipes", "DailyActivity")
+    AuthorStats = apps.get_model("recipes", "AuthorStats")
+    
+    totals = {
+        f"recipes:{status}": count
+        for status, count in Recipe.objects.values_list("status").annotate(Count("pk")).order_by()
+    }
+    totals["likes"] = Like.objects.count()
+    totals["comments"] = Comment.objects.count()
+    StatCounter.objects.all().delete()
+    StatCounter.objects.bulk_create(StatCounter(key=key, value=value) for key, value in totals.items())
+    
+    since = timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=HISTORY_DAYS), time.min))
+    days = defaultdict(dict)
+    for field, model in (("recipes", Recipe), ("likes", Like), ("comments", Comment)):
+        rows = (
+            model.objects.filter(created_at__gte=since)
+            .annotate(day=TruncDate("created_at")).values_list("day")
+            .annotate(count=Count("pk")).order_by()
+        )
+        for day, count in rows:
+            days[day][field] = count
+    DailyActivity.objects.all().delete()
+    DailyActivity.objects.bulk_create(DailyActivity(day=day, **counts) for day, counts in days.items())
+    
+    authors = defaultdict(dict)
+    rows = Recipe.objects.values_list("author").annotate(
+        recipes=Count("pk"), published=Count("pk", filter=Q(status="published"))
+    ).order_by()
+    for author_id, recipes, published in rows:
+        authors[author_id].update(recipes=recipes, published=published)
+    for author_id, likes in Like.objects.values_list("recipe__author").annotate(Count("pk")).order_by():
+        authors[author_id]["likes_received"] = likes
+    AuthorStats.objects.all().delete()
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=author_id, **counts) for author_id, counts in authors.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_recipe_favorites_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.urls import reverse
 from django.conf import settings
 from taggit.managers import TaggableManager
@@ -28,27 +30,52 @@ class Recipe(models.Model):
     servings = models.PositiveIntegerField()
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES, default="medium")
     image = models.ImageField(upload_to="recipe_images", blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="draft")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     tags = TaggableManager(blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    favorites_count = models.PositiveIntegerField(default=0, editable=False)
+    ingredient_count = models.PositiveSmallIntegerField(default=0, editable=False)
     
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="recipe_search_vector_idx"),
+            # Keyset pagination seeks on (created_at, id), optionally within a status or author
+            models.Index(fields=["-created_at", "-id"], name="recipe_created_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="recipe_status_created_idx"),
+            models.Index(fields=["author", "-created_at", "-id"], name="recipe_author_created_idx"),
+            # Incremental exports resume from the last updated_at seen
+            models.Index(fields=["updated_at", "id"], name="recipe_updated_idx"),
+        ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            from .slugs import save_with_slug
+            return save_with_slug(self, *args, **kwargs)
+        return super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse("recipe_detail", kwargs={"slug": self.slug})
     
+    def get_image_sources(self):
+        from .images import image_sources
+        return image_sources(self.image, self.image_variants)
+    
     @property
     def total_likes(self):
-        return self.likes.count()
+        return self.likes_count
     
     @property
     def total_comments(self):
-        return self.comments.count()
+        return self.comments_count
 
 
 class Comment(models.Model):
@@ -62,6 +89,10 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Trending refreshes read comments by time range
+            models.Index(fields=["created_at"], name="comment_created_idx"),
+        ]
     
     def __str__(self):
         return f"Comment by {self.author.username} on {self.recipe.title}"
@@ -76,6 +107,163 @@ class Like(models.Model):
     
     class Meta:
         unique_together = ("recipe", "user")
+        indexes = [
+            # Trending refreshes read likes by time range
+            models.Index(fields=["created_at"], name="like_created_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} likes {self.recipe.title}"
+
+
+class TrendingScore(models.Model):
+    """
+    Materialized trending score, maintained by recipes.trending.refresh_trending.
+    
+    Scores are relative to TrendingState.epoch, so they only grow and rows
+    can be ranked without applying the decay at read time.
+    """
+    recipe = models.OneToOneField(
+        Recipe, on_delete=models.CASCADE, primary_key=True, related_name="trending"
+    )
+    score = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=["-score"], name="trending_score_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.recipe} ({self.score:.2f})"
+
+
+class TrendingState(models.Model):
+    """
+    Single row holding the decay epoch and how far events have been folded in.
+    """
+    epoch = models.DateTimeField()
+    refreshed_until = models.DateTimeField()
+
+
+class RecipeNeighbor(models.Model):
+    """
+    Precomputed "similar recipes" entry, maintained by recipes.similarity.
+    """
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="listed_as_neighbor")
+    score = models.FloatField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["recipe", "neighbor"], name="unique_recipe_neighbor"),
+        ]
+        indexes = [
+            models.Index(fields=["recipe", "-score"], name="neighbor_recipe_score_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.recipe} ~ {self.neighbor} ({self.score:.2f})"
+
+
+class Ingredient(models.Model):
+    """
+    Normalized ingredient name ("2 cups chopped tomatoes" -> "tomato").
+    """
+    name = models.CharField(max_length=100, unique=True)
+    
+    def __str__(self):
+        return self.name
+
+
+class RecipeIngredient(models.Model):
+    """
+    One parsed line of Recipe.ingredients; the (ingredient, recipe) index is
+    the posting list used by pantry search.
+    """
+    # Both lookups are served by the composite unique constraint and index below
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name="ingredient_entries", db_index=False
+    )
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, related_name="recipe_entries", db_index=False
+    )
+    # Copy of Recipe.ingredient_count so ranking never has to read the recipe rows
+    recipe_size = models.PositiveSmallIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["recipe", "ingredient"], name="unique_recipe_ingredient"),
+        ]
+        indexes = [
+            models.Index(fields=["ingredient", "recipe"], include=["recipe_size"], name="ingredient_postings_idx"),
+        ]
+    
+    def __str__(self):
+        return f"{self.ingredient} in {self.recipe}"
+
+
+class SlugCounter(models.Model):
+    """
+    Highest suffix handed out for a slug base: "pasta" -> 3 means "pasta",
+    "pasta-2" and "pasta-3" are taken. Maintained by recipes.slugs.
+    """
+    base = models.CharField(max_length=255, primary_key=True)
+    last = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.base} ({self.last})"
+
+
+class StatCounter(models.Model):
+    """
+    Shard of a running site-wide total ("recipes:published#3", "likes#0", ...),
+    adjusted by the write paths through recipes.stats; recipes.stats.stat_totals()
+    adds up the shards of each total.
+    """
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class DailyActivity(models.Model):
+    """
+    Recipes, likes and comments created on one day (and not deleted since),
+    recounted by recipes.stats.refresh_daily_activity().
+    """
+    day = models.DateField(primary_key=True)
+    recipes = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+    comments = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ["-day"]
+        verbose_name_plural = "daily activity"
+    
+    def __str__(self):
+        return str(self.day)
+
+
+class AuthorStats(models.Model):
+    """
+    Per-author recipe and like totals for the admin dashboard. Rows are not
+    removed with their user; recipes.stats.rebuild_stats() drops them.
+    """
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.DO_NOTHING, primary_key=True,
+        related_name="recipe_stats", db_constraint=False,
+    )
+    recipes = models.IntegerField(default=0)
+    published = models.IntegerField(default=0)
+    likes_received = models.IntegerField(default=0)
+    
+    class Meta:
+        verbose_name_plural = "author stats"
+        indexes = [
+            models.Index(fields=["-published", "-likes_received"], name="author_stats_top_idx"),
+        ]
     
     def __str__(self):
-        return f"{self.user.username} likes {self.recipe.title}" 
\ No newline at end of file
+        return f"{self.author_id}: {self.published} published"
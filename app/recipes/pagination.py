@@ -0,0 +1,102 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404
+
+
+KEYSET_ORDERING = ("-created_at", "-id")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(obj):
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def uses_keyset_ordering(queryset):
+    """
+    True when the queryset is ordered newest first, i.e. it can be paged by (created_at, id).
+    """
+    order_by = tuple(queryset.query.order_by)
+    if not order_by and queryset.query.default_ordering:
+        order_by = tuple(queryset.model._meta.ordering)
+    return order_by in (("-created_at",), KEYSET_ORDERING)
+
+
+def _keyset_slice(queryset, cursor, page_size):
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(pk__lt=pk)
+        )
+    # One extra row tells whether there is a next page
+    return queryset[:page_size + 1]
+
+
+def _split_page(items, page_size):
+    next_cursor = encode_cursor(items[page_size - 1]) if len(items) > page_size else None
+    return items[:page_size], next_cursor
+
+
+def keyset_page(queryset, cursor, page_size):
+    """
+    Return the page after `cursor` and the cursor for the page after it (or None).
+    The range filter lets Postgres seek straight into the (created_at, id) index,
+    so the cost of a page does not grow with its depth.
+    """
+    return _split_page(list(_keyset_slice(queryset, cursor, page_size)), page_size)
+
+
+async def akeyset_page(queryset, cursor, page_size):
+    """
+    keyset_page() for async views.
+    """
+    return _split_page([item async for item in _keyset_slice(queryset, cursor, page_size)], page_size)
+
+
+class KeysetPaginationMixin:
+    """
+    "Load more" pagination for list views ordered newest first. Views ordered any
+    other way (e.g. by search rank) keep the regular paginate_by page numbers.
+    
+    Keyset pages have no page_obj: list templates render `load_more_url`, when
+    set, as a plain link to the next page instead of page number controls.
+    """
+    cursor_kwarg = "cursor"
+    next_cursor = None
+    
+    def paginate_queryset(self, queryset, page_size):
+        if not uses_keyset_ordering(queryset):
+            return super().paginate_queryset(queryset, page_size)
+        
+        try:
+            items, self.next_cursor = keyset_page(
+                queryset, self.request.GET.get(self.cursor_kwarg), page_size
+            )
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        return (None, None, items, self.next_cursor is not None)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["load_more_url"] = None
+        if self.next_cursor:
+            query = self.request.GET.copy()
+            query[self.cursor_kwarg] = self.next_cursor
+            context["load_more_url"] = f"?{query.urlencode()}"
+        return context
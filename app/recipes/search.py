@@ -0,0 +1,78 @@
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from taggit.models import TaggedItem
+
+
+SEARCH_CONFIG = "english"
+
+# Fields that feed Recipe.search_vector, used to skip refreshes on unrelated saves
+SEARCHABLE_FIELDS = {"title", "ingredients", "description"}
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tag_names(model):
+    content_type = ContentType.objects.get_for_model(model)
+    return Subquery(
+        TaggedItem.objects.filter(content_type=content_type, object_id=OuterRef("pk"))
+        .values("object_id")
+        .annotate(names=StringAgg("tag__name", delimiter=" "))
+        .values("names")[:1]
+    )
+
+
+def build_search_vector(model):
+    """
+    Weighted document for a recipe: title > tags > ingredients > description.
+    """
+    return (
+        SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Coalesce(_tag_names(model), Value(""), output_field=TextField()), weight="B", config=SEARCH_CONFIG)
+        + SearchVector("ingredients", weight="C", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(recipe_ids=None):
+    """
+    Recompute search_vector in a single UPDATE for the given recipes (or all).
+    """
+    from .models import Recipe
+    
+    queryset = Recipe.objects.all()
+    if recipe_ids is not None:
+        queryset = queryset.filter(pk__in=recipe_ids)
+    return queryset.update(search_vector=build_search_vector(Recipe))
+
+
+def build_search_query(text):
+    """
+    Turn free text into a prefix-matching tsquery ("chick cur" -> chick:* & cur:*).
+    Returns None when the text has no searchable terms.
+    """
+    terms = _TERM_RE.findall((text or "").lower())
+    if not terms:
+        return None
+    raw = " & ".join(f"{term}:*" for term in terms)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_recipes(queryset, text):
+    """
+    Filter a recipe queryset by full-text match and order it by relevance.
+    Shared by the HTML list view and the API search filter.
+    """
+    query = build_search_query(text)
+    if query is None:
+        return queryset
+    
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F("search_vector"), query))
+        .order_by("-search_rank", "-created_at", "-id")
+    )
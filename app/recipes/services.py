@@ -0,0 +1,297 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.metrics import count_cache_lookup, count_write
+from jobs.queue import enqueue
+
+from .cache import group_versions, invalidate_groups, invalidate_recipe_counts, invalidate_recipe_pages
+from .models import Comment, Like, Recipe
+from .stats import record_comments, record_likes, record_recipes
+
+
+def schedule_neighbor_update(recipe_id):
+    enqueue("recipes.update_neighbors", recipe_id, unique_key=f"neighbors:{recipe_id}")
+
+
+def _adjust_counters(recipe_id, **deltas):
+    # Leaves updated_at alone: it dates edits to the recipe itself, which
+    # exports resume from; HTTP validators read the counters directly
+    Recipe.objects.filter(pk=recipe_id).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+# One statement per like change: the Like delete/insert and the counter
+# update run as CTEs and the new count comes back in the same round trip.
+# ON CONFLICT and DELETE ... RETURNING make double submits harmless, and the
+# counter row lock keeps likes_count exact under concurrency. A toggle sets
+# both flags: the insert only runs when the delete found nothing.
+_CHANGE_LIKE_SQL = """
+    WITH removed AS (
+        DELETE FROM {like}
+        WHERE %(remove)s AND recipe_id = %(recipe_id)s AND user_id = %(user_id)s
+        RETURNING 1
+    ), added AS (
+        INSERT INTO {like} (recipe_id, user_id, created_at)
+        SELECT %(recipe_id)s, %(user_id)s, %(now)s
+        WHERE %(add)s AND NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT (recipe_id, user_id) DO NOTHING
+        RETURNING 1
+    ), counted AS (
+        UPDATE {recipe}
+        SET likes_count = likes_count + (SELECT count(*) FROM added) - (SELECT count(*) FROM removed)
+        WHERE id = %(recipe_id)s AND EXISTS (SELECT 1 FROM added UNION ALL SELECT 1 FROM removed)
+        RETURNING likes_count
+    )
+    SELECT (SELECT count(*) FROM added) - (SELECT count(*) FROM removed),
+           COALESCE((SELECT likes_count FROM counted), (SELECT likes_count FROM {recipe} WHERE id = %(recipe_id)s))
+"""
+
+
+def _change_like(recipe, user, add, remove):
+    """
+    Apply a like change and return the change in likes (-1, 0 or 1). The
+    recipe's likes_count is set to the new value.
+    """
+    sql = _CHANGE_LIKE_SQL.format(
+        like=connection.ops.quote_name(Like._meta.db_table),
+        recipe=connection.ops.quote_name(Recipe._meta.db_table),
+    )
+    params = {"recipe_id": recipe.pk, "user_id": user.pk, "now": timezone.now(), "add": add, "remove": remove}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            delta, recipe.likes_count = cursor.fetchone()
+        if delta:
+            record_likes({recipe.author_id: delta})
+            count_write("like", "created" if delta > 0 else "deleted")
+    if delta:
+        invalidate_recipe_counts(recipe.slug)
+    return delta
+
+
+def like_recipe(recipe, user):
+    """
+    Like `recipe` for `user`; liking twice is a no-op. Returns True when a like was added.
+    """
+    return _change_like(recipe, user, add=True, remove=False) > 0
+
+
+def unlike_recipe(recipe, user):
+    """
+    Remove `user`'s like from `recipe`, if any. Returns True when a like was removed.
+    """
+    return _change_like(recipe, user, add=False, remove=True) < 0
+
+
+def toggle_like(recipe, user):
+    """
+    Like or unlike `recipe` for `user`. Returns True when the recipe is now liked.
+    """
+    # 0 means a concurrent request added the like first, so it is liked
+    return _change_like(recipe, user, add=True, remove=True) >= 0
+
+
+_Favorite = Recipe.favorited_by.through
+_FAVORITE_USER = _Favorite._meta.get_field("customuser").attname
+_FAVORITE_RECIPE = _Favorite._meta.get_field("recipe").attname
+
+# Same shape as _CHANGE_LIKE_SQL, over the favorites join table
+_CHANGE_FAVORITE_SQL = """
+    WITH removed AS (
+        DELETE FROM {favorite}
+        WHERE %(remove)s AND {recipe_column} = %(recipe_id)s AND {user_column} = %(user_id)s
+        RETURNING 1
+    ), added AS (
+        INSERT INTO {favorite} ({recipe_column}, {user_column})
+        SELECT %(recipe_id)s, %(user_id)s
+        WHERE %(add)s AND NOT EXISTS (SELECT 1 FROM removed)
+        ON CONFLICT ({recipe_column}, {user_column}) DO NOTHING
+        RETURNING 1
+    ), counted AS (
+        UPDATE {recipe}
+        SET favorites_count = favorites_count + (SELECT count(*) FROM added) - (SELECT count(*) FROM removed)
+        WHERE id = %(recipe_id)s AND EXISTS (SELECT 1 FROM added UNION ALL SELECT 1 FROM removed)
+        RETURNING favorites_count
+    )
+    SELECT (SELECT count(*) FROM added) - (SELECT count(*) FROM removed),
+           COALESCE((SELECT favorites_count FROM counted), (SELECT favorites_count FROM {recipe} WHERE id = %(recipe_id)s))
+"""
+
+
+def _change_favorite(recipe, user, add, remove):
+    """
+    Apply a favorite change and return the change in favorites (-1, 0 or 1).
+    The recipe's favorites_count is set to the new value.
+    """
+    quote = connection.ops.quote_name
+    sql = _CHANGE_FAVORITE_SQL.format(
+        favorite=quote(_Favorite._meta.db_table),
+        recipe=quote(Recipe._meta.db_table),
+        recipe_column=quote(_FAVORITE_RECIPE),
+        user_column=quote(_FAVORITE_USER),
+    )
+    params = {"recipe_id": recipe.pk, "user_id": user.pk, "add": add, "remove": remove}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            delta, recipe.favorites_count = cursor.fetchone()
+        if delta:
+            count_write("favorite", "created" if delta > 0 else "deleted")
+    if delta:
+        invalidate_groups(favorites_group(user.pk))
+        invalidate_recipe_counts(recipe.slug)
+    return delta
+
+
+def favorite_recipe(recipe, user):
+    return _change_favorite(recipe, user, add=True, remove=False) > 0
+
+
+def unfavorite_recipe(recipe, user):
+    return _change_favorite(recipe, user, add=False, remove=True) < 0
+
+
+def toggle_favorite(recipe, user):
+    """
+    Add `recipe` to `user`'s favorites or take it out. Returns True when it is now a favorite.
+    """
+    return _change_favorite(recipe, user, add=True, remove=True) >= 0
+
+
+@transaction.atomic
+def add_comment(recipe, author, text):
+    comment = Comment.objects.create(recipe=recipe, author=author, text=text)
+    _adjust_counters(recipe.pk, comments_count=1)
+    record_comments(1)
+    count_write("comment", "created")
+    invalidate_recipe_counts(recipe.slug)
+    return comment
+
+
+@transaction.atomic
+def delete_comment(comment):
+    recipe = comment.recipe
+    comment.delete()
+    _adjust_counters(recipe.pk, comments_count=-1)
+    record_comments(-1)
+    count_write("comment", "deleted")
+    invalidate_recipe_counts(recipe.slug)
+
+
+@transaction.atomic
+def reset_likes(recipes):
+    """
+    Remove every like on the given recipe queryset and zero their counters.
+    """
+    likes = Like.objects.filter(recipe__in=recipes)
+    record_likes({
+        author_id: -count
+        for author_id, count in likes.values_list("recipe__author").annotate(Count("pk")).order_by()
+    })
+    deleted, _ = likes.delete()
+    count_write("like", "deleted", deleted)
+    invalidate_recipe_counts(*recipes.values_list("slug", flat=True))
+    return recipes.update(likes_count=0)
+
+
+@transaction.atomic
+def set_status(recipes, status):
+    """
+    Move a recipe queryset to `status` with one UPDATE, keeping the stats
+    rollup, page caches and similar recipe lists in step (the UPDATE sends
+    no post_save). Returns the number of recipes changed.
+    """
+    changing = recipes.exclude(status=status)
+    transitions = {
+        (author_id, previous, status): count
+        for author_id, previous, count in changing.values_list("author", "status").annotate(Count("pk")).order_by()
+    }
+    changed = list(changing.values_list("pk", "slug"))
+    invalidate_recipe_pages(*(slug for pk, slug in changed))
+    updated = changing.filter(pk__in=[pk for pk, slug in changed]).update(status=status, updated_at=timezone.now())
+    for pk, slug in changed:
+        schedule_neighbor_update(pk)
+    record_recipes(transitions)
+    count_write("recipe", "updated", updated)
+    return updated
+
+
+def liked_recipe_ids(user, recipe_ids):
+    """
+    Subset of `recipe_ids` that `user` has liked, in one query.
+    """
+    return set(
+        Like.objects.filter(user=user, recipe_id__in=recipe_ids).values_list("recipe_id", flat=True)
+    )
+
+
+def favorites_group(user_id):
+    return f"favorites:{user_id}"
+
+
+def favorite_recipe_ids(user):
+    """
+    Ids of every recipe in `user`'s favorites, cached per user. The cache key
+    carries a version bumped after each change commits, so a set read
+    before a change can never be stored as current.
+    """
+    version = group_versions([favorites_group(user.pk)])[favorites_group(user.pk)]
+    key = f"favorites:{user.pk}:{version}"
+    recipe_ids = cache.get(key)
+    count_cache_lookup("favorites", recipe_ids is not None)
+    if recipe_ids is None:
+        recipe_ids = frozenset(
+            _Favorite.objects.filter(**{_FAVORITE_USER: user.pk}).values_list(_FAVORITE_RECIPE, flat=True)
+        )
+        cache.set(key, recipe_ids, getattr(settings, "FAVORITES_CACHE_TIMEOUT", 3600))
+    return recipe_ids
+
+
+def favorited_recipe_ids(user, recipe_ids):
+    """
+    Subset of `recipe_ids` in `user`'s favorites, answered from the cached set.
+    """
+    return favorite_recipe_ids(user).intersection(recipe_ids)
+
+
+def _count_of(model):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(recipe=OuterRef("pk"))
+            .order_by()
+            .values("recipe")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def drifted_counters(recipes=None):
+    """
+    Recipes whose stored like/comment/favorite counters disagree with the underlying rows.
+    """
+    recipes = Recipe.objects.all() if recipes is None else recipes
+    return recipes.annotate(
+        actual_likes=_count_of(Like),
+        actual_comments=_count_of(Comment),
+        actual_favorites=_count_of(_Favorite),
+    ).filter(
+        ~Q(likes_count=F("actual_likes"))
+        | ~Q(comments_count=F("actual_comments"))
+        | ~Q(favorites_count=F("actual_favorites"))
+    )
+
+
+def refresh_counters(recipes):
+    """
+    Recount likes, comments and favorites for a recipe queryset in one UPDATE.
+    """
+    return recipes.update(
+        likes_count=_count_of(Like),
+        comments_count=_count_of(Comment),
+        favorites_count=_count_of(_Favorite),
+    )
@@ -0,0 +1,137 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.metrics import count_write
+
+from .cache import invalidate_groups, invalidate_recipe_pages
+from .images import schedule_image_processing
+from .ingredients import index_ingredients
+from .models import Recipe
+from .search import SEARCHABLE_FIELDS, update_search_vectors
+from .services import favorites_group, refresh_counters, schedule_neighbor_update
+from .stats import record_recipes
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_search_vector(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not SEARCHABLE_FIELDS.intersection(update_fields):
+        return
+    update_search_vectors([instance.pk])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def refresh_search_vector_on_tags(sender, instance, action, reverse, **kwargs):
+    if reverse or action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if isinstance(instance, Recipe):
+        update_search_vectors([instance.pk])
+        invalidate_recipe_pages(instance.slug)
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_ingredient_index(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and "ingredients" not in update_fields:
+        return
+    # Title edits, publishing and slug retries leave the postings alone
+    if not created and instance.ingredients == getattr(instance, "_previous_ingredients", None):
+        return
+    index_ingredients([instance])
+
+
+# Fields that change which recipes are similar to a recipe
+SIMILARITY_FIELDS = {"ingredients", "status"}
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_neighbors(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not SIMILARITY_FIELDS.intersection(update_fields):
+        return
+    schedule_neighbor_update(instance.pk)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def refresh_neighbors_on_tags(sender, instance, action, reverse, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear") and isinstance(instance, Recipe):
+        schedule_neighbor_update(instance.pk)
+
+
+@receiver(pre_save, sender=Recipe)
+def remember_previous_values(sender, instance, raw=False, **kwargs):
+    instance._previous_slug = instance._previous_status = instance._previous_ingredients = None
+    if not raw and instance.pk:
+        instance._previous_slug, instance._previous_status, instance._previous_ingredients = (
+            Recipe.objects.filter(pk=instance.pk).values_list("slug", "status", "ingredients").first()
+            or (None, None, None)
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def record_recipe_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else instance._previous_status
+    if created or previous != instance.status:
+        record_recipes({(instance.author_id, previous, instance.status): 1})
+
+
+@receiver(post_delete, sender=Recipe)
+def record_recipe_stats_on_delete(sender, instance, **kwargs):
+    record_recipes({(instance.author_id, instance.status, None): 1})
+
+
+@receiver(post_save, sender=Recipe)
+def process_recipe_image(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_image_processing(instance, "image")
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_cached_pages(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_recipe_pages(instance.slug, getattr(instance, "_previous_slug", None))
+
+
+@receiver(post_delete, sender=Recipe)
+def invalidate_cached_pages_on_delete(sender, instance, **kwargs):
+    invalidate_recipe_pages(instance.slug)
+
+
+@receiver(post_save, sender=Recipe)
+def count_recipe_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        count_write("recipe", "created" if created else "updated")
+
+
+@receiver(post_delete, sender=Recipe)
+def count_recipe_delete(sender, instance, **kwargs):
+    count_write("recipe", "deleted")
+
+
+@receiver(m2m_changed, sender=Recipe.favorited_by.through)
+def refresh_favorites(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Favorites changed through the relation itself (the admin user form,
+    .add()/.remove()) rather than recipes.services: recount and drop the
+    cached id sets.
+    """
+    # reverse: `instance` is a recipe and pk_set holds user ids
+    related = instance.favorited_by if reverse else instance.favorite_recipes
+    if action == "pre_clear":
+        instance._cleared_favorites = set(related.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    changed = instance._cleared_favorites if action == "post_clear" else pk_set
+    if not changed:
+        return
+    recipe_ids, user_ids = ({instance.pk}, changed) if reverse else (changed, {instance.pk})
+    refresh_counters(Recipe.objects.filter(pk__in=recipe_ids))
+    count_write("favorite", "created" if action == "post_add" else "deleted", len(changed))
+    invalidate_groups(*(favorites_group(user_id) for user_id in user_ids))
@@ -0,0 +1,219 @@
+import re
+
+import numpy as np
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery
+from django.db import transaction
+from django.db.models import Count, F, Min, Window
+from django.db.models.functions import RowNumber
+from scipy import sparse
+from taggit.models import TaggedItem
+
+from .models import Recipe, RecipeNeighbor
+from .search import SEARCH_CONFIG
+
+
+NEIGHBORS_PER_RECIPE = 12
+
+# Words that say nothing about what a dish is: quantities, units, prep
+# verbs and staples found in almost every ingredient list
+STOPWORDS = {
+    "a", "an", "and", "or", "of", "the", "to", "for", "with", "in", "into", "at", "as", "per",
+    "cup", "cups", "tbsp", "tsp", "tablespoon", "tablespoons", "teaspoon", "teaspoons",
+    "g", "kg", "gram", "grams", "ml", "l", "oz", "ounce", "ounces", "lb", "lbs", "pound", "pounds",
+    "pinch", "dash", "handful", "piece", "pieces", "slice", "slices", "clove", "cloves", "can",
+    "large", "small", "medium", "fresh", "dried", "ground", "chopped", "diced", "minced",
+    "sliced", "grated", "finely", "roughly", "optional", "taste", "about", "plus", "more",
+    "salt", "water", "oil",
+}
+
+_TOKEN_RE = re.compile(r"[^\W\d_]{2,}", re.UNICODE)
+
+
+def ingredient_tokens(text):
+    return {token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS}
+
+
+def recipe_features(recipe_ids=None, queryset=None):
+    """
+    {recipe id: set of features} for published recipes, with "t:" tag and
+    "i:" ingredient features. Tags are fetched with one query.
+    """
+    if queryset is None:
+        queryset = Recipe.objects.filter(status="published")
+    if recipe_ids is not None:
+        queryset = queryset.filter(pk__in=recipe_ids)
+    features = {
+        pk: {f"i:{token}" for token in ingredient_tokens(ingredients)}
+        for pk, ingredients in queryset.values_list("pk", "ingredients").iterator(chunk_size=5000)
+    }
+    tagged = TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(Recipe), object_id__in=queryset.values("pk")
+    ).values_list("object_id", "tag__name")
+    for object_id, name in tagged.iterator(chunk_size=5000):
+        if object_id in features:
+            features[object_id].add(f"t:{name}")
+    return features
+
+
+def feature_matrix(features, vocabulary=None):
+    """
+    Binary CSR matrix with one row per recipe (in `features` order).
+    Unknown features are added to `vocabulary`.
+    """
+    if vocabulary is None:
+        vocabulary = {}
+    indptr, indices = [0], []
+    for feature_set in features.values():
+        for feature in feature_set:
+            indices.append(vocabulary.setdefault(feature, len(vocabulary)))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sparse.csr_matrix(
+        (data, np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(features), len(vocabulary)),
+    )
+    return matrix, vocabulary
+
+
+def jaccard_top_k(rows, matrix, ids, k=NEIGHBORS_PER_RECIPE, exclude=None):
+    """
+    Top-k Jaccard neighbours of every row of `rows` among the rows of `matrix`.
+    
+    The intersections come from one sparse product; union sizes follow from
+    the row sums. Returns one list of (recipe id, score) per row.
+    """
+    row_sizes = np.asarray(rows.sum(axis=1)).ravel()
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    intersections = (rows @ matrix.T).tocsr()
+    results = []
+    for index in range(rows.shape[0]):
+        start, end = intersections.indptr[index], intersections.indptr[index + 1]
+        columns = intersections.indices[start:end]
+        common = intersections.data[start:end]
+        scores = common / (row_sizes[index] + sizes[columns] - common)
+        if exclude is not None:
+            keep = ids[columns] != exclude[index]
+            columns, scores = columns[keep], scores[keep]
+        if len(scores) > k:
+            top = np.argpartition(-scores, k)[:k]
+            columns, scores = columns[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        results.append([(int(ids[columns[i]]), float(scores[i])) for i in order])
+    return results
+
+
+def rebuild_neighbors(batch_size=1000, k=NEIGHBORS_PER_RECIPE, progress=None):
+    """
+    Recompute the neighbours of every published recipe, `batch_size` rows
+    of the similarity matrix at a time.
+    """
+    features = recipe_features()
+    matrix, vocabulary = feature_matrix(features)
+    ids = np.fromiter(features, dtype=np.int64, count=len(features))
+    
+    for start in range(0, len(ids), batch_size):
+        batch_ids = ids[start:start + batch_size]
+        neighbors = jaccard_top_k(matrix[start:start + batch_size], matrix, ids, k=k, exclude=batch_ids)
+        with transaction.atomic():
+            RecipeNeighbor.objects.filter(recipe_id__in=batch_ids.tolist()).delete()
+            RecipeNeighbor.objects.bulk_create(
+                RecipeNeighbor(recipe_id=int(recipe_id), neighbor_id=neighbor_id, score=score)
+                for recipe_id, row in zip(batch_ids, neighbors)
+                for neighbor_id, score in row
+            )
+        if progress:
+            progress(min(start + batch_size, len(ids)), len(ids))
+    
+    # Drafts and deleted tags no longer take part
+    RecipeNeighbor.objects.exclude(recipe_id__in=Recipe.objects.filter(status="published")).delete()
+    return len(ids)
+
+
+def candidate_ids(recipe_id, features, limit=20000):
+    """
+    Published recipes sharing at least one tag or ingredient word with the
+    recipe, found through the tag table and the full-text GIN index.
+    """
+    published = Recipe.objects.filter(status="published").exclude(pk=recipe_id)
+    tags = [feature[2:] for feature in features if feature.startswith("t:")]
+    words = [feature[2:] for feature in features if feature.startswith("i:")]
+    
+    candidates = set()
+    if tags:
+        candidates.update(
+            TaggedItem.objects.filter(
+                content_type=ContentType.objects.get_for_model(Recipe),
+                tag__name__in=tags,
+                object_id__in=published.values("pk"),
+            ).values_list("object_id", flat=True)[:limit]
+        )
+    if words:
+        query = SearchQuery(" | ".join(words), search_type="raw", config=SEARCH_CONFIG)
+        candidates.update(published.filter(search_vector=query).values_list("pk", flat=True)[:limit])
+    return candidates
+
+
+@transaction.atomic
+def update_neighbors(recipe_id, k=NEIGHBORS_PER_RECIPE):
+    """
+    Refresh one recipe's neighbours after it changed, and add it to the lists
+    of the recipes it now beats. Lists it no longer qualifies for just lose
+    it; the next full rebuild fills them up again.
+    """
+    features = recipe_features([recipe_id])
+    if recipe_id not in features:
+        RecipeNeighbor.objects.filter(recipe_id=recipe_id).delete()
+        RecipeNeighbor.objects.filter(neighbor_id=recipe_id).delete()
+        return 0
+    
+    candidates = recipe_features(candidate_ids(recipe_id, features[recipe_id]))
+    matrix, vocabulary = feature_matrix(candidates)
+    row, vocabulary = feature_matrix(features, vocabulary)
+    matrix.resize((matrix.shape[0], len(vocabulary)))
+    ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+    
+    # Similarity is symmetric: the scores against all candidates are also
+    # the recipe's score in each candidate's own list
+    scores = dict(jaccard_top_k(row, matrix, ids, k=len(ids))[0]) if len(ids) else {}
+    top = sorted(scores.items(), key=lambda item: -item[1])[:k]
+    RecipeNeighbor.objects.filter(recipe_id=recipe_id).delete()
+    RecipeNeighbor.objects.bulk_create(
+        RecipeNeighbor(recipe_id=recipe_id, neighbor_id=neighbor_id, score=score) for neighbor_id, score in top
+    )
+    
+    RecipeNeighbor.objects.filter(neighbor_id=recipe_id).delete()
+    lists = {
+        row["recipe_id"]: row
+        for row in RecipeNeighbor.objects.filter(recipe_id__in=list(scores))
+        .values("recipe_id").annotate(size=Count("pk"), lowest=Min("score"))
+    }
+    entries = []
+    for candidate_id, score in scores.items():
+        current = lists.get(candidate_id)
+        if current is None or current["size"] < k or score > current["lowest"]:
+            entries.append(RecipeNeighbor(recipe_id=candidate_id, neighbor_id=recipe_id, score=score))
+    RecipeNeighbor.objects.bulk_create(entries)
+    _trim([entry.recipe_id for entry in entries], k)
+    return len(top)
+
+
+def _trim(recipe_ids, k):
+    """
+    Keep only the k best neighbours of the given recipes.
+    """
+    ranked = RecipeNeighbor.objects.filter(recipe_id__in=recipe_ids).annotate(
+        position=Window(RowNumber(), partition_by=F("recipe_id"), order_by=F("score").desc())
+    ).values_list("pk", "position")
+    extra = [pk for pk, position in ranked if position > k]
+    RecipeNeighbor.objects.filter(pk__in=extra).delete()
+
+
+def similar_recipes(recipe, limit=6):
+    """
+    Precomputed neighbours of `recipe`, best first, in one indexed query.
+    """
+    return (
+        Recipe.objects.filter(status="published", listed_as_neighbor__recipe=recipe)
+        .order_by("-listed_as_neighbor__score")[:limit]
+    )
@@ -0,0 +1,135 @@
+import re
+from collections import Counter
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .models import Recipe, SlugCounter
+
+
+_SLUG_MAX_LENGTH = Recipe._meta.get_field("slug").max_length
+# Leave room for a "-<n>" suffix when the base slug is taken
+_SLUG_BASE_LENGTH = _SLUG_MAX_LENGTH - 12
+
+_SUFFIX_RE = re.compile(r"^(?P<base>.+)-(?P<n>\d+)$")
+
+MAX_ATTEMPTS = 3
+
+
+def slug_base(title):
+    return slugify(title)[:_SLUG_BASE_LENGTH].strip("-") or "recipe"
+
+
+def _slug(base, suffix):
+    return base if suffix == 1 else f"{base}-{suffix}"
+
+
+def _upsert_counters(values, combine):
+    """
+    Write {base: value} into SlugCounter with one statement, merging with
+    existing rows through the `combine` SQL expression, and return the
+    resulting {base: last}. Bases are sorted so concurrent callers lock
+    counter rows in the same order.
+    """
+    if not values:
+        return {}
+    table = connection.ops.quote_name(SlugCounter._meta.db_table)
+    bases = sorted(values)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (base, last)
+            VALUES {", ".join(["(%s, %s)"] * len(bases))}
+            ON CONFLICT (base) DO UPDATE SET last = {combine.format(table=table)}
+            RETURNING base, last
+            """,
+            [value for base in bases for value in (base, values[base])],
+        )
+        return dict(cursor.fetchall())
+
+
+def allocate_slugs(titles):
+    """
+    Unique slugs for a batch of titles: "title", then "title-2", "title-3", ...
+    
+    Each base's counter row is advanced by the number of titles sharing it,
+    in one statement for the whole batch, so allocation costs the same however
+    many recipes have similar titles. Concurrent callers serialize on the
+    counter row and never receive the same suffix. Suffixes of rolled back
+    inserts are not reused.
+    """
+    bases = [slug_base(title) for title in titles]
+    counts = Counter(bases)
+    last = _upsert_counters(counts, "{table}.last + EXCLUDED.last")
+    next_suffix = {base: last[base] - count + 1 for base, count in counts.items()}
+    slugs = []
+    for base in bases:
+        slugs.append(_slug(base, next_suffix[base]))
+        next_suffix[base] += 1
+    return slugs
+
+
+def allocate_slug(title):
+    return allocate_slugs([title])[0]
+
+
+def _claims(slug):
+    """
+    Counter values a taken slug implies: "pasta-3" holds suffix 3 of "pasta"
+    (and suffix 1 of "pasta-3", should a title slugify to that).
+    """
+    claims = {slug: 1}
+    match = _SUFFIX_RE.match(slug)
+    if match:
+        claims[match["base"]] = int(match["n"])
+    return claims
+
+
+def reserve_slug(slug):
+    """
+    Move the counters past a slug chosen by hand (admin edits), so the
+    allocator never hands it out again.
+    """
+    _upsert_counters(_claims(slug), "GREATEST({table}.last, EXCLUDED.last)")
+
+
+def resync_counters(bases):
+    """
+    Move the counters of `bases` past every existing slug built on them, with
+    one query served by the slug's pattern index. Only needed after a conflict.
+    """
+    bases = set(bases)
+    if not bases:
+        return
+    condition = Q()
+    for base in bases:
+        condition |= Q(slug__startswith=base)
+    highest = dict.fromkeys(bases, 0)
+    for slug in Recipe.objects.filter(condition).values_list("slug", flat=True).iterator():
+        for base, suffix in _claims(slug).items():
+            if base in highest:
+                highest[base] = max(highest[base], suffix)
+    _upsert_counters(highest, "GREATEST({table}.last, EXCLUDED.last)")
+
+
+def _is_slug_conflict(exc):
+    diag = getattr(exc.__cause__, "diag", None)
+    return "slug" in (getattr(diag, "constraint_name", None) or "")
+
+
+def save_with_slug(recipe, *args, **kwargs):
+    """
+    Save a recipe under a freshly allocated slug. If the slug turns out to be
+    taken by a row the counters did not know about, the counter is resynced
+    and the insert retried.
+    """
+    for attempt in range(MAX_ATTEMPTS):
+        recipe.slug = allocate_slug(recipe.title)
+        try:
+            with transaction.atomic():
+                return recipe.save(*args, **kwargs)
+        except IntegrityError as exc:
+            if attempt == MAX_ATTEMPTS - 1 or not _is_slug_conflict(exc):
+                raise
+            resync_counters([slug_base(recipe.title)])
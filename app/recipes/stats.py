@@ -0,0 +1,230 @@
+import random
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AuthorStats, Comment, DailyActivity, Like, Recipe, StatCounter
+
+
+CACHE_KEY = "recipes:admin-stats"
+
+# Days of activity shown on the dashboard and kept by rebuild_stats()
+DASHBOARD_DAYS = 14
+HISTORY_DAYS = 90
+
+TOP_AUTHORS = 5
+
+# Site-wide totals are spread over this many StatCounter rows ("likes#3"),
+# summed on read, so concurrent writers rarely update the same row
+STAT_SHARDS = 16
+
+
+def _upsert_sql(model, rows):
+    table = connection.ops.quote_name(model._meta.db_table)
+    key_column = model._meta.pk.column
+    fields = [field.column for field in model._meta.concrete_fields if not field.primary_key]
+    placeholders = ", ".join(["%s"] * (len(fields) + 1))
+    sql = f"""
+        INSERT INTO {table} ({key_column}, {", ".join(fields)})
+        VALUES {", ".join([f"({placeholders})"] * len(rows))}
+        ON CONFLICT ({key_column}) DO UPDATE
+        SET {", ".join(f"{field} = {table}.{field} + EXCLUDED.{field}" for field in fields)}
+    """
+    params = [
+        value
+        for key in sorted(rows)
+        for value in (key, *(rows[key].get(field, 0) for field in fields))
+    ]
+    return sql, params
+
+
+def _upsert(*changes):
+    """
+    Add counter deltas to rollup rows, creating missing ones. `changes` are
+    (model, {primary key: {field: delta}}) pairs, all applied in a single
+    statement once the current transaction commits, in a transaction of its
+    own: the rollup rows are never locked for the length of a like or
+    comment transaction. Every counter column is written (the columns have
+    no database defaults) and keys are sorted so concurrent writers lock
+    rows in the same order. A change lost between the commit and the
+    upsert is repaired by rebuild_stats().
+    """
+    transaction.on_commit(lambda: _apply(changes), robust=True)
+
+
+def _apply(changes):
+    statements = []
+    for model, rows in changes:
+        rows = {key: deltas for key, deltas in rows.items() if any(deltas.values())}
+        if rows:
+            statements.append(_upsert_sql(model, rows))
+    if not statements:
+        return
+    # Extra upserts ride along as data-modifying CTEs of the last one
+    ctes = [f"change_{index} AS ({sql})" for index, (sql, params) in enumerate(statements[:-1])]
+    sql = (f"WITH {', '.join(ctes)} " if ctes else "") + statements[-1][0]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [value for statement, params in statements for value in params])
+
+
+def _totals(deltas):
+    shard = random.randrange(STAT_SHARDS)
+    return StatCounter, {f"{key}#{shard}": {"value": delta} for key, delta in deltas.items()}
+
+
+def stat_totals():
+    """
+    Site-wide totals, with the shards of each StatCounter key added up.
+    """
+    totals = Counter()
+    for key, value in StatCounter.objects.values_list("key", "value"):
+        totals[key.partition("#")[0]] += value
+    return totals
+
+
+def record_recipes(transitions):
+    """
+    Apply recipe status transitions: {(author id, old status, new status): count},
+    with None as the old status of new recipes and the new status of deleted ones.
+    """
+    totals = Counter()
+    authors = defaultdict(Counter)
+    for (author_id, old, new), count in transitions.items():
+        if old is not None:
+            totals[f"recipes:{old}"] -= count
+        if new is not None:
+            totals[f"recipes:{new}"] += count
+        authors[author_id]["recipes"] += count * ((new is not None) - (old is not None))
+        authors[author_id]["published"] += count * ((new == "published") - (old == "published"))
+    _upsert(_totals(totals), (AuthorStats, authors))
+
+
+def record_likes(by_author):
+    """
+    Apply like changes: {recipe author id: +added / -removed}.
+    """
+    _upsert(
+        _totals({"likes": sum(by_author.values())}),
+        (AuthorStats, {author_id: {"likes_received": delta} for author_id, delta in by_author.items()}),
+    )
+
+
+def record_comments(delta):
+    _upsert(_totals({"comments": delta}))
+
+
+def _daily_counts(since):
+    # Served by the created_at indexes of the three tables
+    days = defaultdict(dict)
+    for field, model in (("recipes", Recipe), ("likes", Like), ("comments", Comment)):
+        rows = (
+            model.objects.filter(created_at__gte=since)
+            .annotate(day=TruncDate("created_at")).values_list("day")
+            .annotate(count=Count("pk")).order_by()
+        )
+        for day, count in rows:
+            days[day][field] = count
+    return days
+
+
+def _day_start(days_ago):
+    return timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=days_ago), time.min))
+
+
+def refresh_daily_activity(days=1):
+    """
+    Recount today's and the previous `days` days' activity. Daily counts are
+    kept out of the write paths, where every like and comment would update
+    the same row; the dashboard lags by at most the refresh interval.
+    """
+    since = _day_start(days)
+    counts = _daily_counts(since)
+    with transaction.atomic():
+        DailyActivity.objects.filter(day__gte=since.date()).delete()
+        DailyActivity.objects.bulk_create(DailyActivity(day=day, **values) for day, values in counts.items())
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+@transaction.atomic
+def rebuild_stats():
+    """
+    Recompute the rollups, repairing drift from writes that bypass
+    recipes.services (admin edits, cascades). Returns the number of authors.
+    """
+    with connection.cursor() as cursor:
+        # Incremental updates wait for the rebuild instead of being lost in it
+        cursor.execute("LOCK TABLE {} IN EXCLUSIVE MODE".format(", ".join(
+            connection.ops.quote_name(model._meta.db_table) for model in (StatCounter, DailyActivity, AuthorStats)
+        )))
+    
+    totals = {
+        f"recipes:{status}": count
+        for status, count in Recipe.objects.values_list("status").annotate(Count("pk")).order_by()
+    }
+    totals["likes"] = Like.objects.count()
+    totals["comments"] = Comment.objects.count()
+    StatCounter.objects.all().delete()
+    StatCounter.objects.bulk_create(StatCounter(key=key, value=value) for key, value in totals.items())
+    
+    days = _daily_counts(_day_start(HISTORY_DAYS))
+    DailyActivity.objects.all().delete()
+    DailyActivity.objects.bulk_create(DailyActivity(day=day, **counts) for day, counts in days.items())
+    
+    authors = defaultdict(dict)
+    rows = Recipe.objects.values_list("author").annotate(
+        recipes=Count("pk"), published=Count("pk", filter=Q(status="published"))
+    ).order_by()
+    for author_id, recipes, published in rows:
+        authors[author_id].update(recipes=recipes, published=published)
+    for author_id, likes in Like.objects.values_list("recipe__author").annotate(Count("pk")).order_by():
+        authors[author_id]["likes_received"] = likes
+    AuthorStats.objects.all().delete()
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=author_id, **counts) for author_id, counts in authors.items()
+    )
+    
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+    return len(authors)
+
+
+def dashboard_stats():
+    """
+    Totals, recent daily activity and top authors for the admin, read from
+    the rollup tables with three queries and cached for a short while.
+    """
+    stats = cache.get(CACHE_KEY)
+    if stats is not None:
+        return stats
+    
+    totals = stat_totals()
+    today = timezone.localdate()
+    days = {row.day: row for row in DailyActivity.objects.filter(day__gt=today - timedelta(days=DASHBOARD_DAYS))}
+    empty = DailyActivity()
+    stats = {
+        "recipes": {status: totals.get(f"recipes:{status}", 0) for status, label in Recipe.STATUS_CHOICES},
+        "likes": totals.get("likes", 0),
+        "comments": totals.get("comments", 0),
+        "daily": [
+            {
+                "day": day,
+                "recipes": days.get(day, empty).recipes,
+                "likes": days.get(day, empty).likes,
+                "comments": days.get(day, empty).comments,
+            }
+            for day in (today - timedelta(days=offset) for offset in range(DASHBOARD_DAYS))
+        ],
+        "top_authors": [
+            {"username": row.author.username, "published": row.published, "likes": row.likes_received}
+            for row in AuthorStats.objects.select_related("author")
+            .filter(published__gt=0).order_by("-published", "-likes_received")[:TOP_AUTHORS]
+        ],
+    }
+    stats["total_recipes"] = sum(stats["recipes"].values())
+    cache.set(CACHE_KEY, stats, getattr(settings, "ADMIN_STATS_CACHE_TIMEOUT", 60))
+    return stats
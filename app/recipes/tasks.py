@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.conf import settings
+
+from jobs.queue import report_progress
+from jobs.registry import task
+
+from . import bulk
+from .images import process_image
+from .similarity import update_neighbors
+from .stats import rebuild_stats, refresh_daily_activity
+from .trending import refresh_trending
+
+
+@task(name="recipes.process_image")
+def process_image_task(model_label, pk, field_name):
+    process_image(model_label, pk, field_name)
+
+
+@task(name="recipes.refresh_trending", every=timedelta(seconds=settings.TRENDING_REFRESH_INTERVAL))
+def refresh_trending_task():
+    refresh_trending()
+
+
+@task(name="recipes.update_neighbors")
+def update_neighbors_task(recipe_id):
+    update_neighbors(recipe_id)
+
+
+@task(name="recipes.rebuild_stats", every=timedelta(seconds=settings.ADMIN_STATS_REBUILD_INTERVAL))
+def rebuild_stats_task():
+    rebuild_stats()
+
+
+@task(name="recipes.refresh_daily_activity", every=timedelta(seconds=settings.ADMIN_STATS_DAILY_INTERVAL))
+def refresh_daily_activity_task():
+    refresh_daily_activity()
+
+
+# Batches commit one by one, so a retry would copy the first ones again
+@task(name="recipes.duplicate_recipes", max_attempts=1)
+def duplicate_recipes_task(recipe_ids):
+    return bulk.duplicate_recipes(recipe_ids, progress=report_progress)
+
+
+@task(name="recipes.reset_likes")
+def reset_likes_task(recipe_ids):
+    return bulk.reset_likes(recipe_ids, progress=report_progress)
@@ -0,0 +1,350 @@
+import random
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+
+from . import services
+from .api.serializers import RecipeListSerializer, RecipeSerializer
+from .cache import LIST_GROUP, group_versions, recipe_group
+from .facets import facets_cache_key, normalize_filters
+from .models import DailyActivity, Like, Recipe
+from .stats import rebuild_stats, stat_totals
+
+
+def create_recipes(author, count, start=0):
+    return [
+        Recipe.objects.create(
+            author=author, title=f"Recipe {index}", description="Short", ingredients="flour\neggs",
+            instructions="Mix and bake", cooking_time=30, servings=2, difficulty="easy", status="published",
+        )
+        for index in range(start, start + count)
+    ]
+
+
+class RecipeAPITestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user("author", password="x")
+        cls.recipes = create_recipes(cls.author, 3)
+    
+    def setUp(self):
+        cache.clear()
+
+
+class ConditionalGetTests(RecipeAPITestCase):
+    def test_list_if_none_match_is_304_with_one_query(self):
+        url = reverse("recipe-list")
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_detail_if_modified_since_is_304_with_one_query(self):
+        url = reverse("recipe-detail", args=[self.recipes[0].slug])
+        last_modified = self.client.get(url)["Last-Modified"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_etag_changes_with_representation(self):
+        url = reverse("recipe-detail", args=[self.recipes[0].slug])
+        etags = {
+            self.client.get(url)["ETag"],
+            self.client.get(url, {"fields": "title"})["ETag"],
+            self.client.get(url, {"format": "json"})["ETag"],
+        }
+        self.assertEqual(len(etags), 3)
+    
+    def test_list_etag_changes_on_delete(self):
+        url = reverse("recipe-list")
+        etag = self.client.get(url)["ETag"]
+        # Cache invalidation runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            self.recipes[1].delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+
+class CounterWriteTests(RecipeAPITestCase):
+    def test_likes_change_the_etag_but_not_updated_at(self):
+        recipe = self.recipes[0]
+        url = reverse("recipe-detail", args=[recipe.slug])
+        etag = self.client.get(url)["ETag"]
+        updated_at = Recipe.objects.get(pk=recipe.pk).updated_at
+        
+        services.like_recipe(recipe, get_user_model().objects.create_user("reader", password="x"))
+        
+        self.assertEqual(Recipe.objects.get(pk=recipe.pk).updated_at, updated_at)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CountInvalidationTests(RecipeAPITestCase):
+    def like(self, username):
+        user = get_user_model().objects.create_user(username, password="x")
+        groups = [LIST_GROUP, recipe_group(self.recipes[0].slug)]
+        before = group_versions(groups)
+        with self.captureOnCommitCallbacks(execute=True):
+            services.like_recipe(self.recipes[0], user)
+        after = group_versions(groups)
+        return [before[group] != after[group] for group in groups]
+    
+    def test_list_pages_are_invalidated_at_a_throttled_rate(self):
+        self.assertEqual(self.like("first"), [True, True])
+        self.assertEqual(self.like("second"), [False, True])
+
+
+class ListQueryCountTests(RecipeAPITestCase):
+    def get_list(self):
+        response = self.client.get(reverse("recipe-list"))
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+    
+    def test_query_count_does_not_grow_with_rows(self):
+        reader = get_user_model().objects.create_user("reader", password="x")
+        self.client.force_login(reader)
+        services.like_recipe(self.recipes[0], reader)
+        services.favorite_recipe(self.recipes[1], reader)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(self.get_list()), 3)
+        
+        for recipe in create_recipes(self.author, 7, start=3):
+            services.like_recipe(recipe, reader)
+            services.favorite_recipe(recipe, reader)
+        cache.clear()
+        with self.assertNumQueries(len(queries)):
+            results = self.get_list()
+        self.assertEqual(len(results), 10)
+        self.assertEqual(sum(recipe["is_liked"] for recipe in results), 8)
+        self.assertEqual(sum(recipe["is_favorited"] for recipe in results), 8)
+
+
+class SparseFieldsTests(RecipeAPITestCase):
+    def keys(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return set((data["results"][0] if "results" in data else data))
+    
+    def test_list_payload_shapes(self):
+        url = reverse("recipe-list")
+        self.assertEqual(self.keys(url), set(RecipeListSerializer.Meta.fields))
+        self.assertEqual(self.keys(url, fields="title,slug,ingredients"), {"title", "slug", "ingredients"})
+        self.assertEqual(
+            self.keys(url, omit="author,tags"), set(RecipeListSerializer.Meta.fields) - {"author", "tags"}
+        )
+    
+    def test_detail_payload_shapes(self):
+        url = reverse("recipe-detail", args=[self.recipes[0].slug])
+        self.assertEqual(self.keys(url), set(RecipeSerializer.Meta.fields))
+        self.assertEqual(self.keys(url, fields="title,likes_count"), {"title", "likes_count"})
+    
+    def test_unknown_field_is_400(self):
+        response = self.client.get(reverse("recipe-list"), {"fields": "title,nope"})
+        self.assertEqual(response.status_code, 400)
+    
+    def list_sql(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("recipe-list"), params)
+        return [query["sql"] for query in queries.captured_queries]
+    
+    def test_default_list_selects_card_columns_only(self):
+        statements = self.list_sql()
+        select = next(sql for sql in statements if 'FROM "recipes_recipe"' in sql and "LIMIT" in sql)
+        for column in ("ingredients", "instructions", "search_vector"):
+            self.assertNotIn(f'"recipes_recipe"."{column}"', select)
+        for column in ("password", "email", "bio"):
+            self.assertNotIn(f'"users_customuser"."{column}"', select)
+        self.assertIn('"users_customuser"."username"', select)
+    
+    def test_sparse_list_skips_joins_and_prefetches(self):
+        statements = self.list_sql(fields="title")
+        select = next(sql for sql in statements if 'FROM "recipes_recipe"' in sql and "LIMIT" in sql)
+        self.assertNotIn("users_customuser", select)
+        self.assertNotIn('"recipes_recipe"."description"', select)
+        self.assertFalse(any("taggit_tag" in sql for sql in statements))
+
+
+class IngredientIndexTests(RecipeAPITestCase):
+    def sql(self, recipe):
+        with CaptureQueriesContext(connection) as queries:
+            recipe.save()
+        return " ".join(query["sql"] for query in queries.captured_queries)
+    
+    def test_reindexes_only_when_ingredients_change(self):
+        recipe = Recipe.objects.get(pk=self.recipes[0].pk)
+        self.assertEqual(recipe.ingredient_entries.count(), 2)
+        
+        recipe.title = "Renamed"
+        self.assertNotIn("recipes_recipeingredient", self.sql(recipe))
+        
+        recipe.ingredients = "flour\neggs\nmilk"
+        self.assertIn("recipes_recipeingredient", self.sql(recipe))
+        self.assertEqual(recipe.ingredient_entries.count(), 3)
+
+
+class SetStatusTests(RecipeAPITestCase):
+    def test_schedules_neighbor_updates_for_changed_recipes(self):
+        self.recipes[0].status = "draft"
+        self.recipes[0].save()
+        Job.objects.all().delete()
+        
+        self.assertEqual(services.set_status(Recipe.objects.all(), "draft"), 2)
+        
+        self.assertEqual(
+            set(Job.objects.filter(task="recipes.update_neighbors").values_list("unique_key", flat=True)),
+            {f"neighbors:{recipe.pk}" for recipe in self.recipes[1:]},
+        )
+
+
+def run_concurrently(target, workers=8):
+    """
+    Run `target(index)` in `workers` threads started together, each on its
+    own connection. Returns the exceptions raised.
+    """
+    barrier = threading.Barrier(workers)
+    errors = []
+    
+    def run(index):
+        try:
+            barrier.wait()
+            target(index)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+    
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+class ConcurrentSlugTests(TransactionTestCase):
+    def test_same_title_from_many_threads_gets_unique_slugs(self):
+        author = get_user_model().objects.create_user("author", password="x")
+        
+        def create(index):
+            for _ in range(10):
+                Recipe.objects.create(
+                    author=author, title="Pancakes", ingredients="-", instructions="-", cooking_time=1, servings=1,
+                )
+        
+        self.assertEqual(run_concurrently(create), [])
+        slugs = list(Recipe.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs), 80)
+        self.assertEqual(len(set(slugs)), 80)
+        self.assertIn("pancakes", slugs)
+
+
+class ConcurrentLikeTests(TransactionTestCase):
+    def test_counters_stay_exact(self):
+        User = get_user_model()
+        author = User.objects.create_user("author", password="x")
+        users = User.objects.bulk_create(User(username=f"user-{index}") for index in range(10))
+        recipe = create_recipes(author, 1)[0]
+        operations = [services.like_recipe, services.unlike_recipe, services.toggle_like]
+        
+        def hammer(index):
+            rng = random.Random(index)
+            target = Recipe.objects.get(pk=recipe.pk)
+            for _ in range(50):
+                rng.choice(operations)(target, rng.choice(users))
+        
+        self.assertEqual(run_concurrently(hammer), [])
+        recipe.refresh_from_db()
+        likes = Like.objects.filter(recipe=recipe).count()
+        self.assertEqual(recipe.likes_count, likes)
+        self.assertEqual(stat_totals()["likes"], likes)
+        
+        self.assertEqual(run_concurrently(lambda index: [services.unlike_recipe(recipe, user) for user in users]), [])
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.likes_count, 0)
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(stat_totals()["likes"], 0)
+
+
+class AsyncParityTests(RecipeAPITestCase):
+    async def test_async_views_match_drf(self):
+        await sync_to_async(self.recipes[0].tags.add)("vegan", "quick")
+        slug = self.recipes[0].slug
+        for name, args in (("recipe-list", []), ("recipe-detail", [slug])):
+            for params in ({}, {"fields": "title,tags"}):
+                expected = (await sync_to_async(self.client.get)(reverse(name, args=args), params)).json()
+                response = await self.async_client.get(reverse(f"async-{name}", args=args), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected)
+    
+    @override_settings(QUERY_SAMPLE_RATE=1.0, QUERY_SERVER_TIMING=True)
+    async def test_async_requests_are_instrumented(self):
+        response = await self.async_client.get(reverse("async-recipe-list"))
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+
+
+class ExportTests(RecipeAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(get_user_model().objects.create_user("admin", password="x", is_staff=True))
+    
+    def test_invalid_since_is_400(self):
+        url = reverse("recipe-export")
+        for since in ("yesterday", "2024-02-30T00:00"):
+            self.assertEqual(self.client.get(url, {"since": since}).status_code, 400)
+    
+    def export_lines(self, since):
+        response = self.client.get(reverse("recipe-export"), {"since": since})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).splitlines()
+    
+    def test_naive_since_is_utc(self):
+        updated_at = Recipe.objects.get(pk=self.recipes[0].pk).updated_at
+        with self.settings(TIME_ZONE="America/New_York"):
+            self.assertEqual(len(self.export_lines(updated_at.replace(tzinfo=None).isoformat())), 3)
+            later = (updated_at + timedelta(hours=1)).replace(tzinfo=None).isoformat()
+            self.assertEqual(self.export_lines(later), [])
+    
+    def test_since_filters_rows(self):
+        self.assertEqual(len(self.export_lines("2000-01-01T00:00+00:00")), 3)
+
+
+class FacetFilterTests(SimpleTestCase):
+    def test_tags_keep_their_case(self):
+        self.assertEqual(
+            normalize_filters({"tags": " Vegan,quick ", "difficulty": "Easy", "query": "Chicken ", "page": ""}),
+            {"tags": "Vegan,quick", "difficulty": "easy", "query": "chicken"},
+        )
+    
+    def test_equivalent_lists_share_a_key(self):
+        self.assertEqual(facets_cache_key({"tags": "b,a"}), facets_cache_key({"tags": "a, b"}))
+        self.assertNotEqual(facets_cache_key({"tags": "Vegan"}), facets_cache_key({"tags": "vegan"}))
+
+
+class StatsRollupTests(RecipeAPITestCase):
+    def test_counters_apply_on_commit_and_match_rebuild(self):
+        rebuild_stats()
+        reader = get_user_model().objects.create_user("reader", password="x")
+        with self.captureOnCommitCallbacks() as callbacks:
+            services.like_recipe(self.recipes[0], reader)
+            services.like_recipe(self.recipes[1], reader)
+        self.assertEqual(stat_totals()["likes"], 0)
+        self.assertEqual(stat_totals()["recipes:published"], 3)
+        for callback in callbacks:
+            callback()
+        
+        incremental = stat_totals()
+        self.assertEqual(incremental["likes"], 2)
+        rebuild_stats()
+        self.assertEqual(stat_totals(), incremental)
+        self.assertEqual(DailyActivity.objects.get(day=timezone.localdate()).likes, 2)
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Comment, Like, Recipe, TrendingScore, TrendingState
+
+
+# How much one event adds to a recipe's score at the moment it happens
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 3.0
+PUBLISH_WEIGHT = 5.0
+
+# Events newer than this may belong to transactions that have not committed
+# yet, so a refresh stops short of "now" by this margin
+SETTLE_DELAY = timedelta(seconds=30)
+
+# On the first refresh only events from the last few half-lives matter
+BACKFILL_HALF_LIVES = 10
+
+# Move the epoch forward once scores have grown by 2**REBASE_HALF_LIVES,
+# dropping recipes whose score has decayed below MIN_SCORE
+REBASE_HALF_LIVES = 32
+MIN_SCORE = 0.01
+
+
+def half_life():
+    return getattr(settings, "TRENDING_HALF_LIFE", 24 * 3600)
+
+
+_ACCUMULATE_SQL = """
+    WITH events AS (
+        SELECT recipe_id, created_at, %(like_weight)s AS weight
+        FROM {like} WHERE created_at > %(since)s AND created_at <= %(until)s
+        UNION ALL
+        SELECT recipe_id, created_at, %(comment_weight)s
+        FROM {comment} WHERE created_at > %(since)s AND created_at <= %(until)s
+        UNION ALL
+        SELECT id, created_at, %(publish_weight)s
+        FROM {recipe} WHERE created_at > %(since)s AND created_at <= %(until)s
+    )
+    INSERT INTO {score} (recipe_id, score, updated_at)
+    SELECT recipe_id,
+           SUM(weight * power(2, EXTRACT(EPOCH FROM created_at - %(epoch)s) / %(half_life)s)),
+           %(now)s
+    FROM events
+    GROUP BY recipe_id
+    ON CONFLICT (recipe_id) DO UPDATE
+    SET score = {score}.score + EXCLUDED.score, updated_at = EXCLUDED.updated_at
+"""
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+@transaction.atomic
+def refresh_trending(now=None):
+    """
+    Fold likes, comments and new recipes created since the last refresh into
+    TrendingScore and return the number of recipes touched.
+    
+    An event at time t contributes weight * 2 ** ((t - epoch) / half_life).
+    Every score decays at the same rate, so instead of decaying old scores
+    the newer events get larger weights, and each refresh only reads the
+    events it has not seen. Unlikes and deleted comments are not subtracted;
+    their contribution fades out like any other.
+    """
+    now = now or timezone.now()
+    until = now - SETTLE_DELAY
+    state = TrendingState.objects.select_for_update().first()
+    if state is None:
+        state = TrendingState.objects.create(
+            epoch=until, refreshed_until=until - timedelta(seconds=half_life() * BACKFILL_HALF_LIVES)
+        )
+    if until <= state.refreshed_until:
+        return 0
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _ACCUMULATE_SQL.format(
+                like=_table(Like), comment=_table(Comment), recipe=_table(Recipe), score=_table(TrendingScore)
+            ),
+            {
+                "like_weight": LIKE_WEIGHT,
+                "comment_weight": COMMENT_WEIGHT,
+                "publish_weight": PUBLISH_WEIGHT,
+                "since": state.refreshed_until,
+                "until": until,
+                "epoch": state.epoch,
+                "half_life": half_life(),
+                "now": now,
+            },
+        )
+        touched = cursor.rowcount
+    
+    state.refreshed_until = until
+    if (until - state.epoch).total_seconds() > half_life() * REBASE_HALF_LIVES:
+        _rebase(state, until)
+    state.save()
+    return touched
+
+
+def _rebase(state, epoch):
+    """
+    Rescale every score to a later epoch to keep the numbers in float range.
+    """
+    factor = 2 ** (-(epoch - state.epoch).total_seconds() / half_life())
+    with connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {_table(TrendingScore)} SET score = score * %s", [factor])
+    TrendingScore.objects.filter(score__lt=MIN_SCORE).delete()
+    state.epoch = epoch
+
+
+def trending_recipes(queryset, limit=20):
+    """
+    The `limit` highest scored recipes of `queryset`, read from TrendingScore.
+    """
+    return queryset.filter(trending__isnull=False).order_by("-trending__score")[:limit]
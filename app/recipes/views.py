@@ -3,17 +3,46 @@ from django.urls import reverse_lazy
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.auth.decorators import login_required
 from django.views.generic import (
-    ListView, DetailView, CreateView, UpdateView, DeleteView
+    ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 )
 from django.contrib import messages
 from django.db.models import Q
 from django.http import JsonResponse
+from django.utils.decorators import method_decorator
 from taggit.models import Tag
 from .models import Recipe, Comment, Like
 from .forms import RecipeForm, CommentForm, RecipeSearchForm
+from . import services
+from .cache import LIST_GROUP, anonymous_page_cache, recipe_group
+from .facets import cached_facets
+from .pagination import KeysetPaginationMixin
+from .search import search_recipes
+from .similarity import similar_recipes
+from .trending import trending_recipes
 
 
-class RecipeListView(ListView):
+def list_page_groups(request, *args, **kwargs):
+    return [LIST_GROUP]
+
+
+def detail_page_groups(request, slug, **kwargs):
+    return [recipe_group(slug)]
+
+
+@method_decorator(anonymous_page_cache(list_page_groups), name="dispatch")
+class HomeView(TemplateView):
+    template_name = "home.html"
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["trending_recipes"] = trending_recipes(
+            Recipe.objects.filter(status="published").select_related("author"), limit=6
+        )
+        return context
+
+
+@method_decorator(anonymous_page_cache(list_page_groups), name="dispatch")
+class RecipeListView(KeysetPaginationMixin, ListView):
     model = Recipe
     template_name = "recipes/recipe_list.html"
     context_object_name = "recipes"
@@ -29,13 +58,6 @@ class RecipeListView(ListView):
             max_cooking_time = form.cleaned_data["max_cooking_time"]
             tags = form.cleaned_data["tags"]
             
-            if query:
-                queryset = queryset.filter(
-                    Q(title__icontains=query) | 
-                    Q(description__icontains=query) |
-                    Q(ingredients__icontains=query)
-                )
-            
             if difficulty:
                 queryset = queryset.filter(difficulty=difficulty)
             
@@ -45,16 +67,23 @@ class RecipeListView(ListView):
             if tags:
                 tag_list = [tag.strip() for tag in tags.split(",")]
                 queryset = queryset.filter(tags__name__in=tag_list).distinct()
+            
+            if query:
+                queryset = search_recipes(queryset, query)
         
         return queryset
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["form"] = RecipeSearchForm(self.request.GET)
-        context["tags"] = Tag.objects.all()[:20]
+        form = RecipeSearchForm(self.request.GET)
+        context["form"] = form
+        filters = form.cleaned_data if form.is_valid() else {}
+        context["facets"] = cached_facets(self.get_queryset(), filters)
+        context["tags"] = context["facets"]["tags"]
         return context
 
 
+@method_decorator(anonymous_page_cache(detail_page_groups), name="dispatch")
 class RecipeDetailView(DetailView):
     model = Recipe
     template_name = "recipes/recipe_detail.html"
@@ -74,13 +103,16 @@ class RecipeDetailView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["comment_form"] = CommentForm()
+        context["similar_recipes"] = similar_recipes(self.object).select_related("author")
         context["user_liked"] = False
+        context["user_favorited"] = False
         
         if self.request.user.is_authenticated:
             recipe = self.get_object()
             context["user_liked"] = Like.objects.filter(
                 recipe=recipe, user=self.request.user
             ).exists()
+            context["user_favorited"] = recipe.pk in services.favorite_recipe_ids(self.request.user)
         
         return context
 
@@ -131,10 +163,7 @@ def add_comment(request, slug):
     if request.method == "POST":
         form = CommentForm(request.POST)
         if form.is_valid():
-            comment = form.save(commit=False)
-            comment.recipe = recipe
-            comment.author = request.user
-            comment.save()
+            services.add_comment(recipe, request.user, form.cleaned_data["text"])
             messages.success(request, "Comment added successfully!")
             return redirect("recipe_detail", slug=slug)
     
@@ -147,7 +176,7 @@ def delete_comment(request, comment_id):
     
     if request.user == comment.author:
         recipe_slug = comment.recipe.slug
-        comment.delete()
+        services.delete_comment(comment)
         messages.success(request, "Comment deleted!")
         return redirect("recipe_detail", slug=recipe_slug)
     
@@ -157,25 +186,19 @@ def delete_comment(request, comment_id):
 
 @login_required
 def toggle_like(request, recipe_id):
-    recipe = get_object_or_404(Recipe, id=recipe_id)
-    user = request.user
-    like, created = Like.objects.get_or_create(recipe=recipe, user=user)
-    
-    if not created:
-        like.delete()
-        liked = False
-    else:
-        liked = True
+    recipe = get_object_or_404(Recipe.objects.only("pk", "slug", "author_id", "likes_count"), id=recipe_id)
+    liked = services.toggle_like(recipe, request.user)
     
-    if request.is_ajax():
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
         return JsonResponse({
             "liked": liked,
-            "total_likes": recipe.total_likes
+            "total_likes": recipe.likes_count
         })
     
     return redirect("recipe_detail", slug=recipe.slug)
 
 
+@anonymous_page_cache(list_page_groups)
 def tag_recipes(request, tag_slug):
     tag = get_object_or_404(Tag, slug=tag_slug)
     recipes = Recipe.objects.filter(status="published", tags__in=[tag])
@@ -186,7 +209,7 @@ def tag_recipes(request, tag_slug):
     })
 
 
-class UserDraftListView(LoginRequiredMixin, ListView):
+class UserDraftListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Recipe
     template_name = "recipes/user_drafts.html"
     context_object_name = "recipes"
@@ -6,6 +6,7 @@ from django.urls import reverse
 class CustomUser(AbstractUser):
     bio = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to="profile_pics", blank=True, null=True)
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     favorite_recipes = models.ManyToManyField(
         "recipes.Recipe", related_name="favorited_by", blank=True
     )
@@ -14,4 +15,8 @@ class CustomUser(AbstractUser):
         return self.username
     
     def get_absolute_url(self):
-        return reverse("user_detail", kwargs={"username": self.username}) 
\ No newline at end of file
+        return reverse("user_detail", kwargs={"username": self.username})
+    
+    def get_profile_picture_sources(self):
+        from recipes.images import image_sources
+        return image_sources(self.profile_picture, self.profile_picture_variants) 
\ No newline at end of file
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from recipes.images import schedule_image_processing
+from .models import CustomUser
+
+
+@receiver(post_save, sender=CustomUser)
+def process_profile_picture(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_image_processing(instance, "profile_picture")
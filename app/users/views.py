@@ -6,7 +6,9 @@ from django.views.generic import DetailView, UpdateView, ListView
 from django.contrib import messages
 from .models import CustomUser
 from .forms import ProfileUpdateForm
+from recipes import services
 from recipes.models import Recipe
+from recipes.pagination import KeysetPaginationMixin
 
 
 class UserDetailView(DetailView):
@@ -37,7 +39,7 @@ class UserUpdateView(LoginRequiredMixin, UpdateView):
         return reverse_lazy("user_detail", kwargs={"username": self.request.user.username})
 
 
-class UserRecipeListView(ListView):
+class UserRecipeListView(KeysetPaginationMixin, ListView):
     model = Recipe
     template_name = "users/user_recipes.html"
     context_object_name = "recipes"
@@ -53,7 +55,7 @@ class UserRecipeListView(ListView):
         return context
 
 
-class UserFavoriteRecipeListView(ListView):
+class UserFavoriteRecipeListView(KeysetPaginationMixin, ListView):
     model = Recipe
     template_name = "users/user_favorites.html"
     context_object_name = "recipes"
@@ -71,15 +73,14 @@ class UserFavoriteRecipeListView(ListView):
 
 @login_required
 def toggle_favorite(request, recipe_id):
-    recipe = get_object_or_404(Recipe, id=recipe_id)
-    user = request.user
+    recipe = get_object_or_404(
+        Recipe.objects.only("pk", "slug", "title", "favorites_count"), id=recipe_id
+    )
     
-    if recipe in user.favorite_recipes.all():
-        user.favorite_recipes.remove(recipe)
-        messages.info(request, f"'{recipe.title}' removed from favorites")
-    else:
-        user.favorite_recipes.add(recipe)
+    if services.toggle_favorite(recipe, request.user):
         messages.success(request, f"'{recipe.title}' added to favorites")
+    else:
+        messages.info(request, f"'{recipe.title}' removed from favorites")
     
     next_url = request.POST.get("next", request.META.get("HTTP_REFERER", "home"))
-    return redirect(next_url) 
\ No newline at end of file
+    return redirect(next_url) 